@@ -0,0 +1,222 @@
+"""Starting Oneko with the desktop session, without ever blocking the GUI thread.
+
+One backend per platform: a LaunchAgent on macOS, a batch file in the
+Startup folder on Windows, and an XDG autostart entry
+($XDG_CONFIG_HOME/autostart/oneko.desktop) everywhere else. Backends do
+plain blocking file I/O and process spawns; AutostartManager runs them on
+the thread pool and caches whether autostart is on.
+"""
+import os
+import sys
+import platform
+import plistlib
+import subprocess
+from pathlib import Path
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+def launch_command():
+    """argv that starts this Oneko again: the frozen app, or Python running this script"""
+    if getattr(sys, "frozen", False):
+        return [sys.executable]
+    return [sys.executable, os.path.abspath(sys.argv[0])]
+
+
+class LaunchAgentBackend:
+    """macOS: a LaunchAgent plist, loaded with launchctl"""
+
+    description = "with macOS"
+
+    def __init__(self):
+        self.path = Path.home() / "Library" / "LaunchAgents" / "com.oneko.plist"
+
+    def is_enabled(self):
+        return self.path.exists()
+
+    def enable(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        program_path = sys.executable if getattr(sys, "frozen", False) else os.path.abspath(sys.argv[0])
+        plist_content = {
+            "Label": "com.oneko",
+            "ProgramArguments": [program_path],
+            "RunAtLoad": True,
+            "KeepAlive": False,
+            "StandardOutPath": "/tmp/oneko.log",
+            "StandardErrorPath": "/tmp/oneko.log",
+        }
+        with open(self.path, "wb") as f:
+            plistlib.dump(plist_content, f)
+        subprocess.run(["launchctl", "load", str(self.path)], capture_output=True, text=True, timeout=30)
+
+    def disable(self):
+        if self.path.exists():
+            subprocess.run(["launchctl", "unload", str(self.path)], capture_output=True, text=True, timeout=30)
+            self.path.unlink()
+
+
+class StartupFolderBackend:
+    """Windows: a batch file in the user's Startup folder"""
+
+    description = "with Windows"
+
+    def __init__(self):
+        self.path = Path(os.path.expandvars("%APPDATA%\\Microsoft\\Windows\\Start Menu\\Programs\\Startup\\oneko.bat"))
+
+    def is_enabled(self):
+        return self.path.exists()
+
+    def enable(self):
+        exe_path = sys.executable if getattr(sys, "frozen", False) else sys.argv[0]
+        with open(self.path, "w") as f:
+            f.write(f'start "" "{exe_path}"')
+
+    def disable(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+def _exec_quote(arg):
+    """Quote one argument for a desktop entry's Exec key.
+
+    Two layers, as the Desktop Entry spec has them: inside double quotes
+    \\, ", ` and $ take a backslash, and the key's value as a whole is a
+    string, where every backslash is written twice (and control
+    characters as \\n, \\t, \\r). A literal backslash ends up as four.
+    """
+    arg = arg.replace("%", "%%")
+    if any(c in arg for c in ' \t\n\r"\'\\><~|&;$*?#()`'):
+        for c in '\\"`$':
+            arg = arg.replace(c, "\\" + c)
+        arg = f'"{arg}"'
+    arg = arg.replace("\\", "\\\\")
+    return arg.replace("\n", "\\n").replace("\t", "\\t").replace("\r", "\\r")
+
+
+class XdgAutostartBackend:
+    """Linux and other freedesktop sessions: a .desktop file in the autostart directory"""
+
+    description = "at login"
+
+    def __init__(self):
+        base = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+        self.path = Path(base) / "autostart" / "oneko.desktop"
+
+    def is_enabled(self):
+        # An entry can also be switched off in place by session settings tools
+        try:
+            lines = self.path.read_text().splitlines()
+        except FileNotFoundError:
+            return False
+        return not any(line.strip() in ("Hidden=true", "X-GNOME-Autostart-enabled=false") for line in lines)
+
+    def enable(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(".desktop.tmp")
+        temporary.write_text(
+            "[Desktop Entry]\n"
+            "Type=Application\n"
+            "Name=Oneko\n"
+            "Comment=Desktop cat that chases your cursor\n"
+            f"Exec={' '.join(_exec_quote(arg) for arg in launch_command())}\n"
+            "Terminal=false\n"
+            "X-GNOME-Autostart-enabled=true\n"
+        )
+        os.replace(temporary, self.path)
+
+    def disable(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def default_backend():
+    system = platform.system()
+    if system == "Darwin":
+        return LaunchAgentBackend()
+    if system == "Windows":
+        return StartupFolderBackend()
+    return XdgAutostartBackend()
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(object, object, str)  # wanted (None for a check), enabled (None on error), error
+
+
+class AutostartTask(QRunnable):
+    """Switches autostart on or off (wanted True/False), or only checks it (None), on a pool thread"""
+
+    def __init__(self, backend, wanted):
+        super().__init__()
+        self.backend = backend
+        self.wanted = wanted
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            if self.wanted is not None:
+                (self.backend.enable if self.wanted else self.backend.disable)()
+            enabled = self.backend.is_enabled()
+        except Exception as e:
+            self.signals.finished.emit(self.wanted, None, str(e))
+            return
+        self.signals.finished.emit(self.wanted, enabled, "")
+
+
+class AutostartManager(QObject):
+    """The cached autostart state, and changes to it, done in the background.
+
+    refresh() reads the state once; set_enabled() changes it. Both return
+    at once and report through signals: state_changed with the cached
+    state after every task, toggled when a requested change took effect
+    and failed with a message when it didn't. A request made while a task
+    runs is applied after it, the latest one winning.
+    """
+
+    state_changed = pyqtSignal(bool)
+    toggled = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, backend=None, parent=None):
+        super().__init__(parent)
+        self.backend = backend or default_backend()
+        self.enabled = None  # Unknown until the first task reports back
+        self._task = None  # Keeps the running runnable (and its signals) alive
+        self._queued = None  # Wanted state to apply once the running task is done
+
+    @property
+    def busy(self):
+        return self._task is not None
+
+    def refresh(self):
+        if not self.busy:
+            self._start(None)
+
+    def set_enabled(self, enabled):
+        if self.busy:
+            self._queued = enabled
+        else:
+            self._start(enabled)
+
+    def _start(self, wanted):
+        task = AutostartTask(self.backend, wanted)
+        task.setAutoDelete(False)
+        task.signals.finished.connect(self._on_finished)
+        self._task = task
+        QThreadPool.globalInstance().start(task)
+
+    def _on_finished(self, wanted, enabled, error):
+        self._task = None
+        if enabled is not None:
+            self.enabled = enabled
+        if error:
+            action = "check" if wanted is None else "enable" if wanted else "disable"
+            self.failed.emit(f"Failed to {action} autostart: {error}")
+        elif wanted is not None:
+            self.toggled.emit(enabled)
+
+        queued, self._queued = self._queued, None
+        if queued is not None and queued != self.enabled:
+            self._start(queued)
+        elif self.enabled is not None:
+            self.state_changed.emit(self.enabled)
@@ -0,0 +1,111 @@
+"""Steps per second of the Qt-free cat state machine.
+
+Drives NekoEngine headless over a seeded synthetic cursor path that
+covers chasing, idling, sleeping and digging, and times the direction
+lookup on its own against the original degrees if-chain:
+
+    python benchmarks/bench_engine.py [--steps 500000] [--seed 1]
+"""
+import os
+import sys
+import math
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neko_engine import NekoEngine, direction_frame  # noqa: E402
+from screen_layout import ScreenLayout  # noqa: E402
+
+
+def cursor_path(steps, layout, seed):
+    """Yield cursor positions: still spells, jumps and trips off screen"""
+    rng = random.Random(seed)
+    left, top, right, bottom = layout.left, layout.top, layout.right, layout.bottom
+    x, y = (left + right) // 2, (top + bottom) // 2
+    produced = 0
+    while produced < steps:
+        kind = rng.random()
+        if kind < 0.6:
+            x, y = rng.randint(left, right), rng.randint(top, bottom)
+            hold = rng.randint(1, 80)
+        elif kind < 0.9:
+            hold = rng.randint(100, 1200)  # Long enough to sit, wash or sleep
+        else:
+            x, y = right + 50, rng.randint(top, bottom)  # Off every screen
+            hold = rng.randint(10, 120)
+        for _ in range(min(hold, steps - produced)):
+            yield x, y
+        produced += hold
+
+
+def legacy_direction(degrees):
+    """The original if-chain from OnekoWindow.set_direction_animation"""
+    if -22.5 <= degrees <= 22.5:
+        return 4
+    elif 22.5 < degrees <= 67.5:
+        return 6
+    elif 67.5 < degrees <= 112.5:
+        return 8
+    elif 112.5 < degrees <= 157.5:
+        return 10
+    elif degrees > 157.5 or degrees <= -157.5:
+        return 12
+    elif -157.5 < degrees <= -112.5:
+        return 14
+    elif -112.5 < degrees <= -67.5:
+        return 0
+    elif -67.5 < degrees <= -22.5:
+        return 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    layout = ScreenLayout([(0, 0, 2560, 1440), (2560, 0, 1920, 1080)])
+    path = list(cursor_path(args.steps, layout, args.seed))
+
+    engine = NekoEngine(screen_layout=layout, seed=args.seed)
+    engine.place(100, 100)
+    states = {}
+    start = time.perf_counter()
+    for x, y in path:
+        engine.step(x, y)
+    elapsed = time.perf_counter() - start
+    # Second pass only to report where the time went; not timed
+    engine = NekoEngine(screen_layout=layout, seed=args.seed)
+    engine.place(100, 100)
+    for x, y in path:
+        engine.step(x, y)
+        activity = engine.activity()
+        states[activity] = states.get(activity, 0) + 1
+
+    print(f"engine: {len(path)} steps in {elapsed:.3f}s = {len(path) / elapsed:,.0f} steps/s")
+    print("  " + ", ".join(f"{k}: {v}" for k, v in sorted(states.items())))
+
+    rng = random.Random(args.seed)
+    deltas = [(rng.randint(-2000, 2000), rng.randint(-2000, 2000)) for _ in range(200000)]
+    deltas = [(dx, dy) for dx, dy in deltas if dx or dy]
+
+    start = time.perf_counter()
+    for dx, dy in deltas:
+        legacy_direction(math.degrees(math.atan2(dy, dx)))
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for dx, dy in deltas:
+        direction_frame(dx, dy)
+    octant = time.perf_counter() - start
+
+    mismatches = sum(1 for dx, dy in deltas
+                     if legacy_direction(math.degrees(math.atan2(dy, dx))) != direction_frame(dx, dy))
+    print(f"direction lookup: atan2 chain {len(deltas) / legacy:,.0f}/s, "
+          f"octant table {len(deltas) / octant:,.0f}/s, mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
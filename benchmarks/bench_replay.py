@@ -0,0 +1,124 @@
+"""Replay a recorded cursor trace through the cat logic as fast as possible.
+
+Record a real session with `python oneko.py --record-trace session.nktr`,
+or synthesize one, then replay it one fixed 60 ms logic step per
+sample. The engine mode drives NekoEngine alone; window mode runs the
+full OnekoWindow.update_state on the offscreen platform with a scripted
+cursor in place of QCursor:
+
+    python benchmarks/bench_replay.py --synthesize session.nktr [--steps 200000]
+    python benchmarks/bench_replay.py session.nktr [--through engine|window] [--seed 1]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cursor_trace import TraceWriter, read_trace, trace_steps  # noqa: E402
+from neko_engine import NekoEngine  # noqa: E402
+from screen_layout import ScreenLayout  # noqa: E402
+from tick_scheduler import TickScheduler  # noqa: E402
+
+DEFAULT_RECTS = [(0, 0, 2560, 1440), (2560, 0, 1920, 1080)]
+
+
+def synthesize(path, steps, seed):
+    """Write bench_engine's synthetic cursor path as a trace, one sample per step"""
+    from bench_engine import cursor_path
+    writer = TraceWriter(path)
+    writer.write_layout(DEFAULT_RECTS)
+    step_ms = TickScheduler.BASE_INTERVAL
+    for i, (x, y) in enumerate(cursor_path(steps, ScreenLayout(DEFAULT_RECTS), seed)):
+        writer.write_sample(i * step_ms, x, y)
+    writer.close()
+    print(f"Wrote {writer.samples} samples to {path} ({os.path.getsize(path)} bytes)")
+
+
+class Counts:
+    """State transitions and animation switches seen during a replay"""
+
+    def __init__(self):
+        self.transitions = {}
+        self.switches = 0
+
+    def observe(self, before, after, animation_before, animation_after):
+        if before != after:
+            key = f"{before} -> {after}"
+            self.transitions[key] = self.transitions.get(key, 0) + 1
+        if animation_before != animation_after:
+            self.switches += 1
+
+
+def replay_engine(steps, seed):
+    engine = NekoEngine(seed=seed)
+    engine.place(100, 100)
+    counts = Counts()
+    layout_rects = None
+    start = time.perf_counter()
+    for rects, x, y in steps:
+        if rects is not layout_rects:
+            layout_rects = rects
+            engine.screen_layout = ScreenLayout(rects or DEFAULT_RECTS)
+        before, animation = engine.activity(), engine.animation
+        engine.step(x, y)
+        counts.observe(before, engine.activity(), animation, engine.animation)
+    return time.perf_counter() - start, counts
+
+
+def replay_window(steps, seed):
+    from cursor_source import ScriptedCursorSource, CursorSample
+    from headless import driven_window
+
+    app, window = driven_window(cursor=ScriptedCursorSource())
+    window.engine.rng = random.Random(seed)
+    window.place(100, 100)
+    engine = window.engine
+    counts = Counts()
+    layout_rects = None
+    start = time.perf_counter()
+    for rects, x, y in steps:
+        if rects is not layout_rects:
+            layout_rects = rects
+            engine.screen_layout = ScreenLayout(rects or DEFAULT_RECTS)
+        before, animation = engine.activity(), window.current_movie
+        window.update_state(CursorSample(0.0, x, y))
+        counts.observe(before, engine.activity(), animation, window.current_movie)
+    return time.perf_counter() - start, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", help="trace file to replay (or write, with --synthesize)")
+    parser.add_argument("--synthesize", action="store_true",
+                        help="write a synthetic trace to TRACE instead of replaying one")
+    parser.add_argument("--steps", type=int, default=200000, help="samples to synthesize")
+    parser.add_argument("--through", choices=["engine", "window"], default="engine")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.synthesize:
+        synthesize(args.trace, args.steps, args.seed)
+        return
+
+    steps = list(trace_steps(read_trace(args.trace), TickScheduler.BASE_INTERVAL))
+    if not steps:
+        sys.exit(f"{args.trace} has no cursor samples")
+    replay = replay_engine if args.through == "engine" else replay_window
+    elapsed, counts = replay(steps, args.seed)
+
+    simulated = len(steps) * TickScheduler.BASE_INTERVAL / 1000
+    print(f"{len(steps)} ticks ({simulated / 60:.1f} min of session) through {args.through} "
+          f"in {elapsed:.3f}s: {len(steps) / elapsed:,.0f} ticks/s")
+    print(f"animation switches: {counts.switches}")
+    print("state transitions:")
+    for key, n in sorted(counts.transitions.items(), key=lambda item: -item[1]):
+        print(f"  {key:<24} {n}")
+
+
+if __name__ == "__main__":
+    main()
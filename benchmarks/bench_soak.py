@@ -0,0 +1,196 @@
+"""Soak test: run the real OnekoWindow for millions of ticks and fail on leaks.
+
+Drives OnekoWindow.on_tick on the offscreen platform as fast as it will
+go, with bench_engine's synthetic cursor (chasing, sitting, washing,
+sleeping, digging) and every paint delivered. Every --churn ticks it also
+hides and shows the cat, switches theme and switches profile, the
+things a cat running for weeks does now and then. Every --sample ticks
+it records resident memory, the Python heap (tracemalloc), the window's
+live QObject children and QTimers, and the QObject wrappers and objects
+Python is holding.
+
+Growth is measured from the first sample after --warmup. The run fails
+(exit status 1) if growth goes over a budget:
+
+    python benchmarks/bench_soak.py [--ticks 2000000] [--sample 100000]
+    python benchmarks/bench_soak.py --ticks 200000 --json soak.json
+"""
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QObject, QTimer  # noqa: E402
+
+from bench_engine import cursor_path  # noqa: E402
+from bench_sprite_backends import rss_kb  # noqa: E402
+from config import resolve, PROFILES  # noqa: E402
+from cursor_source import CursorSource  # noqa: E402
+from headless import driven_window  # noqa: E402
+from screen_layout import ScreenLayout  # noqa: E402
+from tick_scheduler import TickScheduler  # noqa: E402
+
+SCREEN = [(0, 0, 1920, 1080)]
+CHURN_THEMES = ["grey_cat", "ghost_cat", "orange_cat"]
+
+
+class PathCursorSource(CursorSource):
+    """One position per snapshot from an iterator, without keeping the path around"""
+
+    def __init__(self, positions):
+        super().__init__()
+        self.positions = positions
+        self.position = (0, 0)
+
+    def read(self):
+        self.position = next(self.positions, self.position)
+        return self.position
+
+
+def sample(window, ticks, started):
+    gc.collect()
+    # Count first: the sweep allocates, and those allocations must not show as growth
+    objects = gc.get_objects()
+    qobjects = sum(isinstance(o, QObject) for o in objects)
+    count = len(objects)
+    del objects
+    children = window.findChildren(QObject)
+    return {
+        "ticks": ticks,
+        "seconds": round(time.perf_counter() - started, 1),
+        "rss_kb": rss_kb(),
+        "heap_kb": tracemalloc.get_traced_memory()[0] // 1024 if tracemalloc.is_tracing() else 0,
+        "children": len(children),
+        "timers": sum(isinstance(child, QTimer) for child in children),
+        "active_timers": sum(isinstance(child, QTimer) and child.isActive() for child in children),
+        "qobjects": qobjects,
+        "objects": count,
+    }
+
+
+def churn(window, step):
+    """One of the rarer things a long-running cat does, in turn"""
+    kind = step % 3
+    if kind == 0:
+        window.toggleVisibility()
+        window.toggleVisibility()
+    elif kind == 1:
+        window.set_theme(CHURN_THEMES[step // 3 % len(CHURN_THEMES)])
+    else:
+        names = list(PROFILES)
+        window.apply_settings(resolve({}, names[step // 3 % len(names)]))
+
+
+def soak(args):
+    layout = ScreenLayout(SCREEN)
+    cursor = PathCursorSource(iter(()))
+    # An empty config file in a throwaway directory: the developer's own
+    # config can't change the figures, or reload in the middle of a run
+    app, window = driven_window(cursor=cursor, profile="balanced")
+    window.engine.screen_layout = layout
+    window.place(960, 540)
+    # The path is generated as it is consumed, so millions of ticks cost no memory
+    cursor.positions = itertools.chain.from_iterable(
+        cursor_path(args.ticks, layout, seed) for seed in itertools.count(args.seed))
+
+    sample(window, 0, 0)  # The first sweep creates PyQt's lazy enum wrappers; keep them out of the figures
+    if args.tracemalloc:
+        tracemalloc.start(10)
+    started = time.perf_counter()
+    samples = []
+    baseline_snapshot = None
+    churns = 0
+    for tick in range(1, args.ticks + 1):
+        window.on_tick()
+        app.processEvents()  # Paints, deferred deletes and queued signals
+        if args.churn and tick % args.churn == 0:
+            churn(window, churns)
+            churns += 1
+        if tick >= args.warmup and (tick - args.warmup) % args.sample == 0:
+            if baseline_snapshot is None and args.tracemalloc:
+                # Before the baseline sample: the snapshot itself lives on the traced heap
+                baseline_snapshot = tracemalloc.take_snapshot()
+            samples.append(sample(window, tick, started))
+            s = samples[-1]
+            print(f"{tick:>10} ticks {tick * TickScheduler.BASE_INTERVAL / 3600000:6.1f} h  "
+                  f"rss {s['rss_kb'] / 1024:6.1f} MB  heap {s['heap_kb'] / 1024:6.2f} MB  "
+                  f"children {s['children']:4}  timers {s['timers']:3} ({s['active_timers']} active)  "
+                  f"qobjects {s['qobjects']:5}  objects {s['objects']}", flush=True)
+
+    growth_lines = []
+    if baseline_snapshot is not None:
+        stats = tracemalloc.take_snapshot().compare_to(baseline_snapshot, "lineno")
+        growth_lines = [str(stat) for stat in stats[:args.top] if stat.size_diff > 0]
+        tracemalloc.stop()
+    return samples, growth_lines, churns
+
+
+def check(samples, args):
+    """Budget violations between the first and the last sample"""
+    if len(samples) < 2:
+        return ["not enough samples; lower --warmup or --sample"]
+    first, last = samples[0], samples[-1]
+    budgets = [
+        ("rss_kb", args.rss_budget * 1024, "resident memory", "KiB"),
+        ("heap_kb", args.heap_budget * 1024, "Python heap", "KiB"),
+        ("children", args.object_budget, "QObject children", ""),
+        ("timers", args.object_budget, "QTimers", ""),
+        ("qobjects", args.object_budget, "QObject wrappers", ""),
+    ]
+    failures = []
+    for key, budget, label, unit in budgets:
+        growth = last[key] - first[key]
+        if growth > budget:
+            failures.append(f"{label} grew by {growth}{unit} (budget {budget:g}{unit})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=2000000,
+                        help="60 ms logic ticks to run (default 2000000, about 33 h of session)")
+    parser.add_argument("--sample", type=int, default=100000, help="ticks between samples")
+    parser.add_argument("--warmup", type=int, default=100000,
+                        help="ticks before the baseline sample, while caches fill up")
+    parser.add_argument("--churn", type=int, default=20000,
+                        help="ticks between hide/show, theme and profile switches (0 for none)")
+    parser.add_argument("--rss-budget", type=float, default=8, help="allowed RSS growth in MB")
+    parser.add_argument("--heap-budget", type=float, default=1, help="allowed tracemalloc growth in MB")
+    parser.add_argument("--object-budget", type=int, default=16,
+                        help="allowed growth in QObject children, QTimers and QObject wrappers")
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false",
+                        help="skip heap tracing (about twice as fast)")
+    parser.add_argument("--top", type=int, default=10, help="heap growth lines to show")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="also write the samples as JSON")
+    args = parser.parse_args()
+    if args.warmup >= args.ticks:
+        parser.error("--warmup must be less than --ticks")
+
+    samples, growth_lines, churns = soak(args)
+    failures = check(samples, args)
+    if growth_lines:
+        print("Largest Python heap growth since the baseline:")
+        for line in growth_lines:
+            print(f"  {line}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"samples": samples, "heap_growth": growth_lines, "churns": churns,
+                       "failures": failures}, f, indent=2)
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"OK: {args.ticks} ticks, {churns} churn events, growth within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compare the QMovie and sprite-atlas animation backends.
+
+Each backend runs in its own subprocess so resident memory is measured
+from a clean start. Runs on the offscreen Qt platform by default:
+
+    python benchmarks/bench_sprite_backends.py [--switches 20000]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def rss_kb():
+    """Current resident set size in KiB (Linux /proc, falls back to peak RSS)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_backend(backend, switches, paints):
+    """Measure one backend in this process and return the results as a dict"""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from PyQt6.QtWidgets import QApplication
+    from oneko import OnekoWindow
+
+    app = QApplication(sys.argv[:1])
+    app.processEvents()
+    rss_before = rss_kb()
+
+    start = time.perf_counter()
+    window = OnekoWindow(backend=backend)
+    load_ms = (time.perf_counter() - start) * 1000
+    window.timer.stop()  # Drive the window by hand, not by the state machine
+    app.processEvents()
+    rss_after = rss_kb()
+
+    ids = sorted(window.animations)
+    start = time.perf_counter()
+    for i in range(switches):
+        window.setNekoMovie(window.animations[ids[i % len(ids)]])
+    switch_us = (time.perf_counter() - start) * 1e6 / switches
+
+    start = time.perf_counter()
+    for i in range(paints):
+        window.setNekoMovie(window.animations[ids[i % len(ids)]])
+        window.repaint()
+    paint_us = (time.perf_counter() - start) * 1e6 / paints
+
+    return {
+        "backend": backend,
+        "animations": len(ids),
+        "load_ms": round(load_ms, 2),
+        "rss_delta_kb": rss_after - rss_before,
+        "switch_us": round(switch_us, 2),
+        "switch_and_paint_us": round(paint_us, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--switches", type=int, default=20000)
+    parser.add_argument("--paints", type=int, default=2000)
+    parser.add_argument("--backend", choices=["atlas", "movie"],
+                        help="run a single backend in-process (used internally)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    if args.backend:
+        # A throwaway frame store: neither read from nor written to the user's cache
+        with tempfile.TemporaryDirectory(prefix="oneko-bench-") as cache_home:
+            os.environ["XDG_CACHE_HOME"] = cache_home
+            print(json.dumps(run_backend(args.backend, args.switches, args.paints)))
+        return
+
+    results = []
+    for backend in ("movie", "atlas"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--backend", backend,
+             "--switches", str(args.switches), "--paints", str(args.paints)],
+            capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    columns = ["backend", "animations", "load_ms", "rss_delta_kb", "switch_us", "switch_and_paint_us"]
+    print("  ".join(f"{c:>20}" for c in columns))
+    for r in results:
+        print("  ".join(f"{r[c]:>20}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
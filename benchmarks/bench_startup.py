@@ -0,0 +1,92 @@
+"""Time to first frame: process start until the cat is first painted.
+
+Starts oneko.py as a fresh process per run and waits for the "First frame
+painted" line. Wall time is measured from just before the process is
+spawned, so interpreter and Qt start-up are included. The atlas backend
+is timed cold (an empty frame store cache, so every GIF is decoded) and
+warm (frames mapped from the store the previous run wrote). Runs on the
+offscreen Qt platform by default:
+
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FIRST_FRAME = re.compile(r"First frame painted ([\d.]+) ms after start")
+STORE_WRITTEN = re.compile(r"Wrote frame store")
+
+
+def time_to_first_frame(extra_args, cache_home, timeout=30, wait_for=None):
+    """(wall ms, ms reported by the app) for one start with XDG_CACHE_HOME=cache_home.
+
+    With wait_for, keep the process running until a line matches it too.
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", os.path.join(ROOT, "oneko.py"), "--new-instance"] + extra_args,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, cwd=ROOT,
+        env=dict(os.environ, XDG_CACHE_HOME=cache_home),
+    )
+    try:
+        deadline = start + timeout
+        result = None
+        waiting = wait_for is not None
+        for line in proc.stdout:
+            match = FIRST_FRAME.search(line)
+            if match:
+                result = (time.perf_counter() - start) * 1000, float(match.group(1))
+            if waiting and wait_for.search(line):
+                waiting = False
+            if result is not None and not waiting:
+                return result
+            if time.perf_counter() > deadline:
+                break
+        raise RuntimeError(f"no first frame from oneko.py {' '.join(extra_args)}")
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    def cold(extra):
+        cache_home = tempfile.mkdtemp(prefix="oneko-cold-")
+        try:
+            return time_to_first_frame(extra, cache_home)
+        finally:
+            shutil.rmtree(cache_home, ignore_errors=True)
+
+    warm_home = tempfile.mkdtemp(prefix="oneko-warm-")
+    configs = [
+        ("movie (eager)", ["--backend", "movie"], cold),
+        ("atlas (cold)", ["--backend", "atlas"], cold),
+        ("atlas (warm)", ["--backend", "atlas"], lambda extra: time_to_first_frame(extra, warm_home)),
+    ]
+    try:
+        # Let one run write the frame store the warm runs map
+        time_to_first_frame(["--backend", "atlas"], warm_home, wait_for=STORE_WRITTEN)
+        print(f"{'backend':>16}  {'wall_ms':>10}  {'in_app_ms':>10}   (median of {args.runs})")
+        for label, extra, run in configs:
+            samples = [run(extra) for _ in range(args.runs)]
+            wall = statistics.median(s[0] for s in samples)
+            in_app = statistics.median(s[1] for s in samples)
+            print(f"{label:>16}  {wall:>10.1f}  {in_app:>10.1f}")
+    finally:
+        shutil.rmtree(warm_home, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
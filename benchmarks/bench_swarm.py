@@ -0,0 +1,66 @@
+"""Tick time against cat count: batched NekoSwarm vs one NekoEngine per cat.
+
+Both sides run the same seeded cursor path headless (no Qt needed):
+
+    python benchmarks/bench_swarm.py [--counts 1,10,100,1000] [--ticks 2000]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from neko_engine import NekoEngine  # noqa: E402
+from neko_swarm import NekoSwarm  # noqa: E402
+from screen_layout import ScreenLayout  # noqa: E402
+from bench_engine import cursor_path  # noqa: E402
+
+
+def time_swarm(count, path, layout, seed):
+    swarm = NekoSwarm(count, screen_layout=layout, seed=seed)
+    swarm.scatter(1000, 700)
+    start = time.perf_counter()
+    for x, y in path:
+        swarm.step(x, y)
+    return (time.perf_counter() - start) / len(path)
+
+
+def time_engines(count, path, layout, seed):
+    swarm = NekoSwarm(count, screen_layout=layout, seed=seed)
+    swarm.scatter(1000, 700)
+    engines = []
+    for i in range(count):
+        engine = NekoEngine(screen_layout=layout, seed=seed + i,
+                            offset_x=int(swarm.offset_x[i]), offset_y=int(swarm.offset_y[i]))
+        engine.place(int(swarm.x[i]), int(swarm.y[i]))
+        engines.append(engine)
+    start = time.perf_counter()
+    for x, y in path:
+        for engine in engines:
+            engine.step(x, y)
+    return (time.perf_counter() - start) / len(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", default="1,10,50,100,250,500,1000,5000")
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budget-ms", type=float, default=60.0,
+                        help="tick interval the logic has to fit in (default: 60 ms)")
+    args = parser.parse_args()
+
+    layout = ScreenLayout([(0, 0, 2560, 1440), (2560, 0, 1920, 1080)])
+    path = list(cursor_path(args.ticks, layout, args.seed))
+
+    print(f"{'cats':>6}  {'swarm ms/tick':>14}  {'engines ms/tick':>16}  {'speedup':>8}  {'swarm % of budget':>18}")
+    for count in (int(c) for c in args.counts.split(",")):
+        swarm = time_swarm(count, path, layout, args.seed) * 1000
+        engines = time_engines(count, path, layout, args.seed) * 1000
+        print(f"{count:>6}  {swarm:>14.4f}  {engines:>16.4f}  {engines / swarm:>7.2f}x  "
+              f"{swarm / args.budget_ms * 100:>17.2f}%")
+
+
+if __name__ == "__main__":
+    main()
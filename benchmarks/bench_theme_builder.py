@@ -0,0 +1,77 @@
+"""Theme matrix build time: theme_builder.py cold, warm and vs theme_generator.sh.
+
+Builds --themes random colourways of gif/ into a temporary directory.
+The ImageMagick shell loop is only timed when `magick` is on PATH:
+
+    python benchmarks/bench_theme_builder.py [--themes 12] [--jobs N]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import theme_builder  # noqa: E402
+
+
+def random_color(rng):
+    return "#" + "".join(f"{rng.randint(0, 255):02X}" for _ in range(3))
+
+
+def time_shell_loop(themes, source_dir, output_root):
+    start = time.perf_counter()
+    for name, (edge, body) in themes.items():
+        out = os.path.join(output_root, f"theme_{name}")
+        os.makedirs(out, exist_ok=True)
+        for path in theme_builder.source_files(source_dir):
+            subprocess.run(["magick", path, "-fuzz", "8%", "-fill", edge, "-opaque", "black",
+                            "-fuzz", "12%", "-fill", body, "-opaque", "white",
+                            os.path.join(out, os.path.basename(path))], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--themes", type=int, default=12)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    colours = {f"bench{i}": (random_color(rng), random_color(rng)) for i in range(args.themes)}
+    themes = {name: theme_builder.palette_params(edge, body) for name, (edge, body) in colours.items()}
+    source_dir = os.path.join(ROOT, "gif")
+    files = len(theme_builder.source_files(source_dir)) * len(themes)
+
+    output_root = tempfile.mkdtemp(prefix="oneko-themes-")
+    try:
+        start = time.perf_counter()
+        theme_builder.build_themes(themes, source_dir, output_root, jobs=args.jobs)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        theme_builder.build_themes(themes, source_dir, output_root, jobs=args.jobs)
+        warm = time.perf_counter() - start
+
+        print(f"{len(themes)} themes, {files} files")
+        print(f"theme_builder cold: {cold:.3f}s ({files / cold:,.0f} files/s)")
+        print(f"theme_builder warm (nothing changed): {warm:.3f}s")
+
+        if shutil.which("magick"):
+            shell_root = os.path.join(output_root, "shell")
+            shell = time_shell_loop(colours, source_dir, shell_root)
+            print(f"magick loop: {shell:.3f}s ({shell / cold:.1f}x slower than a cold build)")
+        else:
+            print("magick not found; skipping the shell loop comparison")
+    finally:
+        shutil.rmtree(output_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
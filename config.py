@@ -0,0 +1,229 @@
+"""User configuration: performance profiles and tuning constants, reloaded live.
+
+The file is JSON at $XDG_CONFIG_HOME/oneko/config.json (usually
+~/.config/oneko/config.json), for example:
+
+    {
+        "profile": "eco",
+        "profiles": {"eco": {"sprite_size": 40}},
+        "speed": 24
+    }
+
+"profile" picks one of PROFILES; "profiles" overrides or adds profiles
+key by key. "palettes" adds palette themes, {"name": {"edge": "#RRGGBB",
+"body": "#RRGGBB"}}, recoloured from the raw sprites at runtime (see
+palette.py). The remaining top-level keys are the cat's tuning constants.
+Every key is optional.
+"""
+import os
+import json
+from pathlib import Path
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from palette import palette_params
+from tick_scheduler import TickScheduler
+
+
+DEFAULT_PROFILE = "balanced"
+
+# What each built-in profile sets:
+#   tick_intervals  TickScheduler interval overrides per state (ms)
+#   motion          "step" or "smooth" (interpolated at the refresh rate)
+#   scaling         "smooth" or "fast" filter for the frame cache
+#   frame_cache     "prefill" every frame for a new size/DPR, or "lazy" per frame
+#   sprite_size     logical size of the cat in pixels
+PROFILES = {
+    "eco": {
+        "tick_intervals": {"chasing": 120, "surprised": 120, "digging": 120, "idle": 480},
+        "motion": "step",
+        "scaling": "fast",
+        "frame_cache": "lazy",
+        "sprite_size": 48,
+    },
+    "balanced": {
+        "tick_intervals": {},
+        "motion": "step",
+        "scaling": "smooth",
+        "frame_cache": "prefill",
+        "sprite_size": 64,
+    },
+    "smooth": {
+        "tick_intervals": {},
+        "motion": "smooth",
+        "scaling": "smooth",
+        "frame_cache": "prefill",
+        "sprite_size": 64,
+    },
+}
+
+# Tuning constants that can be set at the top level of the file
+TUNING = {
+    "speed": 24,
+    "trigger_distance": 64,
+    "catch_distance": 24,
+    "dig_timeout": 50,
+}
+
+_CHOICES = {
+    "motion": ("step", "smooth"),
+    "scaling": ("smooth", "fast"),
+    "frame_cache": ("prefill", "lazy"),
+}
+
+
+def config_path():
+    base = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    return os.path.join(base, "oneko", "config.json")
+
+
+def load_config(path):
+    """The parsed config file, {} if there is none; raises ValueError if it is invalid"""
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"{path}: {e}")
+    if not isinstance(config, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    return config
+
+
+def resolve(config, profile=None):
+    """Flatten a config into the settings to apply: profile values plus tuning constants.
+
+    profile overrides the file's "profile" key (e.g. from the command
+    line). Raises ValueError for unknown profiles or bad values.
+    """
+    name = profile or config.get("profile", DEFAULT_PROFILE)
+    overrides = config.get("profiles", {})
+    if not isinstance(overrides, dict) or not all(isinstance(v, dict) for v in overrides.values()):
+        raise ValueError("profiles must be an object of name -> {setting: value}")
+    if not isinstance(name, str) or (name not in PROFILES and name not in overrides):
+        raise ValueError(f"unknown profile {name!r}")
+
+    settings = dict(PROFILES[DEFAULT_PROFILE])
+    settings.update(PROFILES.get(name, {}))
+    settings.update(overrides.get(name, {}))
+    settings["profile"] = name
+    for key, default in TUNING.items():
+        settings[key] = config.get(key, default)
+
+    for key, choices in _CHOICES.items():
+        if settings[key] not in choices:
+            raise ValueError(f"{key} must be one of {', '.join(choices)}, not {settings[key]!r}")
+    for key in ["sprite_size"] + list(TUNING):
+        if not _positive_int(settings[key]):
+            raise ValueError(f"{key} must be a positive integer")
+    if not isinstance(settings["tick_intervals"], dict):
+        raise ValueError("tick_intervals must be an object of state -> ms")
+    for state, interval in settings["tick_intervals"].items():
+        if state not in TickScheduler.INTERVALS:
+            raise ValueError(f"tick_intervals: unknown state {state!r} "
+                             f"(one of {', '.join(TickScheduler.INTERVALS)})")
+        if not _positive_int(interval):
+            raise ValueError(f"tick_intervals: {state} must be a positive integer (ms)")
+    if "theme" in config:
+        if not isinstance(config["theme"], str) or not config["theme"]:
+            raise ValueError("theme must be a theme name")
+        settings["theme"] = config["theme"]
+    settings["palettes"] = config.get("palettes", {})
+    if not isinstance(settings["palettes"], dict):
+        raise ValueError("palettes must be an object of name -> {edge, body}")
+    for name, spec in settings["palettes"].items():
+        try:
+            palette_params(spec["edge"], spec["body"])
+        except (KeyError, TypeError, AttributeError, ValueError) as e:
+            raise ValueError(f"palette {name!r}: needs \"edge\" and \"body\" as #RRGGBB ({e})")
+    return settings
+
+
+def _positive_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+class ConfigWatcher(QObject):
+    """Watches the config file and emits the resolved settings whenever they change.
+
+    Editors often save by replacing the file, which drops it from
+    QFileSystemWatcher, so the directory is watched too (or its nearest
+    existing parent, until it is created) and the file is re-added after
+    every change. Bursts of change signals are coalesced.
+    An invalid file is reported and ignored; the last good settings stay.
+    """
+
+    changed = pyqtSignal(dict)
+
+    DEBOUNCE = 200  # ms
+
+    def __init__(self, path=None, profile=None, parent=None):
+        super().__init__(parent)
+        self.path = path or config_path()
+        self.profile = profile  # Command-line override of the file's profile
+        self.settings = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._schedule)
+        self.watcher.directoryChanged.connect(self._schedule)
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(self.DEBOUNCE)
+        self.debounce.timeout.connect(self.reload)
+
+    def load(self):
+        """Read the settings now and start watching; falls back to defaults on errors"""
+        self._watch()
+        try:
+            self.settings = resolve(load_config(self.path), self.profile)
+        except ValueError as e:
+            print(f"Ignoring config: {e}")
+            self.settings = resolve({}, self.profile if self.profile in PROFILES else None)
+        return self.settings
+
+    def _watch(self):
+        # Until the config directory exists (e.g. a file pushed out later),
+        # watch the nearest parent that does; reload() climbs back down
+        directory = os.path.dirname(os.path.abspath(self.path))
+        while not os.path.isdir(directory) and os.path.dirname(directory) != directory:
+            directory = os.path.dirname(directory)
+        stale = [path for path in self.watcher.directories() if path != directory]
+        if stale:
+            self.watcher.removePaths(stale)
+        if directory not in self.watcher.directories():
+            self.watcher.addPath(directory)
+        if os.path.exists(self.path) and self.path not in self.watcher.files():
+            self.watcher.addPath(self.path)
+
+    def _schedule(self, *args):
+        self.debounce.start()
+
+    def reload(self):
+        self._watch()
+        try:
+            settings = resolve(load_config(self.path), self.profile)
+        except ValueError as e:
+            print(f"Ignoring config change: {e}")
+            return
+        self._apply(settings)
+
+    def set_profile(self, profile):
+        """Switch to profile and apply it right away.
+
+        Raises ValueError, keeping the current profile, if profile is
+        unknown or its values are bad. An invalid config file doesn't
+        stop a built-in profile: it is resolved without the file, and the
+        file's problem is returned (None if there was none).
+        """
+        try:
+            config, problem = load_config(self.path), None
+        except ValueError as e:
+            config, problem = {}, str(e)
+        settings = resolve(config, profile)
+        self.profile = profile
+        self._apply(settings)
+        return problem
+
+    def _apply(self, settings):
+        if settings != self.settings:
+            self.settings = settings
+            self.changed.emit(settings)
@@ -0,0 +1,119 @@
+"""Single instance and remote control over a local socket.
+
+The first Oneko to start listens on a per-user QLocalServer; a later
+launch sends it its arguments and exits instead of starting a second cat,
+and onekoctl.py sends it commands. Requests and replies are one JSON
+object per line:
+
+    {"command": "launch", "argv": ["--theme", "grey_cat"]}
+    {"command": "pause"}    {"command": "resume"}    {"command": "quit"}
+    {"command": "profile", "name": "eco"}
+    {"command": "theme", "name": "ghost_cat"}
+    {"command": "stats"}
+
+Every reply has "ok", plus "error" when it is false; a request that went
+through despite a problem (e.g. an ignored config file) adds "warning". The client side
+needs no QApplication, so handing off takes a few milliseconds.
+"""
+import os
+import json
+import getpass
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QAbstractSocket, QLocalServer, QLocalSocket
+
+
+def server_name():
+    """Socket path in $XDG_RUNTIME_DIR if there is one, else a per-user name Qt places itself"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "oneko.sock")
+    return f"oneko-{getpass.getuser()}"
+
+
+def send(request, name=None, timeout_ms=2000):
+    """Send one request to the running instance and return its reply.
+
+    Returns None if no instance is listening. Raises TimeoutError if one
+    accepts the connection but doesn't answer in time.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name or server_name())
+    if not socket.waitForConnected(timeout_ms):
+        return None
+    socket.write(json.dumps(request).encode() + b"\n")
+    socket.flush()
+    reply = b""
+    while not reply.endswith(b"\n"):
+        if not socket.waitForReadyRead(timeout_ms):
+            raise TimeoutError("Oneko is running but did not answer")
+        reply += bytes(socket.readAll())
+    socket.disconnectFromServer()
+    return json.loads(reply)
+
+
+class ControlServer(QObject):
+    """Listens for control requests and answers each with handler(request) -> dict"""
+
+    def __init__(self, handler, name=None, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.name = name or server_name()
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_connection)
+        self._buffers = {}  # Connection -> bytes received up to the next newline
+
+    def listen(self):
+        """Claim the name; False if another instance already answers on it.
+
+        A socket file left behind by a crashed instance doesn't answer,
+        so it is removed and the name claimed again.
+        """
+        if self.server.listen(self.name):
+            return True
+        if self.server.serverError() != QAbstractSocket.SocketError.AddressInUseError:
+            print(f"Control socket unavailable: {self.server.errorString()}")
+            return True  # Run anyway, just without single instance and remote control
+        probe = QLocalSocket()
+        probe.connectToServer(self.name)
+        if probe.waitForConnected(200):
+            probe.disconnectFromServer()
+            return False
+        QLocalServer.removeServer(self.name)
+        if not self.server.listen(self.name):
+            print(f"Control socket unavailable: {self.server.errorString()}")
+        return True
+
+    def _on_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            self._buffers[connection] = b""
+            connection.readyRead.connect(lambda connection=connection: self._on_ready_read(connection))
+            connection.disconnected.connect(lambda connection=connection: self._on_disconnected(connection))
+
+    def _on_ready_read(self, connection):
+        data = self._buffers.get(connection, b"") + bytes(connection.readAll())
+        *lines, self._buffers[connection] = data.split(b"\n")
+        for line in lines:
+            if line.strip():
+                connection.write(json.dumps(self._answer(line)).encode() + b"\n")
+                connection.flush()  # Out before a "quit" ends the event loop
+
+    def _answer(self, line):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            return {"ok": False, "error": f"bad request: {e}"}
+        try:
+            return self.handler(request)
+        except Exception as e:  # A bad request must not take the cat down
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def _on_disconnected(self, connection):
+        self._buffers.pop(connection, None)
+        connection.deleteLater()
+
+    def close(self):
+        self.server.close()
@@ -0,0 +1,171 @@
+import time
+import ctypes
+import ctypes.util
+from collections import namedtuple
+from PyQt6.QtCore import QObject, QSocketNotifier, pyqtSignal
+from PyQt6.QtGui import QCursor, QGuiApplication
+
+from xlib import open_display
+
+
+# One cursor reading: monotonic time (s) and global position
+CursorSample = namedtuple("CursorSample", ["t", "x", "y"])
+
+
+class CursorSource(QObject):
+    """Where the cat reads the pointer from.
+
+    The window takes one snapshot() per tick and everything in that tick
+    (engine step, edge checks) uses it, so the reads can't disagree.
+    Event-driven backends also emit moved when the pointer moves, so a
+    slowed-down timer can be woken early instead of polling.
+    """
+
+    moved = pyqtSignal()
+
+    def read(self):
+        """Current (x, y) from the backend"""
+        raise NotImplementedError
+
+    def snapshot(self):
+        x, y = self.read()
+        return CursorSample(time.monotonic(), x, y)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class QtCursorSource(CursorSource):
+    """Polls QCursor.pos(); works on every platform"""
+
+    def read(self):
+        pos = QCursor.pos()
+        return pos.x(), pos.y()
+
+
+class X11CursorSource(QtCursorSource):
+    """QCursor polling plus XInput2 raw motion events for early wakeups.
+
+    Positions still come from Qt, so they are in the same (scaled)
+    coordinates as everything else; X only tells us *that* the pointer
+    moved. Uses its own Xlib connection through ctypes and a
+    QSocketNotifier on it, so no extra Python packages are needed.
+    """
+
+    _GENERIC_EVENT = 35
+    _XI_RAW_MOTION = 17
+    _XI_ALL_MASTER_DEVICES = 1
+
+    class _XIEventMask(ctypes.Structure):
+        _fields_ = [("deviceid", ctypes.c_int), ("mask_len", ctypes.c_int),
+                    ("mask", ctypes.POINTER(ctypes.c_ubyte))]
+
+    class _XGenericEventCookie(ctypes.Structure):
+        _fields_ = [("type", ctypes.c_int), ("serial", ctypes.c_ulong), ("send_event", ctypes.c_int),
+                    ("display", ctypes.c_void_p), ("extension", ctypes.c_int), ("evtype", ctypes.c_int),
+                    ("cookie", ctypes.c_uint), ("data", ctypes.c_void_p)]
+
+    class _XEvent(ctypes.Union):
+        _fields_ = [("type", ctypes.c_int), ("pad", ctypes.c_long * 24)]
+
+    def __init__(self):
+        super().__init__()
+        self.display = None
+        self.notifier = None
+        self._event = self._XEvent()
+
+        xi_path = ctypes.util.find_library("Xi")
+        if not xi_path:
+            raise OSError("libXi not found")
+        self.xi = ctypes.CDLL(xi_path)
+        self.xi.XISelectEvents.argtypes = [ctypes.c_void_p, ctypes.c_ulong,
+                                           ctypes.POINTER(self._XIEventMask), ctypes.c_int]
+        self.xlib, self.display = open_display()
+        opcode, first_event, first_error = ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        if not self.xlib.XQueryExtension(self.display, b"XInputExtension",
+                                         ctypes.byref(opcode), ctypes.byref(first_event), ctypes.byref(first_error)):
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+            raise OSError("XInput extension not available")
+        self.xi_opcode = opcode.value
+
+    def start(self):
+        if self.notifier is not None:
+            return
+        mask_bytes = (ctypes.c_ubyte * (self._XI_RAW_MOTION // 8 + 1))()
+        mask_bytes[self._XI_RAW_MOTION // 8] |= 1 << (self._XI_RAW_MOTION % 8)
+        mask = self._XIEventMask(self._XI_ALL_MASTER_DEVICES, len(mask_bytes),
+                                 ctypes.cast(mask_bytes, ctypes.POINTER(ctypes.c_ubyte)))
+        # Raw events are only delivered to the root window
+        self.xi.XISelectEvents(self.display, self.xlib.XDefaultRootWindow(self.display), ctypes.byref(mask), 1)
+        self.xlib.XFlush(self.display)
+
+        self.notifier = QSocketNotifier(self.xlib.XConnectionNumber(self.display),
+                                        QSocketNotifier.Type.Read, self)
+        self.notifier.activated.connect(self._drain)
+        self._drain()
+
+    def _drain(self, *args):
+        moved = False
+        while self.xlib.XPending(self.display):
+            self.xlib.XNextEvent(self.display, ctypes.byref(self._event))
+            cookie = ctypes.cast(ctypes.byref(self._event), ctypes.POINTER(self._XGenericEventCookie)).contents
+            if cookie.type == self._GENERIC_EVENT and cookie.extension == self.xi_opcode \
+                    and cookie.evtype == self._XI_RAW_MOTION:
+                moved = True
+        if moved:
+            self.moved.emit()  # Once per batch, however many events arrived
+
+    def stop(self):
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+            self.notifier.deleteLater()
+            self.notifier = None
+        if self.display:
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+
+
+class ScriptedCursorSource(CursorSource):
+    """Plays back a list of positions, one per snapshot, then holds the last.
+
+    For tests and headless runs (offscreen platform or Xvfb). move_to()
+    jumps to a position right away and emits moved like an event-driven
+    backend would.
+    """
+
+    def __init__(self, positions=None, loop=False):
+        super().__init__()
+        self.positions = list(positions or [(0, 0)])
+        self.loop = loop
+        self.index = 0
+        self.position = self.positions[0]
+
+    def read(self):
+        if self.index < len(self.positions):
+            self.position = self.positions[self.index]
+            self.index += 1
+            if self.loop and self.index == len(self.positions):
+                self.index = 0
+        return self.position
+
+    def move_to(self, x, y):
+        self.positions = [(x, y)]
+        self.index = 0
+        self.position = (x, y)
+        self.moved.emit()
+
+
+def create_cursor_source(kind="auto"):
+    """Cursor source by name: "qt", "x11", or "auto" (X11 events when running on xcb)"""
+    if kind == "qt":
+        return QtCursorSource()
+    if kind == "x11" or (kind == "auto" and QGuiApplication.platformName() == "xcb"):
+        try:
+            return X11CursorSource()
+        except (OSError, AttributeError) as e:
+            print(f"X11 cursor events unavailable ({e}); polling QCursor instead")
+    return QtCursorSource()
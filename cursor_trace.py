@@ -0,0 +1,127 @@
+"""Compact binary cursor traces for recording real sessions and replaying them.
+
+A trace is a 6-byte header (b"NKTR", u16 version) and then tagged records:
+
+    0  sample, delta from the previous one: u16 dt_ms, i16 dx, i16 dy
+    1  sample, absolute:                    u32 t_ms, i32 x, i32 y
+    2  screen layout:                       u16 count, count x (i32 left, top, width, height)
+
+All little-endian. Almost every sample fits the 7-byte delta form; the
+writer falls back to an absolute record when it doesn't.
+"""
+import mmap
+import struct
+
+MAGIC = b"NKTR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sH")
+_TAG = struct.Struct("<B")
+_DELTA = struct.Struct("<Hhh")
+_ABSOLUTE = struct.Struct("<Iii")
+_COUNT = struct.Struct("<H")
+_RECT = struct.Struct("<iiii")
+
+_SAMPLE_DELTA, _SAMPLE_ABSOLUTE, _LAYOUT = 0, 1, 2
+
+
+class TraceWriter:
+    """Appends samples and layout changes to a trace file"""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(_HEADER.pack(MAGIC, VERSION))
+        self.last = None  # (t_ms, x, y) of the previous sample
+        self.samples = 0
+
+    def write_layout(self, rects):
+        """Record the screen rects (x, y, width, height) in effect from now on"""
+        self.file.write(_TAG.pack(_LAYOUT) + _COUNT.pack(len(rects)))
+        for rect in rects:
+            self.file.write(_RECT.pack(*rect))
+
+    def write_sample(self, t_ms, x, y):
+        t_ms = int(t_ms)
+        last = self.last
+        if last is not None:
+            dt, dx, dy = t_ms - last[0], x - last[1], y - last[2]
+            if 0 <= dt <= 0xFFFF and -0x8000 <= dx <= 0x7FFF and -0x8000 <= dy <= 0x7FFF:
+                self.file.write(_TAG.pack(_SAMPLE_DELTA) + _DELTA.pack(dt, dx, dy))
+                self.last = (t_ms, x, y)
+                self.samples += 1
+                return
+        self.file.write(_TAG.pack(_SAMPLE_ABSOLUTE) + _ABSOLUTE.pack(t_ms, x, y))
+        self.last = (t_ms, x, y)
+        self.samples += 1
+
+    def close(self):
+        self.file.close()
+
+
+def read_trace(path):
+    """Yield ("layout", rects) and ("sample", t_ms, x, y) events in file order.
+
+    The file is mapped, not read, so hours of samples cost no memory.
+    """
+    with open(path, "rb") as f:
+        if f.seek(0, 2) < _HEADER.size:
+            raise ValueError(f"{path} is not a cursor trace")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from _read_records(path, data)
+
+
+def _read_records(path, data):
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a cursor trace")
+    if version != VERSION:
+        raise ValueError(f"unsupported trace version {version}")
+
+    offset = _HEADER.size
+    t = x = y = 0
+    while offset < len(data):
+        (tag,) = _TAG.unpack_from(data, offset)
+        offset += _TAG.size
+        if tag == _SAMPLE_DELTA:
+            dt, dx, dy = _DELTA.unpack_from(data, offset)
+            offset += _DELTA.size
+            t, x, y = t + dt, x + dx, y + dy
+            yield ("sample", t, x, y)
+        elif tag == _SAMPLE_ABSOLUTE:
+            t, x, y = _ABSOLUTE.unpack_from(data, offset)
+            offset += _ABSOLUTE.size
+            yield ("sample", t, x, y)
+        elif tag == _LAYOUT:
+            (count,) = _COUNT.unpack_from(data, offset)
+            offset += _COUNT.size
+            rects = [_RECT.unpack_from(data, offset + i * _RECT.size) for i in range(count)]
+            offset += count * _RECT.size
+            yield ("layout", rects)
+        else:
+            raise ValueError(f"bad record tag {tag} at byte {offset - 1}")
+
+
+def trace_steps(events, step_ms):
+    """Turn trace events into one (rects, x, y) per fixed logic step from the first sample.
+
+    Between samples the cursor holds its last position, just like a
+    slowed-down tick would see it. rects is the screen layout in effect
+    (None until the trace records one); a layout change applies from the
+    next sample on.
+    """
+    rects = None
+    current = None  # (rects, x, y) until the next sample
+    t = 0
+    for event in events:
+        if event[0] == "layout":
+            rects = event[1]
+            continue
+        _, t_ms, x, y = event
+        if current is None:
+            t = t_ms
+        while t < t_ms:
+            yield current
+            t += step_ms
+        current = (rects, x, y)
+    if current is not None:
+        yield current
@@ -0,0 +1,111 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QBitmap, QImage, QPixmap, QRegion
+
+
+class FrameCache:
+    """Sprite frames pre-scaled for a logical size and device pixel ratio.
+
+    Keys are (animation, frame, logical size, device pixel ratio). Each
+    pixmap is scaled once to size * dpr device pixels and tagged with the
+    ratio, so painting it is a plain 1:1 blit on any screen. The filter
+    applies to the whole cache. With prefill, owners scale every frame the
+    first time a size/ratio is used (see SpriteAtlas.scaled_pixmap);
+    without it, frames are scaled one by one as they are first shown.
+    """
+
+    def __init__(self, smooth=True, prefill=True):
+        self.smooth = smooth
+        self.prefill = prefill
+        self.pixmaps = {}
+        self.filled = set()  # (size, dpr) pairs that have been filled completely
+
+    def _scale(self, image, size, dpr):
+        device_size = max(1, round(size * dpr))
+        if image.width() != device_size or image.height() != device_size:
+            mode = Qt.TransformationMode.SmoothTransformation if self.smooth \
+                else Qt.TransformationMode.FastTransformation
+            image = image.scaled(device_size, device_size, Qt.AspectRatioMode.IgnoreAspectRatio, mode)
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        return pixmap
+
+    def fill(self, frames, size, dpr):
+        """Scale every (animation, frame, QImage) in frames for one size and ratio"""
+        for animation, frame, image in frames:
+            key = (animation, frame, size, dpr)
+            if key not in self.pixmaps:
+                self.pixmaps[key] = self._scale(image, size, dpr)
+        self.filled.add((size, dpr))
+
+    def get(self, animation, frame, size, dpr, source):
+        """Cached pixmap for a frame; source() supplies the unscaled QImage on a miss"""
+        key = (animation, frame, size, dpr)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            pixmap = self.pixmaps[key] = self._scale(source(), size, dpr)
+        return pixmap
+
+    def set_smooth(self, smooth):
+        if smooth != self.smooth:
+            self.smooth = smooth
+            self.clear()
+
+    def forget(self, animation):
+        """Drop one animation's pixmaps; the next fill() scales only what is missing"""
+        for key in [k for k in self.pixmaps if k[0] == animation]:
+            del self.pixmaps[key]
+        self.filled.clear()
+
+    def clear(self):
+        self.pixmaps.clear()
+        self.filled.clear()
+
+    def byte_size(self):
+        return sum(p.width() * p.height() * p.depth() // 8 for p in self.pixmaps.values())
+
+
+class MaskCache:
+    """1-bit window shapes of sprite frames at a logical size, for shaped windows.
+
+    Keys are (animation, frame, logical size). Each mask is the frame
+    scaled to size x size with nearest-neighbour scaling, and is the
+    region of its pixels that are at least half opaque, ready for
+    QWidget.setMask(). Built once per frame and size, never per paint.
+    """
+
+    def __init__(self):
+        self.regions = {}
+        self.filled = set()  # Sizes that have been filled completely
+
+    @staticmethod
+    def _region(image, size):
+        image = image.convertToFormat(QImage.Format.Format_ARGB32)
+        if image.width() != size or image.height() != size:
+            image = image.scaled(size, size, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                 Qt.TransformationMode.FastTransformation)
+        return QRegion(QBitmap.fromImage(image.createAlphaMask()))
+
+    def fill(self, frames, size):
+        """Build the mask of every (animation, frame, QImage) in frames for one size"""
+        for animation, frame, image in frames:
+            key = (animation, frame, size)
+            if key not in self.regions:
+                self.regions[key] = self._region(image, size)
+        self.filled.add(size)
+
+    def get(self, animation, frame, size, source):
+        """Cached mask for a frame; source() supplies the unscaled QImage on a miss"""
+        key = (animation, frame, size)
+        region = self.regions.get(key)
+        if region is None:
+            region = self.regions[key] = self._region(source(), size)
+        return region
+
+    def forget(self, animation):
+        for key in [k for k in self.regions if k[0] == animation]:
+            del self.regions[key]
+        self.filled.clear()
+
+    def clear(self):
+        self.regions.clear()
+        self.filled.clear()
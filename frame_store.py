@@ -0,0 +1,160 @@
+"""Warm-start cache: a theme's frames, decoded and pre-scaled, in one mmap-able file.
+
+Files live in $XDG_CACHE_HOME/oneko/frames (usually ~/.cache/oneko/frames)
+and are named after the theme, a hash of its source files, the sprite
+size, the device pixel ratio and the scaling filter, so any change to one
+of those simply misses and a new file is written.
+
+Format, version 1 (little-endian header):
+
+    header   "NKFS", version u16, byte order u16 (1 little, 2 big),
+             logical size u16, cell u16 (device pixels), columns u32,
+             rows u32, frame count u32, dpr f32
+    frames   count x (animation id u16, frame u16, delay i32)
+    pixels   at the next multiple of 64 bytes: one ARGB32 premultiplied
+             sheet of columns x rows cells in native byte order, row =
+             animation id, column = frame, like SpriteAtlas.image
+
+The pixel sheet is wrapped as a QImage directly on the mapping, so a warm
+start neither decodes GIFs nor copies pixels.
+"""
+import os
+import sys
+import glob
+import mmap
+import struct
+import hashlib
+from pathlib import Path
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QImage, QPainter
+
+VERSION = 1
+MAGIC = b"NKFS"
+HEADER = struct.Struct("<4sHHHHIIIf")
+FRAME = struct.Struct("<HHi")
+ALIGN = 64
+BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+def cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return os.path.join(base, "oneko", "frames")
+
+
+def source_hash(kind, path, count=32, extra=None):
+    """Short content hash of a theme's source files (GIFs, or a packed sheet and its index).
+
+    extra is anything else the frames depend on, e.g. a palette's colours.
+    """
+    if kind == "packed":
+        files = [path, os.path.splitext(path)[0] + ".json"]
+    else:
+        files = [os.path.join(path, f"{i}.GIF") for i in range(1, count + 1)]
+    digest = hashlib.sha1(repr(extra).encode() if extra is not None else b"")
+    for file in files:
+        digest.update(os.path.basename(file).encode())
+        try:
+            with open(file, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b"missing")
+    return digest.hexdigest()[:16]
+
+
+def store_path(directory, theme, digest, size, dpr, smooth):
+    filter_name = "smooth" if smooth else "fast"
+    return os.path.join(directory, f"{theme}-{digest}-{size}px-{dpr:g}x-{filter_name}.nkfs")
+
+
+def write_store(path, atlas, size, dpr, smooth):
+    """Scale every frame of atlas to size * dpr device pixels and write them to path.
+
+    Written to a temporary file and renamed into place, so a reader never
+    sees half a file.
+    """
+    cell = max(1, round(size * dpr))
+    rows = max(atlas.keys()) + 1
+    columns = max(len(atlas.frames(anim_id)) for anim_id in atlas.keys())
+    mode = Qt.TransformationMode.SmoothTransformation if smooth else Qt.TransformationMode.FastTransformation
+
+    records = []
+    sheet = QImage(columns * cell, rows * cell, FORMAT)
+    sheet.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(sheet)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+    for anim_id in sorted(atlas.keys()):
+        for column, frame in enumerate(atlas.frames(anim_id)):
+            image = atlas.image.copy(frame.rect)
+            if image.width() != cell or image.height() != cell:
+                image = image.scaled(cell, cell, Qt.AspectRatioMode.IgnoreAspectRatio, mode)
+            painter.drawImage(column * cell, anim_id * cell, image)
+            records.append((anim_id, column, frame.delay))
+    painter.end()
+
+    header = HEADER.pack(MAGIC, VERSION, BYTE_ORDER, size, cell, columns, rows, len(records), dpr)
+    index = b"".join(FRAME.pack(*record) for record in records)
+    pixels_at = -(-(len(header) + len(index)) // ALIGN) * ALIGN
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(header)
+        f.write(index)
+        f.write(b"\0" * (pixels_at - len(header) - len(index)))
+        bits = sheet.constBits()
+        bits.setsize(sheet.sizeInBytes())
+        f.write(bits.asstring())
+    os.replace(temporary, path)
+
+
+def remove_stale(directory, theme, size, dpr, smooth, keep):
+    """Delete stores for the same theme and settings built from other sources"""
+    for path in glob.glob(store_path(glob.escape(directory), glob.escape(theme), "*", size, dpr, smooth)):
+        if os.path.basename(path) != os.path.basename(keep):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class FrameStore:
+    """A store file mapped into memory: the pixel sheet as a QImage, plus the frame index.
+
+    The QImage points straight at the mapping, so the store must outlive
+    it (SpriteAtlas.from_store keeps a reference). Raises ValueError if the
+    file is not a complete version 1 store for this machine.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except (ValueError, struct.error):
+            self.close()
+            raise
+
+    def _parse(self):
+        magic, version, byte_order, self.size, self.cell, columns, rows, count, self.dpr = \
+            HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER:
+            raise ValueError("not a frame store for this version and machine")
+        self.frames = [FRAME.unpack_from(self.map, HEADER.size + i * FRAME.size) for i in range(count)]
+        pixels_at = -(-(HEADER.size + count * FRAME.size) // ALIGN) * ALIGN
+        bytes_per_line = columns * self.cell * 4
+        if len(self.map) != pixels_at + rows * self.cell * bytes_per_line:
+            raise ValueError("truncated frame store")
+        # Read-only data: Qt detaches (copies) if anything ever paints on it
+        self._view = memoryview(self.map)[pixels_at:]
+        self.image = QImage(self._view, columns * self.cell, rows * self.cell, bytes_per_line, FORMAT)
+
+    def rect(self, anim_id, frame):
+        return QRect(frame * self.cell, anim_id * self.cell, self.cell, self.cell)
+
+    def close(self):
+        self.image = None
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._view = None
+        self.map.close()
@@ -0,0 +1,59 @@
+"""A real OnekoWindow for tools that drive it themselves.
+
+session_export.py and the benchmarks run the full window on the offscreen
+platform and step it by hand. They must neither read nor change the
+user's setup, so isolate() points the config and cache directories at a
+throwaway one before oneko is imported, and the window gets an empty
+config file of its own:
+
+    from headless import isolate, driven_window
+    isolate()
+    app, window = driven_window(cursor=ScriptedCursorSource())
+"""
+import os
+import atexit
+import shutil
+import tempfile
+
+_home = None  # The temporary XDG directory, once isolate() has made it
+
+
+def isolate():
+    """Point XDG_CONFIG_HOME and XDG_CACHE_HOME at a fresh directory, removed at exit.
+
+    Call before importing oneko. Returns the directory; calling again
+    keeps the first one.
+    """
+    global _home
+    if _home is None:
+        _home = tempfile.mkdtemp(prefix="oneko-headless-")
+        atexit.register(shutil.rmtree, _home, ignore_errors=True)
+        os.environ["XDG_CONFIG_HOME"] = os.path.join(_home, "config")
+        os.environ["XDG_CACHE_HOME"] = os.path.join(_home, "cache")
+    return _home
+
+
+def driven_window(**options):
+    """(app, window): an OnekoWindow the caller clocks, with every animation of its theme decoded.
+
+    The window's timer no longer ticks the cat (its scheduler may still
+    start and stop it) and periodic stats logging is off. Takes
+    OnekoWindow's keyword arguments; config_path defaults to an empty
+    config file in the isolated directory.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    config_path = os.path.join(isolate(), "config", "oneko", "config.json")
+    os.makedirs(os.path.dirname(config_path), exist_ok=True)
+    with open(config_path, "w") as f:
+        f.write("{}\n")
+    options.setdefault("config_path", config_path)
+
+    from PyQt6.QtWidgets import QApplication
+    import oneko
+    app = QApplication.instance() or QApplication([])
+    window = oneko.OnekoWindow(**options)
+    window.timer.timeout.disconnect()  # We are the clock now
+    window.stats_timer.stop()
+    while window.theme_manager.is_loading(window.THEME):
+        app.processEvents()  # Every animation has to be there before the first step
+    return app, window
@@ -0,0 +1,43 @@
+class MotionInterpolator:
+    """Sprite positions between fixed logic steps, for rendering at the display rate.
+
+    The logic pushes the position it computed once per step. position()
+    then blends from the previous step's position to that one over the
+    following step, so the cat is drawn one step behind the logic and
+    every frame in between lands somewhere on the path. No Qt here: times
+    are plain seconds, e.g. from time.monotonic().
+    """
+
+    def __init__(self, step_seconds):
+        self.step_seconds = step_seconds
+        self.reset(0, 0, 0.0)
+
+    def reset(self, x, y, now):
+        """Jump to (x, y) with nothing to interpolate, e.g. after place()"""
+        self.prev = self.current = (x, y)
+        self.step_time = now
+
+    def push(self, x, y, now):
+        """Record the position the logic computed at time now"""
+        self.prev = self.position(now)
+        self.current = (x, y)
+        self.step_time = now
+
+    def alpha(self, now):
+        """How far the blend from prev to current has got, 0.0 to 1.0"""
+        if self.step_seconds <= 0:
+            return 1.0
+        return min(max((now - self.step_time) / self.step_seconds, 0.0), 1.0)
+
+    def position(self, now):
+        """Integer position to draw at time now"""
+        px, py = self.prev
+        cx, cy = self.current
+        if px == cx and py == cy:
+            return self.current
+        a = self.alpha(now)
+        return round(px + (cx - px) * a), round(py + (cy - py) * a)
+
+    def moving(self, now):
+        """Whether position() will still change after time now"""
+        return self.prev != self.current and self.alpha(now) < 1.0
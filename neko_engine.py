@@ -0,0 +1,207 @@
+import math
+from math import atan2, sqrt
+import random
+
+from screen_layout import ScreenLayout
+
+
+# First run frame per octant, indexed by round(atan2(dy, dx) / 45 degrees) + 4,
+# i.e. starting at Left and going clockwise on screen (y points down)
+_OCTANT_FRAMES = (12, 14, 0, 2, 4, 6, 8, 10)
+_OCTANTS_PER_RADIAN = 4 / math.pi
+
+# Frame pairs for scratching at each edge of the virtual desktop
+DIG_FRAMES = {
+    "up": (16, 17),
+    "down": (20, 21),
+    "left": (22, 23),
+    "right": (18, 19),
+}
+
+
+def direction_frame(dx, dy):
+    """First run frame for a move of (dx, dy) in screen coordinates (y down).
+
+    Same octants as bucketing math.degrees(math.atan2(dy, dx)) through an
+    if-chain, but a single multiply and table lookup. The octant borders
+    fall on irrational angles, so integer deltas never sit on one.
+    """
+    return _OCTANT_FRAMES[int(atan2(dy, dx) * _OCTANTS_PER_RADIAN + 4.5) & 7]
+
+
+def screen_edge(layout, cursor_x, cursor_y):
+    """Edge of the virtual desktop closest to the cursor: up, down, left or right"""
+    dist_top = abs(cursor_y - layout.top)
+    dist_bottom = abs(cursor_y - layout.bottom)
+    dist_left = abs(cursor_x - layout.left)
+    dist_right = abs(cursor_x - layout.right)
+
+    min_dist = min(dist_top, dist_bottom, dist_left, dist_right)
+
+    if min_dist == dist_top:
+        return "up"
+    elif min_dist == dist_bottom:
+        return "down"
+    elif min_dist == dist_left:
+        return "left"
+    else:
+        return "right"
+
+
+class NekoEngine:
+    """The cat's state machine with no dependency on Qt.
+
+    Everything it needs from the outside world is injected: the cursor
+    position is passed to step(), the monitor layout is a ScreenLayout and
+    randomness comes from a random.Random that can be seeded. Each step
+    returns the new top-left position of the sprite and the animation
+    index to show, so it can be driven by a window, a benchmark or a test.
+    """
+
+    CHASING = 1
+    IDLE = 2
+    SURPRISED = 3
+    DIGGING = 4
+
+    def __init__(self, screen_layout=None, rng=None, seed=None, available=None,
+                 sprite_size=64, trigger_distance=64, catch_distance=24,
+                 offset_x=-20, offset_y=-20, speed=24, dig_timeout=50):
+        self.screen_layout = screen_layout if screen_layout is not None else ScreenLayout([])
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.available = available  # Animation ids that can be shown, or None for all
+
+        # Constants
+        self.SPRITE_SIZE = sprite_size
+        self.TRIGGER_DISTANCE = trigger_distance
+        self.CATCH_DISTANCE = catch_distance
+        self.OFFSET_X = offset_x
+        self.OFFSET_Y = offset_y
+        self.NEKO_SPEED = speed
+        self.DIG_TIMEOUT = dig_timeout
+
+        # Position (top-left of the sprite)
+        self.x = 0
+        self.y = 0
+
+        # State variables
+        self.state = self.CHASING
+        self.idle_timer = 0
+        self.current_frame = 0
+        self.last_update = 0
+        self.current_idle_action = 'sit'
+        self.idle_action_counter = 0
+        self.dig_timer = 0
+        self.dig_direction = None
+        self.animation = None
+
+    def place(self, x, y):
+        self.x = x
+        self.y = y
+
+    def set_animation(self, frame_idx):
+        if self.available is None or frame_idx in self.available:
+            self.animation = frame_idx
+
+    def activity(self):
+        """Name of the current state, e.g. for tick scheduling and stats"""
+        if self.state == self.IDLE:
+            if self.current_idle_action == 'sleep':
+                return "sleeping"
+            if self.current_idle_action == 'wash':
+                return "washing"
+            return "idle"
+        if self.state == self.SURPRISED:
+            return "surprised"
+        if self.state == self.DIGGING:
+            return "digging"
+        return "chasing"
+
+    def get_screen_edge(self, cursor_x, cursor_y):
+        return screen_edge(self.screen_layout, cursor_x, cursor_y)
+
+    def step(self, cursor_x, cursor_y):
+        """Advance one tick towards the cursor; returns (x, y, animation)"""
+        half = self.SPRITE_SIZE // 2
+        dx = cursor_x + self.OFFSET_X - (self.x + half)
+        dy = cursor_y + self.OFFSET_Y - (self.y + half)
+        # dx and dy are integers, so comparing squared distances is exact
+        distance_sq = dx * dx + dy * dy
+
+        if not self.screen_layout.contains(cursor_x, cursor_y):
+            if self.state != self.DIGGING:
+                self.state = self.DIGGING
+                self.dig_timer = 0
+                self.dig_direction = self.get_screen_edge(cursor_x, cursor_y)
+            self.handle_digging(cursor_x, cursor_y)
+            return self.x, self.y, self.animation
+
+        if distance_sq < self.CATCH_DISTANCE * self.CATCH_DISTANCE:
+            if self.state != self.IDLE:
+                self.state = self.IDLE
+                self.idle_timer = 0
+                self.current_idle_action = 'sit'
+                self.idle_action_counter = 0
+                self.set_animation(24)
+            self.handle_idle_animations()
+            return self.x, self.y, self.animation
+
+        if (self.state == self.IDLE or self.state == self.DIGGING) and \
+                distance_sq > self.TRIGGER_DISTANCE * self.TRIGGER_DISTANCE:
+            self.state = self.SURPRISED
+            self.set_animation(31)
+            self.last_update = 5
+            return self.x, self.y, self.animation
+
+        if self.state == self.SURPRISED:
+            self.last_update -= 1
+            if self.last_update <= 0:
+                self.state = self.CHASING
+
+        if self.state == self.CHASING and distance_sq > 0:
+            distance = sqrt(distance_sq)
+            self.x += round((dx / distance) * self.NEKO_SPEED)
+            self.y += round((dy / distance) * self.NEKO_SPEED)
+
+            self.current_frame = (self.current_frame + 1) % 2
+            self.set_animation(direction_frame(dx, dy) + self.current_frame)
+
+        return self.x, self.y, self.animation
+
+    def handle_digging(self, cursor_x, cursor_y):
+        self.dig_timer += 1
+        frames = DIG_FRAMES[self.get_screen_edge(cursor_x, cursor_y)]
+        self.set_animation(frames[self.dig_timer % 2])
+
+        if self.dig_timer >= self.DIG_TIMEOUT:
+            self.state = self.IDLE
+            self.idle_timer = 301
+            self.current_idle_action = 'sleep'
+            self.idle_action_counter = 0
+
+    def handle_idle_animations(self):
+        self.idle_timer += 1
+
+        if self.idle_timer % 100 == 0:
+            if self.current_idle_action == 'sit':
+                if self.rng.random() < 0.15:
+                    self.current_idle_action = 'wash'
+                    self.idle_action_counter = 0
+                elif self.idle_timer > 300 and self.rng.random() < (0.5 if self.state == self.DIGGING else 0.1):
+                    self.current_idle_action = 'sleep'
+                    self.idle_action_counter = 0
+            elif self.current_idle_action == 'wash':
+                if self.idle_action_counter > 30:
+                    self.current_idle_action = 'sit'
+                    self.idle_action_counter = 0
+
+        if self.current_idle_action == 'sit':
+            self.set_animation(24)
+        elif self.current_idle_action == 'wash':
+            self.idle_action_counter += 1
+            self.set_animation(24 + (self.idle_timer // 3 % 2))
+        elif self.current_idle_action == 'sleep':
+            self.idle_action_counter += 1
+            if self.idle_action_counter < 20:
+                self.set_animation(26)
+            else:
+                self.set_animation(28 + (self.idle_timer // 5 % 2))
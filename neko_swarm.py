@@ -0,0 +1,204 @@
+import math
+
+import numpy as np
+
+from neko_engine import NekoEngine, DIG_FRAMES, screen_edge, _OCTANT_FRAMES, _OCTANTS_PER_RADIAN
+from screen_layout import ScreenLayout
+
+
+# Idle actions, stored as small ints instead of NekoEngine's strings
+SIT = 0
+WASH = 1
+SLEEP = 2
+
+_OCTANT_TABLE = np.array(_OCTANT_FRAMES, dtype=np.int16)
+
+
+class NekoSwarm:
+    """Many cats, one batched state-machine pass per tick.
+
+    Mirrors NekoEngine.step() rule for rule, but every per-cat variable is
+    a NumPy array and each rule is applied to all cats at once with masks.
+    Cats only differ by the offset from the cursor they aim for, which
+    spreads the swarm into a spiral around the pointer instead of a pile.
+    """
+
+    CHASING = NekoEngine.CHASING
+    IDLE = NekoEngine.IDLE
+    SURPRISED = NekoEngine.SURPRISED
+    DIGGING = NekoEngine.DIGGING
+
+    def __init__(self, count, screen_layout=None, seed=None, available=None,
+                 sprite_size=64, trigger_distance=64, catch_distance=24,
+                 offset_x=-20, offset_y=-20, speed=24, dig_timeout=50, spacing=28):
+        self.count = count
+        self.screen_layout = screen_layout if screen_layout is not None else ScreenLayout([])
+        self.rng = np.random.default_rng(seed)
+
+        # Constants
+        self.SPRITE_SIZE = sprite_size
+        self.TRIGGER_DISTANCE = trigger_distance
+        self.CATCH_DISTANCE = catch_distance
+        self.NEKO_SPEED = speed
+        self.DIG_TIMEOUT = dig_timeout
+
+        # Animation ids that can be shown; others leave the previous one in place
+        self.available = np.ones(32, dtype=bool)
+        if available is not None:
+            self.available[:] = False
+            self.available[[a for a in available if 0 <= a < 32]] = True
+
+        # Golden-angle spiral of target offsets; cat 0 keeps the classic offset
+        i = np.arange(count)
+        radius = spacing * np.sqrt(i)
+        theta = i * math.pi * (3 - math.sqrt(5))
+        self.offset_x = (offset_x + np.rint(radius * np.cos(theta))).astype(np.int64)
+        self.offset_y = (offset_y + np.rint(radius * np.sin(theta))).astype(np.int64)
+
+        # Per-cat state, one array element per cat
+        self.x = np.zeros(count, dtype=np.int64)
+        self.y = np.zeros(count, dtype=np.int64)
+        self.state = np.full(count, self.CHASING, dtype=np.int8)
+        self.idle_timer = np.zeros(count, dtype=np.int64)
+        self.current_frame = np.zeros(count, dtype=np.int16)
+        self.last_update = np.zeros(count, dtype=np.int16)
+        self.idle_action = np.full(count, SIT, dtype=np.int8)
+        self.idle_action_counter = np.zeros(count, dtype=np.int64)
+        self.dig_timer = np.zeros(count, dtype=np.int64)
+        self.animation = np.full(count, -1, dtype=np.int16)  # -1: nothing shown yet
+
+    def scatter(self, center_x, center_y, radius=200):
+        """Place every cat at a random spot around (center_x, center_y)"""
+        self.x[:] = center_x + self.rng.integers(-radius, radius + 1, self.count)
+        self.y[:] = center_y + self.rng.integers(-radius, radius + 1, self.count)
+
+    def _set_animation(self, mask, frames):
+        frames = np.broadcast_to(frames, mask.shape)
+        mask = mask & self.available[frames]
+        self.animation[mask] = frames[mask]
+
+    def activity(self):
+        """Busiest state across the swarm, for tick scheduling"""
+        state = self.state
+        if np.any(state == self.CHASING):
+            return "chasing"
+        if np.any(state == self.SURPRISED):
+            return "surprised"
+        if np.any(state == self.DIGGING):
+            return "digging"
+        if np.any(self.idle_action == WASH):
+            return "washing"
+        if np.all(self.idle_action == SLEEP):
+            return "sleeping"
+        return "idle"
+
+    def step(self, cursor_x, cursor_y):
+        """Advance every cat one tick; returns the (x, y, animation) arrays"""
+        if not self.screen_layout.contains(cursor_x, cursor_y):
+            entering = self.state != self.DIGGING
+            self.state[:] = self.DIGGING
+            self.dig_timer[entering] = 0
+            self.handle_digging(cursor_x, cursor_y)
+            return self.x, self.y, self.animation
+
+        half = self.SPRITE_SIZE // 2
+        dx = cursor_x + self.offset_x - (self.x + half)
+        dy = cursor_y + self.offset_y - (self.y + half)
+        distance_sq = dx * dx + dy * dy
+        state = self.state
+
+        # Caught the cursor: sit down and run the idle animations
+        caught = distance_sq < self.CATCH_DISTANCE * self.CATCH_DISTANCE
+        entering = caught & (state != self.IDLE)
+        if entering.any():
+            state[entering] = self.IDLE
+            self.idle_timer[entering] = 0
+            self.idle_action[entering] = SIT
+            self.idle_action_counter[entering] = 0
+            self._set_animation(entering, 24)
+        if caught.any():
+            self.handle_idle_animations(caught)
+
+        # Cursor ran away from a resting cat
+        rest = ~caught
+        surprised = rest & ((state == self.IDLE) | (state == self.DIGGING)) & \
+            (distance_sq > self.TRIGGER_DISTANCE * self.TRIGGER_DISTANCE)
+        if surprised.any():
+            state[surprised] = self.SURPRISED
+            self._set_animation(surprised, 31)
+            self.last_update[surprised] = 5
+            rest &= ~surprised
+
+        counting = rest & (state == self.SURPRISED)
+        if counting.any():
+            self.last_update[counting] -= 1
+            state[counting & (self.last_update <= 0)] = self.CHASING
+
+        chasing = rest & (state == self.CHASING) & (distance_sq > 0)
+        if chasing.any():
+            cdx = dx[chasing]
+            cdy = dy[chasing]
+            distance = np.sqrt(distance_sq[chasing])
+            # np.rint rounds half to even, exactly like Python's round()
+            self.x[chasing] += np.rint(cdx / distance * self.NEKO_SPEED).astype(np.int64)
+            self.y[chasing] += np.rint(cdy / distance * self.NEKO_SPEED).astype(np.int64)
+
+            self.current_frame[chasing] ^= 1
+            octant = (np.arctan2(cdy, cdx) * _OCTANTS_PER_RADIAN + 4.5).astype(np.int64) & 7
+            self._set_animation(chasing, self._scatter(chasing, _OCTANT_TABLE[octant] + self.current_frame[chasing]))
+
+        return self.x, self.y, self.animation
+
+    def _scatter(self, mask, values):
+        """Expand values computed for mask's cats back to a full-size array"""
+        full = np.zeros(self.count, dtype=np.int16)
+        full[mask] = values
+        return full
+
+    def handle_digging(self, cursor_x, cursor_y):
+        # The cursor is shared, so every cat scratches at the same edge
+        self.dig_timer += 1
+        first, second = DIG_FRAMES[screen_edge(self.screen_layout, cursor_x, cursor_y)]
+        everyone = np.ones(self.count, dtype=bool)
+        self._set_animation(everyone, np.where(self.dig_timer % 2 == 0, first, second).astype(np.int16))
+
+        done = self.dig_timer >= self.DIG_TIMEOUT
+        if done.any():
+            self.state[done] = self.IDLE
+            self.idle_timer[done] = 301
+            self.idle_action[done] = SLEEP
+            self.idle_action_counter[done] = 0
+
+    def handle_idle_animations(self, mask):
+        self.idle_timer[mask] += 1
+        action = self.idle_action
+        counter = self.idle_action_counter
+
+        check = mask & (self.idle_timer % 100 == 0)
+        if check.any():
+            sit = check & (action == SIT)
+            if sit.any():
+                # Same two draws as NekoEngine: wash first, then maybe sleep.
+                # Every cat here is IDLE, so the sleep chance is always 0.1.
+                to_wash = sit & (self.rng.random(self.count) < 0.15)
+                to_sleep = sit & ~to_wash & (self.idle_timer > 300) & (self.rng.random(self.count) < 0.1)
+                action[to_wash] = WASH
+                action[to_sleep] = SLEEP
+                counter[to_wash | to_sleep] = 0
+            done_washing = check & (action == WASH) & (counter > 30) & ~sit
+            action[done_washing] = SIT
+            counter[done_washing] = 0
+
+        sitting = mask & (action == SIT)
+        self._set_animation(sitting, 24)
+
+        washing = mask & (action == WASH)
+        if washing.any():
+            counter[washing] += 1
+            self._set_animation(washing, (24 + self.idle_timer // 3 % 2).astype(np.int16))
+
+        sleeping = mask & (action == SLEEP)
+        if sleeping.any():
+            counter[sleeping] += 1
+            frames = np.where(counter < 20, 26, 28 + self.idle_timer // 5 % 2).astype(np.int16)
+            self._set_animation(sleeping, frames)
@@ -1,32 +1,125 @@
+import time
+STARTED = time.perf_counter()  # As close to process start as Python gets; see mark_first_frame()
 import sys
-import math
-import random
 import platform
-from PyQt6.QtWidgets import QApplication, QLabel, QSystemTrayIcon, QMenu
+import argparse
+import importlib.util
+import json
+from PyQt6.QtWidgets import QApplication, QLabel, QSystemTrayIcon, QMenu, QMessageBox, QFileDialog
 from PyQt6.QtCore import Qt, QTimer, QPoint, QSize
-from PyQt6.QtGui import QMovie, QCursor, QIcon, QPainter, QPixmap, QPaintEvent
+from PyQt6.QtGui import QMovie, QIcon, QPainter, QPixmap, QPaintEvent, QActionGroup, QRegion
 import os
 from pathlib import Path
-import subprocess
-import plistlib
+from sprite_atlas import SpriteAtlas
+from tick_scheduler import TickScheduler
+from screen_layout import ScreenLayout
+from neko_engine import NekoEngine
+from overlay import OverlayCompositor
+from theme_manager import ThemeManager
+from frame_cache import FrameCache
+from telemetry import Telemetry
+from motion import MotionInterpolator
+from cursor_source import CursorSource, create_cursor_source
+from cursor_trace import TraceWriter
+from session_monitor import SessionMonitor
+from config import ConfigWatcher, PROFILES
+from frame_store import cache_dir as frame_store_dir
+from xlib import compositor_running
+from control import ControlServer, send as send_control
+from autostart import AutostartManager
+
+# Swarm mode needs NumPy; swarm_window is only imported once a swarm is
+# started, so NumPy's import cost stays off the time to first frame
+SWARM_AVAILABLE = importlib.util.find_spec("numpy") is not None
+if not SWARM_AVAILABLE:
+    print("Swarm mode unavailable: NumPy is not installed")
+
+
+def use_shape_masks(mode):
+    """Whether to draw through per-frame window masks: "mask", "alpha", or "auto" (X11 without a compositor)"""
+    if mode != "auto":
+        return mode == "mask"
+    if QApplication.platformName() != "xcb":
+        return False
+    try:
+        composited = compositor_running()
+    except OSError as e:
+        print(f"Compositor detection unavailable: {e}")
+        return False
+    if not composited:
+        print("No compositor running; using shaped windows")
+    return not composited
 
 
 class OnekoWindow(QLabel):
-    CHASING = 1
-    IDLE = 2
-    SURPRISED = 3
-    DIGGING = 4
+    CHASING = NekoEngine.CHASING
+    IDLE = NekoEngine.IDLE
+    SURPRISED = NekoEngine.SURPRISED
+    DIGGING = NekoEngine.DIGGING
+
+    DEFAULT_SWARM_SIZE = 24
 
-    def __init__(self):
+    def __init__(self, backend="atlas", cats=1, render="window", theme=None, stats=False, stats_log=0,
+                 motion=None, cursor="auto", record_trace=None, battery_saver=False,
+                 profile=None, config_path=None, shape="auto"):
         super().__init__()
+        # Performance profile and tuning constants from the config file,
+        # re-applied live whenever the file changes
+        self.config = ConfigWatcher(config_path, profile, self)
+        self.settings = self.config.load()
+        self.config.changed.connect(self.apply_settings)
+        # Reasons nobody can see the cat right now ("hidden", "locked",
+        # "fullscreen"); while there are any, every timer is stopped
+        self.suspend_reasons = set()
+        self.battery_saver = battery_saver  # Switch to low-power tick intervals on battery
+        self.low_power = False  # On battery with the battery saver on
+        self.tick_intervals = None  # Overrides applied to every TickScheduler we run
+        # Optional binary trace of every cursor snapshot and screen layout,
+        # for replaying real sessions through benchmarks/bench_replay.py
+        self.trace = TraceWriter(record_trace) if record_trace else None
+        self.trace_started = time.monotonic()
+        # One cursor snapshot per tick; "auto" adds X11 motion events on xcb
+        self.cursor = cursor if isinstance(cursor, CursorSource) else create_cursor_source(cursor)
+        self.motion_override = motion  # --motion wins over the profile
+        # "step" (move once per logic tick) or "smooth" (interpolate at the display rate)
+        self.motion = motion or self.settings["motion"]
+        # Tick/paint timings; near-free while disabled
+        self.telemetry = Telemetry(enabled=stats or stats_log > 0)
+        self.stats_log = stats_log  # Seconds between stats log lines, 0 for none
+        self.requested_theme = theme
+        self.render_mode = render  # "window" (move this window) or "overlay" (draw on per-screen overlays)
+        if render == "overlay" and backend != "atlas":
+            print("Overlay rendering draws from the sprite atlas; using the atlas backend")
+            backend = "atlas"
+        # Without a compositor an ARGB window can't be see-through, so the
+        # window is cut to each frame's 1-bit mask and painted opaque instead
+        self.shaped = render == "window" and use_shape_masks(shape)
+        if self.shaped and backend != "atlas":
+            print("Shaped windows take their masks from the sprite atlas; using the atlas backend")
+            backend = "atlas"
+        self.backend = backend  # "atlas" (packed sprite sheet) or "movie" (one QMovie per GIF)
+        self.compositor = None
+        self.sprite = None  # This cat's OverlaySprite in overlay mode
+        self.swarm = None  # SwarmController while swarm mode is on
+        self.swarm_size = cats if cats > 1 else self.DEFAULT_SWARM_SIZE
+        self.atlas = None
+        self.frame_index = 0  # Frame within the current animation, advanced by on_tick
+        self.frame_elapsed = 0  # ms the current frame has been shown
         self.current_movie = None  # Track current movie separately
         self.initialization_complete = False  # Track initialization state
         self.frame_skip_count = 0  # Track frame skips during init
-        self.initUI()
+        self.first_frame_ms = None  # Startup time: process start -> first painted cat
+        # False if no animations could be loaded; the window is then only half built
+        self.ready = self.initUI()
+        if not self.ready:
+            return
         # Start at cursor position
-        cursor_pos = QCursor.pos()
-        self.move(cursor_pos.x() - self.SPRITE_SIZE // 2,
-                  cursor_pos.y() - self.SPRITE_SIZE // 2)
+        cursor = self.cursor.snapshot()
+        self.place(cursor.x - self.SPRITE_SIZE // 2,
+                   cursor.y - self.SPRITE_SIZE // 2)
+        if cats > 1 and SWARM_AVAILABLE:
+            self.swarm_action.setChecked(True)
+            self.toggle_swarm()
 
     def complete_initialization(self):
         """Called after initialization period to optimize performance"""
@@ -37,47 +130,53 @@ class OnekoWindow(QLabel):
 
     def paintEvent(self, event):
         """Optimized paint event with proper alpha handling"""
+        paint_start = time.perf_counter() if self.telemetry.enabled else None
         painter = QPainter(self)
         
-        # CRITICAL: Always clear with fully transparent background first
-        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
-        painter.fillRect(self.rect(), Qt.GlobalColor.transparent)
-        
-        # Reset to normal composition for drawing the current frame
-        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        if self.shaped:
+            # Opaque window: the mask hides what the frame doesn't cover, and
+            # the frame's pixels simply replace the old ones
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        else:
+            # CRITICAL: Always clear with fully transparent background first
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+            painter.fillRect(self.rect(), Qt.GlobalColor.transparent)
+
+            # Reset to normal composition for drawing the current frame
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
         
+        # Atlas backend: blit the current frame, pre-scaled for this screen's DPR
+        if self.atlas is not None:
+            if self.current_movie is not None:
+                pixmap = self.atlas.scaled_pixmap(self.current_movie, self.frame_index,
+                                                  self.SPRITE_SIZE, self.devicePixelRatioF())
+                painter.drawPixmap(0, 0, pixmap)
+                self.mark_first_frame()
+            elif not self.initialization_complete:
+                painter.setPen(Qt.GlobalColor.white)
+                painter.drawEllipse(self.rect().center(), 2, 2)
         # Draw the current movie frame if we have one
-        if self.current_movie and self.current_movie.state() == QMovie.MovieState.Running:
-            current_pixmap = self.current_movie.currentPixmap()
-            if not current_pixmap.isNull():
-                # During initialization, be more lenient about missing frames
-                if not self.initialization_complete and current_pixmap.size().isEmpty():
-                    self.frame_skip_count += 1
-                    painter.end()
-                    return
-                
-                # Optimize: Only scale if necessary, and cache the size
-                if not hasattr(self, '_cached_size') or self._cached_size != self.size():
-                    self._cached_size = self.size()
-                    self._needs_scaling = (current_pixmap.size() != self.size())
-                
-                if self._needs_scaling:
-                    # Use faster scaling for better performance
-                    scaled_pixmap = current_pixmap.scaled(
-                        self.size(), 
-                        Qt.AspectRatioMode.IgnoreAspectRatio,  # Faster than KeepAspectRatio
-                        Qt.TransformationMode.FastTransformation  # Faster than SmoothTransformation
-                    )
-                    painter.drawPixmap(0, 0, scaled_pixmap)
-                else:
-                    # No scaling needed
-                    painter.drawPixmap(0, 0, current_pixmap)
+        elif self.current_movie is not None:
+            movie = self.current_movie
+            if movie.currentFrameNumber() >= 0:
+                # Scale each movie frame once per size and DPR, never per paint
+                pixmap = self.movie_frame_cache.get(
+                    id(movie), self.frame_index, self.width(), self.devicePixelRatioF(),
+                    movie.currentImage)
+                painter.drawPixmap(0, 0, pixmap)
+                self.mark_first_frame()
+            else:
+                # The frame could not be decoded (yet); paint nothing this time
+                self.frame_skip_count += 1
         elif not self.initialization_complete:
             # During init, if no movie is ready, draw a simple placeholder
             painter.setPen(Qt.GlobalColor.white)
             painter.drawEllipse(self.rect().center(), 2, 2)
         
         painter.end()
+        if paint_start is not None:
+            self.telemetry.observe("paint", time.perf_counter() - paint_start)
+            self.telemetry.count("repaints")
 
     def initUI(self):
         # Different window flags for macOS
@@ -98,108 +197,169 @@ class OnekoWindow(QLabel):
                 | Qt.WindowType.WindowDoesNotAcceptFocus
             )
         
-        # Essential for transparency but we'll handle alpha ourselves
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        # Essential for transparency but we'll handle alpha ourselves.
+        # Shaped windows stay opaque; refresh_frame() sets their mask
+        if not self.shaped:
+            self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
         
         # Re-enable mouse transparency
         self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
 
         # Constants
-        self.THEME = "orange_cat"
-        self.SPRITE_SIZE = 64
-        self.TRIGGER_DISTANCE = 64
-        self.CATCH_DISTANCE = 24
+        settings = self.settings
+        self.THEME = self.requested_theme or settings.get("theme") or "orange_cat"
+        self.SPRITE_SIZE = settings["sprite_size"]
+        self.TRIGGER_DISTANCE = settings["trigger_distance"]
+        self.CATCH_DISTANCE = settings["catch_distance"]
         self.OFFSET_X = -20
         self.OFFSET_Y = -20
-        self.NEKO_SPEED = 24
-        self.DIG_TIMEOUT = 50
-
-        # State variables
-        self.state = self.CHASING
-        self.sleep_counter = 0
-        self.idle_timer = 0
-        self.current_frame = 0
-        self.last_update = 0
-        self.idle_action_timer = 0
-        self.current_idle_action = 'sit'
-        self.idle_action_counter = 0
-        self.dig_timer = 0
-        self.dig_direction = None
+        self.NEKO_SPEED = settings["speed"]
+        self.DIG_TIMEOUT = settings["dig_timeout"]
+        self.SMOOTH_SCALING = settings["scaling"] == "smooth"  # Filter for the per-DPR frame cache
+        self.PREFILL_FRAMES = settings["frame_cache"] == "prefill"  # Scale every frame on a new size/DPR
+        # Sitting, surprised and the 16 run frames; decoded before the first show()
+        self.STARTUP_ANIMATIONS = [24, 31] + list(range(16))
+
+        # The state machine itself lives in NekoEngine; this window only
+        # feeds it the cursor and shows what it returns
+        self.engine = NekoEngine(
+            sprite_size=self.SPRITE_SIZE,
+            trigger_distance=self.TRIGGER_DISTANCE,
+            catch_distance=self.CATCH_DISTANCE,
+            offset_x=self.OFFSET_X,
+            offset_y=self.OFFSET_Y,
+            speed=self.NEKO_SPEED,
+            dig_timeout=self.DIG_TIMEOUT,
+        )
 
         # Load animations
         if not self.loadAnimations():
             print("Failed to load animations. Exiting.")
-            return
+            return False
+        self.engine.available = set(self.animations)
+        self.tick_intervals = self.settings["tick_intervals"] or None
             
         # Setup tray icon
         self.setupTrayIcon()
         
         # Don't set initial movie via setMovie() - let state machine handle it
         self.resize(self.SPRITE_SIZE, self.SPRITE_SIZE)
+        if self.shaped:
+            # Every frame's mask now, so no frame switch ever builds one;
+            # until the first frame only the placeholder dot shows
+            self.atlas.fill_masks(self.SPRITE_SIZE)
+            self.setMask(QRegion(self.rect().center().x() - 3, self.rect().center().y() - 3, 7, 7,
+                                 QRegion.RegionType.Ellipse))
         
         # No background styling needed - we handle it in paintEvent
         
-        # Timer for movement and state updates - optimized interval
+        # In overlay mode this window is never shown; the cat is drawn on
+        # one full-screen overlay per screen instead
+        if self.render_mode == "overlay":
+            self.compositor = OverlayCompositor()
+            self.compositor.telemetry = self.telemetry
+            self.sprite = self.compositor.add_sprite(self.atlas, self.SPRITE_SIZE)
+            self.compositor.painted.connect(self.mark_first_frame)
+
+        # Smooth motion: the logic keeps its fixed 60 ms step while a render
+        # timer at the display's refresh rate draws the cat between steps.
+        # The render timer only runs while the drawn position is changing
+        self.interpolator = MotionInterpolator(TickScheduler.BASE_INTERVAL / 1000)
+        self.render_timer = QTimer(self)
+        self.render_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.render_timer.timeout.connect(self.on_render)
+
+        # Cache the monitor layout; rebuilt only when screens change
+        self.watch_screens()
+
+        # Timer for movement and state updates; the scheduler slows it down
+        # while the cat sits or sleeps and ramps it back up when it moves
         self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_state)
-        self.timer.start(60)  # Reduced from 90ms to 60ms for smoother motion
+        self.timer.timeout.connect(self.on_tick)
+        self.scheduler = TickScheduler(self.timer, intervals=self.tick_intervals,
+                                       fixed_timestep=self.motion == "smooth")
+        self.scheduler.start(self.engine.activity())
+        QApplication.instance().aboutToQuit.connect(
+            lambda: print(f"Wakeups per state: {self.scheduler.summary()}"))
+        self.cursor.moved.connect(self.on_cursor_moved)
+        self.cursor.start()
+        QApplication.instance().aboutToQuit.connect(self.cursor.stop)
+
+        # Suspend when the screen locks or a fullscreen window covers the cat
+        self.session = SessionMonitor(self.cat_screen_rect, self, watch_battery=self.battery_saver)
+        self.session.locked_changed.connect(lambda locked: self.set_suspended("locked", locked))
+        self.session.fullscreen_changed.connect(lambda covered: self.set_suspended("fullscreen", covered))
+        if self.battery_saver:
+            self.session.battery_changed.connect(self.set_low_power)
+            self.set_low_power(bool(self.session.battery))
+        self.session.start()
+        QApplication.instance().aboutToQuit.connect(self.session.stop)
+        if self.trace is not None:
+            QApplication.instance().aboutToQuit.connect(self.close_trace)
+        QApplication.instance().aboutToQuit.connect(self.log_stats)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.log_stats)
+        if self.stats_log > 0:
+            self.stats_timer.start(int(self.stats_log * 1000))
 
         # Show window
-        self.show()
-        self.raise_()
+        if self.compositor is None:
+            self.show()
+            self.raise_()
         
         # Move to center for testing
         screen = QApplication.primaryScreen().geometry()
-        self.move(screen.width() // 2, screen.height() // 2)
+        self.place(screen.width() // 2, screen.height() // 2)
         
         print("Setup complete!")
+        return True
 
     def setNekoMovie(self, movie):
-        """Optimized method to handle movie changes with proper alpha clearing"""
+        """Switch animations; the animation clock in on_tick does the repaint"""
         if movie is None or movie == self.current_movie:
             return  # Skip if same movie
-        
-        # During initialization, be more careful about movie transitions
-        if not self.initialization_complete:
-            # Ensure the new movie is fully loaded before switching
-            if movie.state() == QMovie.MovieState.NotRunning:
-                movie.jumpToFrame(0)
-                movie.start()
-                # Give it a moment to load the first frame
-                if movie.currentPixmap().isNull():
-                    return  # Skip this transition, try again next update
-            
-        # Stop current movie if any
-        if self.current_movie:
-            self.current_movie.stop()
-            try:
-                self.current_movie.frameChanged.disconnect()
-            except:
-                pass  # Ignore if already disconnected
-        
-        # Set new current movie
+        if self.telemetry.enabled:
+            self.telemetry.count("movie_switches")
+
+        # Atlas backend: the "movie" is just an animation id, so switching is an index swap.
+        # QMovies never play; the clock steps them with jumpToFrame()
         self.current_movie = movie
-        
-        # Connect frame changed signal to trigger repaints (but throttle updates)
-        if self.current_movie:
-            self.current_movie.frameChanged.connect(self.on_frame_changed)
-            self.current_movie.jumpToFrame(0)
-            if self.current_movie.state() != QMovie.MovieState.Running:
-                self.current_movie.start()
-        
-        # Force immediate repaint only when changing movies
-        self.update()
-
-    def on_frame_changed(self):
-        """Throttled frame update to improve performance"""
-        # Only update if widget is visible and not already updating
-        if self.isVisible() and not hasattr(self, '_updating'):
-            self._updating = True
+        self.frame_index = 0
+        self.frame_elapsed = 0
+        if self.atlas is None:
+            movie.jumpToFrame(0)
+
+    def advance_frame(self, elapsed_ms):
+        """Move the current animation on by elapsed_ms; returns whether the frame changed"""
+        movie = self.current_movie
+        if movie is None:
+            return False
+        delays = self.atlas.delays(movie) if self.atlas is not None else self.movie_delays[movie]
+        if len(delays) < 2:
+            return False  # Single-frame animation (all of the stock sprites)
+
+        self.frame_elapsed += elapsed_ms
+        frame = self.frame_index
+        while self.frame_elapsed >= max(delays[frame], 10):
+            self.frame_elapsed -= max(delays[frame], 10)
+            frame = (frame + 1) % len(delays)
+        if frame == self.frame_index:
+            return False
+        self.frame_index = frame
+        if self.atlas is None:
+            movie.jumpToFrame(frame)
+        return True
+
+    def refresh_frame(self):
+        """Repaint the current atlas frame, wherever this cat is drawn"""
+        if self.sprite is not None:
+            self.sprite.set_animation(self.current_movie, self.frame_index)
+        else:
+            if self.shaped and self.current_movie is not None:
+                # A cached region; the window system only repaints the difference
+                self.setMask(self.atlas.shape_mask(self.current_movie, self.frame_index, self.SPRITE_SIZE))
             self.update()
-            # During initialization, use longer delays to prevent spam
-            delay = 20 if not self.initialization_complete else 10
-            QTimer.singleShot(delay, lambda: setattr(self, '_updating', False))
 
     def loadAnimations(self):
         self.animations = {}
@@ -211,10 +371,42 @@ class OnekoWindow(QLabel):
             base_path = os.path.abspath(os.path.dirname(__file__))
 
         print(f"Looking for animations in: {base_path}")
-        gif_folder = os.path.join(base_path, "theme_"+self.THEME)
+        # Decoded, pre-scaled frames are kept in the user cache dir between runs
+        self.theme_manager = ThemeManager(base_path, store_dir=frame_store_dir())
+        self.theme_manager.set_palettes(self.settings["palettes"])
+        if self.THEME not in self.theme_manager.names():
+            print(f"Unknown theme {self.THEME!r}, using orange_cat")
+            self.THEME = "orange_cat"
+        self.theme_manager.theme_ready.connect(self.apply_theme)
+        self.theme_manager.theme_failed.connect(self.on_theme_failed)
+        kind, gif_folder = self.theme_manager.source(self.THEME) or \
+            ("folder", os.path.join(base_path, "theme_"+self.THEME))
+        self.gif_folder = gif_folder
         print(f"GIF folder path: {gif_folder}")
 
+        if self.backend == "atlas":
+            # Decode what the first few seconds need into the atlas now; the
+            # rest arrives from a worker thread via on_animation_loaded
+            if self.theme_manager.source(self.THEME) is None:
+                self.atlas = SpriteAtlas.from_folder(gif_folder, smooth=self.SMOOTH_SCALING)
+                self.theme_manager.cache.put(self.THEME, self.atlas)
+            else:
+                if kind == "packed":
+                    print(f"Using packed atlas: {gif_folder}")
+                self.theme_manager.animation_loaded.connect(self.on_animation_loaded)
+                self.atlas = self.theme_manager.load_progressive(
+                    self.THEME, self.STARTUP_ANIMATIONS, smooth=self.SMOOTH_SCALING,
+                    size=self.SPRITE_SIZE, dpr=QApplication.primaryScreen().devicePixelRatio())
+            self.atlas.frame_cache.prefill = self.PREFILL_FRAMES
+            for anim_id in self.atlas.keys():
+                self.animations[anim_id] = anim_id
+            print(f"Total animations loaded: {len(self.animations)} out of 32 "
+                  f"(atlas {self.atlas.image.width()}x{self.atlas.image.height()})")
+            return len(self.animations) > 0
+
         # Load animations and pre-cache them
+        self.movie_frame_cache = FrameCache(self.SMOOTH_SCALING)
+        self.movie_delays = {}  # QMovie -> per-frame delays (ms), for the animation clock
         for i in range(1, 33):
             gif_name = f"{i}.GIF"
             path = os.path.join(gif_folder, gif_name)
@@ -228,11 +420,16 @@ class OnekoWindow(QLabel):
                     movie.setCacheMode(QMovie.CacheMode.CacheAll)  # Cache frames for better performance
                     movie.setSpeed(100)  # Normal speed
                     
-                    # Pre-load the first frame to prevent initialization delays
+                    # Read every frame's delay once, leaving the movie on frame 0.
+                    # The movie is never started: its own timer would tick on
+                    # top of ours
+                    delays = []
+                    for frame in range(max(movie.frameCount(), 1)):
+                        movie.jumpToFrame(frame)
+                        delays.append(movie.nextFrameDelay())
                     movie.jumpToFrame(0)
-                    movie.start()
-                    movie.stop()  # Stop after loading first frame
-                    
+                    self.movie_delays[movie] = delays
+
                     self.animations[i - 1] = movie
                     print(f"Loaded animation {i}")
                 except Exception as e:
@@ -272,7 +469,12 @@ class OnekoWindow(QLabel):
 
         # Then try to use one of the cat GIF frames as an icon
         if not icon_loaded:
-            if hasattr(self, 'animations') and self.animations:
+            if self.atlas is not None and len(self.atlas) > 0:
+                pixmap = QPixmap.fromImage(self.atlas.frame_image(min(self.atlas.keys())))
+                self.tray_icon.setIcon(QIcon(pixmap))
+                icon_loaded = True
+                print("Using cat animation frame as tray icon")
+            elif hasattr(self, 'animations') and self.animations:
                 try:
                     # Use the first animation frame as icon
                     first_animation = list(self.animations.values())[0]
@@ -312,19 +514,53 @@ class OnekoWindow(QLabel):
         self.toggle_action = self.tray_menu.addAction("Hide Kitty")
         self.toggle_action.triggered.connect(self.toggleVisibility)
 
+        # Add theme switcher (the atlas backend swaps themes without a restart)
+        self.theme_menu = self.tray_menu.addMenu("Theme")
+        self.theme_group = QActionGroup(self.theme_menu)
+        self.theme_actions = {}
+        self.populate_theme_menu()
+
+        # Add profile switcher (overrides the config file's profile until restart)
+        self.profile_menu = self.tray_menu.addMenu("Profile")
+        self.profile_group = QActionGroup(self.profile_menu)
+        self.profile_actions = {}
+        for name in PROFILES:
+            action = self.profile_menu.addAction(name.title())
+            action.setCheckable(True)
+            action.setChecked(name == self.settings["profile"])
+            action.triggered.connect(lambda checked, name=name: self.set_profile(name))
+            self.profile_group.addAction(action)
+            self.profile_actions[name] = action
+
+        # Add swarm mode toggle
+        self.swarm_action = self.tray_menu.addAction(f"Swarm of {self.swarm_size}")
+        self.swarm_action.setCheckable(True)
+        self.swarm_action.setEnabled(SWARM_AVAILABLE)
+        self.swarm_action.triggered.connect(self.toggle_swarm)
+
+        # Add performance stats: record, view and export telemetry
+        self.stats_menu = self.tray_menu.addMenu("Performance stats")
+        self.stats_action = self.stats_menu.addAction("Record")
+        self.stats_action.setCheckable(True)
+        self.stats_action.setChecked(self.telemetry.enabled)
+        self.stats_action.triggered.connect(self.telemetry.set_enabled)
+        self.stats_menu.addAction("Show...").triggered.connect(self.show_stats)
+        self.stats_menu.addAction("Export JSON...").triggered.connect(self.export_stats)
+
         # Add separator
         self.tray_menu.addSeparator()
 
-        # Add autostart toggle (platform-specific text)
-        if platform.system() == "Darwin":
-            autostart_text = "Start with macOS"
-        else:
-            autostart_text = "Start with Windows"
-        
-        self.autostart_action = self.tray_menu.addAction(autostart_text)
+        # Add autostart toggle (platform-specific text). Checking and
+        # changing it run in the background; the state is cached
+        self.autostart = AutostartManager(parent=self)
+        self.autostart_action = self.tray_menu.addAction(f"Start {self.autostart.backend.description}")
         self.autostart_action.setCheckable(True)
-        self.autostart_action.setChecked(self.is_autostart_enabled())
+        self.autostart_action.setEnabled(False)  # Until the first check reports back
         self.autostart_action.triggered.connect(self.toggle_autostart)
+        self.autostart.state_changed.connect(self.on_autostart_state)
+        self.autostart.toggled.connect(self.on_autostart_toggled)
+        self.autostart.failed.connect(self.on_autostart_failed)
+        self.autostart.refresh()
 
         # Add separator
         self.tray_menu.addSeparator()
@@ -343,281 +579,588 @@ class OnekoWindow(QLabel):
         self.tray_icon.show()
 
     def toggleVisibility(self):
-        if self.isVisible():
-            self.hide()
+        if self.swarm is not None:
+            self.swarm.setVisible(not self.swarm.visible)
+            if self.compositor is not None:
+                self.compositor.setVisible(self.swarm.visible)
+            self.toggle_action.setText("Hide Kitty" if self.swarm.visible else "Show Kitty")
+            self.set_suspended("hidden", not self.swarm.visible)
+        elif self.cat_visible():
+            self.set_cat_visible(False)
             self.toggle_action.setText("Show Kitty")
+            self.set_suspended("hidden", True)
         else:
-            self.show()
+            self.set_cat_visible(True)
             self.toggle_action.setText("Hide Kitty")
+            self.set_suspended("hidden", False)
 
-    # Add the missing autostart methods from original code
-    def get_launch_agent_path(self):
-        """Get the path for macOS LaunchAgent plist file"""
-        home = Path.home()
-        return home / "Library" / "LaunchAgents" / "com.oneko.plist"
-
-    def get_startup_path(self):
-        """Get the startup path for Windows"""
-        return Path(os.path.expandvars('%APPDATA%\\Microsoft\\Windows\\Start Menu\\Programs\\Startup\\oneko.bat'))
-
-    def is_autostart_enabled(self):
-        """Check if autostart is enabled (cross-platform)"""
-        if platform.system() == "Darwin":
-            return self.get_launch_agent_path().exists()
+    def set_suspended(self, reason, suspended):
+        """Stop all ticking while nobody can see the cat; resuming catches up on the cursor"""
+        was_suspended = bool(self.suspend_reasons)
+        if suspended:
+            self.suspend_reasons.add(reason)
         else:
-            return self.get_startup_path().exists()
+            self.suspend_reasons.discard(reason)
+        if bool(self.suspend_reasons) == was_suspended:
+            return
 
-    def toggle_autostart(self):
-        """Toggle autostart functionality (cross-platform)"""
-        if platform.system() == "Darwin":
-            self.toggle_autostart_mac()
+        if self.suspend_reasons:
+            self.scheduler.stop()
+            self.render_timer.stop()
+            if self.swarm is not None:
+                self.swarm.pause()
+            print(f"Suspended ({', '.join(sorted(self.suspend_reasons))})")
         else:
-            self.toggle_autostart_windows()
+            if self.swarm is not None:
+                self.swarm.resume()
+            else:
+                self.scheduler.start(self.engine.activity())
+                self.on_tick()
+            print("Resumed")
 
-    def toggle_autostart_mac(self):
-        """Handle autostart for macOS using LaunchAgent"""
-        launch_agent_path = self.get_launch_agent_path()
-        
-        if self.autostart_action.isChecked():
-            try:
-                # Create LaunchAgents directory if it doesn't exist
-                launch_agent_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Get the path to the current executable/script
-                if getattr(sys, 'frozen', False):
-                    program_path = sys.executable
-                else:
-                    program_path = os.path.abspath(sys.argv[0])
-                
-                # Create the plist content
-                plist_content = {
-                    'Label': 'com.oneko',
-                    'ProgramArguments': [program_path],
-                    'RunAtLoad': True,
-                    'KeepAlive': False,
-                    'StandardOutPath': '/tmp/oneko.log',
-                    'StandardErrorPath': '/tmp/oneko.log'
-                }
-                
-                # Write the plist file
-                with open(launch_agent_path, 'wb') as f:
-                    plistlib.dump(plist_content, f)
-                
-                # Load the launch agent
-                subprocess.run(['launchctl', 'load', str(launch_agent_path)], 
-                             capture_output=True, text=True)
-                
-                self.tray_icon.showMessage("Oneko", "Will start with macOS")
-            except Exception as e:
-                self.autostart_action.setChecked(False)
-                self.tray_icon.showMessage("Oneko", f"Failed to enable autostart: {str(e)}")
+    def set_low_power(self, low_power):
+        """Low-power tick intervals on battery (with --battery-saver), the profile's on mains"""
+        if low_power == self.low_power:
+            return
+        self.low_power = low_power
+        self.apply_tick_intervals()
+        print(f"Power profile: {'low power (on battery)' if low_power else 'normal'}")
+
+    def apply_tick_intervals(self):
+        """Push the profile's intervals, slowed down further on battery, to every scheduler"""
+        intervals = dict(self.settings["tick_intervals"])
+        if self.low_power:
+            intervals.update(TickScheduler.LOW_POWER_INTERVALS)
+        intervals = intervals or None
+        if intervals == self.tick_intervals:
+            return
+        self.tick_intervals = intervals
+        self.scheduler.set_intervals(intervals)
+        if self.swarm is not None:
+            self.swarm.scheduler.set_intervals(intervals)
+
+    def apply_settings(self, settings):
+        """Apply a changed config live; only what actually changed is touched"""
+        old, self.settings = self.settings, settings
+        print(f"Config: profile {settings['profile']}")
+        if self.profile_actions.get(settings["profile"]) is not None:
+            self.profile_actions[settings["profile"]].setChecked(True)
+
+        self.apply_tick_intervals()
+
+        motion = self.motion_override or settings["motion"]
+        if motion != self.motion:
+            self.motion = motion
+            self.scheduler.fixed_timestep = motion == "smooth"
+            self.scheduler.carry_ms = 0.0
+            # Either way, restart from where the engine has the cat now
+            self.interpolator.reset(self.engine.x, self.engine.y, time.monotonic())
+            self.render_timer.stop()
+            self.move_cat(self.engine.x, self.engine.y)
+
+        # Scaled frames are rebuilt lazily from the already decoded atlas
+        self.SMOOTH_SCALING = settings["scaling"] == "smooth"
+        self.PREFILL_FRAMES = settings["frame_cache"] == "prefill"
+        caches = [self.atlas.frame_cache] if self.atlas is not None else [self.movie_frame_cache]
+        if self.swarm is not None and self.swarm.atlas is not self.atlas:
+            caches.append(self.swarm.atlas.frame_cache)
+        for cache in caches:
+            cache.set_smooth(self.SMOOTH_SCALING)
+            cache.prefill = self.PREFILL_FRAMES
+
+        if settings["sprite_size"] != old["sprite_size"]:
+            self.set_sprite_size(settings["sprite_size"], caches)
+
+        self.TRIGGER_DISTANCE = settings["trigger_distance"]
+        self.CATCH_DISTANCE = settings["catch_distance"]
+        self.NEKO_SPEED = settings["speed"]
+        self.DIG_TIMEOUT = settings["dig_timeout"]
+        engines = [self.engine] + ([self.swarm.swarm] if self.swarm is not None else [])
+        for engine in engines:
+            engine.TRIGGER_DISTANCE = self.TRIGGER_DISTANCE
+            engine.CATCH_DISTANCE = self.CATCH_DISTANCE
+            engine.NEKO_SPEED = self.NEKO_SPEED
+            engine.DIG_TIMEOUT = self.DIG_TIMEOUT
+
+        if settings["palettes"] != old["palettes"]:
+            # New colours for the palette in use are one colour table swap away
+            changed = self.theme_manager.set_palettes(settings["palettes"])
+            self.populate_theme_menu()
+            if self.THEME in changed and self.atlas is not None:
+                self.set_theme(self.THEME if self.THEME in self.theme_manager.themes else "orange_cat")
+
+        theme = settings.get("theme")
+        if theme and theme != old.get("theme") and theme != self.THEME:
+            if theme in self.theme_manager.names():
+                self.set_theme(theme)
+            else:
+                print(f"Ignoring config theme {theme!r}: unknown theme")
+        self.refresh_frame()
+
+    def set_sprite_size(self, size, caches):
+        """Resize every cat; pixmaps for the old size are dropped, not the decoded sprites"""
+        self.SPRITE_SIZE = size
+        self.engine.SPRITE_SIZE = size
+        for cache in caches:
+            cache.clear()
+        if self.shaped:
+            self.atlas.masks.clear()
+            self.atlas.fill_masks(size)
+        if self.atlas is None:
+            for movie in self.movie_delays:
+                movie.setScaledSize(QSize(size, size))
+        if self.sprite is not None:
+            self.sprite.resize(size, size)
         else:
+            self.resize(size, size)
+        if self.swarm is not None:
+            self.swarm.set_sprite_size(size)
+
+    def cat_screen_rect(self):
+        """(x, y, width, height) of the screen the cat is on, for fullscreen checks"""
+        index = self.screen_layout.screen_at(self.engine.x + self.SPRITE_SIZE // 2,
+                                             self.engine.y + self.SPRITE_SIZE // 2)
+        return self.screen_layout.rects[index] if index >= 0 else None
+
+    def populate_theme_menu(self):
+        """(Re)build the Theme menu from the themes and palettes available now"""
+        for action in self.theme_group.actions():
+            self.theme_group.removeAction(action)
+        self.theme_menu.clear()
+        self.theme_actions = {}
+        for name in self.theme_manager.names():
+            action = self.theme_menu.addAction(name.replace("_", " ").title())
+            action.setCheckable(True)
+            action.setChecked(name == self.THEME)
+            action.triggered.connect(lambda checked, name=name: self.set_theme(name))
+            self.theme_group.addAction(action)
+            self.theme_actions[name] = action
+        self.theme_menu.setEnabled(self.atlas is not None)
+
+    def set_profile(self, name):
+        """Switch profile; returns a control reply, with a warning if the config file was ignored"""
+        try:
+            problem = self.config.set_profile(name)
+        except ValueError as e:
+            print(f"Can't switch to profile {name}: {e}")
+            if self.settings["profile"] in self.profile_actions:
+                self.profile_actions[self.settings["profile"]].setChecked(True)  # Keep showing what is in use
+            return {"ok": False, "error": str(e)}
+        if problem:
+            print(f"Ignoring config: {problem}")
+            return {"ok": True, "warning": f"config file ignored: {problem}"}
+        return {"ok": True}
+
+    def handle_control(self, request):
+        """Answer one request from the control socket (see control.py)"""
+        command = request.get("command")
+        name = request.get("name")
+        if command == "launch":
             try:
-                # Unload the launch agent
-                if launch_agent_path.exists():
-                    subprocess.run(['launchctl', 'unload', str(launch_agent_path)], 
-                                 capture_output=True, text=True)
-                    launch_agent_path.unlink()
-                
-                self.tray_icon.showMessage("Oneko", "Won't start with macOS")
-            except Exception as e:
-                self.autostart_action.setChecked(True)
-                self.tray_icon.showMessage("Oneko", f"Failed to disable autostart: {str(e)}")
-
-    def toggle_autostart_windows(self):
-        """Handle autostart for Windows (original functionality)"""
-        startup_path = self.get_startup_path()
-        if self.autostart_action.isChecked():
-            try:
-                # If we're running from exe, use sys.executable
-                # Otherwise use the script path
-                exe_path = sys.executable if getattr(sys, 'frozen', False) else sys.argv[0]
-                with open(startup_path, 'w') as f:
-                    f.write(f'start "" "{exe_path}"')
-                self.tray_icon.showMessage("Oneko", "Will start with Windows")
-            except Exception as e:
-                self.autostart_action.setChecked(False)
-                self.tray_icon.showMessage("Oneko", "Failed to enable autostart")
+                reply = self.handle_launch(request.get("argv", []))
+            except SystemExit:  # argparse gives up on bad arguments by exiting
+                return {"ok": False, "error": "bad arguments"}
+            if reply is not None:
+                return reply
+        elif command == "pause":
+            self.set_suspended("paused", True)
+        elif command == "resume":
+            self.set_suspended("paused", False)
+        elif command == "profile":
+            return self.set_profile(name)
+        elif command == "theme":
+            if self.atlas is None:
+                return {"ok": False, "error": "theme switching needs the atlas backend"}
+            if name not in self.theme_manager.names():
+                return {"ok": False, "error": f"unknown theme {name!r}"}
+            self.set_theme(name)
+        elif command == "stats":
+            extra = dict(self.stats_extra(), recording=self.telemetry.enabled, theme=self.THEME,
+                         profile=self.settings["profile"], suspended=sorted(self.suspend_reasons))
+            return {"ok": True, "stats": self.telemetry.snapshot(extra)}
+        elif command == "quit":
+            QTimer.singleShot(0, QApplication.instance().quit)
         else:
-            try:
-                if startup_path.exists():
-                    startup_path.unlink()
-                self.tray_icon.showMessage("Oneko", "Won't start with Windows")
-            except Exception as e:
-                self.autostart_action.setChecked(True)
-                self.tray_icon.showMessage("Oneko", "Failed to disable autostart")
-
-    def get_virtual_desktop_geometry(self):
-        app = QApplication.instance()
-        screens = app.screens()
-        
-        if not screens:
-            return QApplication.primaryScreen().geometry()
-        
-        min_x = min(screen.geometry().x() for screen in screens)
-        min_y = min(screen.geometry().y() for screen in screens)
-        max_x = max(screen.geometry().x() + screen.geometry().width() for screen in screens)
-        max_y = max(screen.geometry().y() + screen.geometry().height() for screen in screens)
-        
-        from PyQt6.QtCore import QRect
-        return QRect(min_x, min_y, max_x - min_x, max_y - min_y)
+            return {"ok": False, "error": f"unknown command {command!r}"}
+        return {"ok": True}
 
-    def is_cursor_on_screen(self):
-        cursor_pos = QCursor.pos()
-        app = QApplication.instance()
-        screens = app.screens()
-        
-        for screen in screens:
-            if screen.geometry().contains(cursor_pos):
-                return True
-        return False
+    def handle_launch(self, argv):
+        """Another launch handed us its arguments: show the cat and take its theme and profile.
+
+        Returns the failed reply of a profile or theme it couldn't take, else None.
+        """
+        args, _ = parse_args(["oneko"] + argv)
+        print(f"Another launch: {' '.join(argv) or 'no arguments'}")
+        if "hidden" in self.suspend_reasons:
+            self.toggleVisibility()
+        requests = []
+        if args.profile and args.profile != self.settings["profile"]:
+            requests.append({"command": "profile", "name": args.profile})
+        if args.theme and args.theme != self.THEME:
+            requests.append({"command": "theme", "name": args.theme})
+        failed = None
+        for request in requests:
+            reply = self.handle_control(request)
+            if not reply["ok"]:
+                print(f"Another launch: {reply['error']}")
+                failed = failed or reply
+        return failed
 
-    def get_screen_edge(self):
-        cursor_pos = QCursor.pos()
-        virtual_desktop = self.get_virtual_desktop_geometry()
+    def set_theme(self, name):
+        """Switch theme; decoding happens in the background and the swap is atomic"""
+        if self.atlas is None:
+            print("Theme switching needs the atlas backend")
+            return
+        self.theme_manager.request(name)
 
-        dist_top = abs(cursor_pos.y() - virtual_desktop.top())
-        dist_bottom = abs(cursor_pos.y() - virtual_desktop.bottom())
-        dist_left = abs(cursor_pos.x() - virtual_desktop.left())
-        dist_right = abs(cursor_pos.x() - virtual_desktop.right())
+    def apply_theme(self, name, atlas):
+        """Swap in a fully decoded theme atlas in one go"""
+        self.THEME = name
+        self.atlas = atlas
+        atlas.frame_cache.set_smooth(self.SMOOTH_SCALING)
+        atlas.frame_cache.prefill = self.PREFILL_FRAMES
+        if self.shaped:
+            atlas.fill_masks(self.SPRITE_SIZE)
+        self.animations = {anim_id: anim_id for anim_id in atlas.keys()}
+        self.engine.available = set(self.animations)
+        if self.current_movie is not None and self.current_movie not in atlas:
+            self.current_movie = None
+        self.frame_index = 0
+        self.frame_elapsed = 0
 
-        min_dist = min(dist_top, dist_bottom, dist_left, dist_right)
-        
-        if min_dist == dist_top:
-            return "up", (16, 17)
-        elif min_dist == dist_bottom:
-            return "down", (20, 21)
-        elif min_dist == dist_left:
-            return "left", (22, 23)
-        else:
-            return "right", (18, 19)
-
-    def update_state(self):
-        cursor_pos = QCursor.pos()
-        cat_pos = self.pos() + QPoint(self.SPRITE_SIZE // 2, self.SPRITE_SIZE // 2)
-
-        dx = cursor_pos.x() + self.OFFSET_X - cat_pos.x()
-        dy = cursor_pos.y() + self.OFFSET_Y - cat_pos.y()
-        distance = math.sqrt(dx * dx + dy * dy)
-
-        if not self.is_cursor_on_screen():
-            if self.state != self.DIGGING:
-                self.state = self.DIGGING
-                self.dig_timer = 0
-                self.dig_direction, _ = self.get_screen_edge()
-            self.handle_digging()
+        if self.sprite is not None:
+            self.sprite.set_atlas(atlas)
+        if self.swarm is not None:
+            self.swarm.set_atlas(atlas)
+        if name in self.theme_actions:
+            self.theme_actions[name].setChecked(True)
+        self.refresh_frame()
+        print(f"Theme: {name} ({len(self.theme_manager.cache.entries)} cached, "
+              f"{self.theme_manager.cache.total_bytes() // 1024} KiB)")
+
+    def on_animation_loaded(self, name, anim_id):
+        """A background-decoded animation has been added to a theme's atlas"""
+        if name != self.THEME or self.atlas is None:
             return
+        self.animations[anim_id] = anim_id
+        self.engine.available.add(anim_id)
+        if self.shaped:
+            self.atlas.fill_masks(self.SPRITE_SIZE)  # Only the new animation's masks are built
+        if self.swarm is not None and self.swarm.atlas is self.atlas:
+            self.swarm.swarm.available[anim_id] = True
 
-        if distance < self.CATCH_DISTANCE:
-            if self.state != self.IDLE:
-                self.state = self.IDLE
-                self.idle_timer = 0
-                self.current_idle_action = 'sit'
-                self.idle_action_counter = 0
-                if 24 in self.animations:
-                    self.setNekoMovie(self.animations[24])
-            self.handle_idle_animations()
+    def mark_first_frame(self):
+        """Record how long it took from process start to the first painted cat"""
+        if self.first_frame_ms is not None:
             return
+        self.first_frame_ms = (time.perf_counter() - STARTED) * 1000
+        if self.compositor is not None:
+            self.compositor.painted.disconnect(self.mark_first_frame)
+        print(f"First frame painted {self.first_frame_ms:.1f} ms after start")
 
-        if (self.state == self.IDLE or self.state == self.DIGGING) and distance > self.TRIGGER_DISTANCE:
-            self.state = self.SURPRISED
-            if 31 in self.animations:
-                self.setNekoMovie(self.animations[31])
-            self.last_update = 5
+    def stats_extra(self):
+        """What the window adds to telemetry: time and wakeups per state, frame skips"""
+        return {
+            "states": self.scheduler.stats(),
+            "frame_skips": self.frame_skip_count,
+            "first_frame_ms": self.first_frame_ms,
+        }
+
+    def log_stats(self):
+        if self.telemetry.enabled:
+            print(f"Stats: {self.telemetry.summary()}")
+
+    def show_stats(self):
+        if not self.telemetry.enabled:
+            QMessageBox.information(None, "Performance stats",
+                                    "Recording is off. Enable Performance stats > Record first.")
+            return
+        box = QMessageBox(QMessageBox.Icon.Information, "Performance stats", self.telemetry.summary())
+        box.setDetailedText(json.dumps(self.telemetry.snapshot(self.stats_extra()), indent=2))
+        box.exec()
+
+    def export_stats(self):
+        path, _ = QFileDialog.getSaveFileName(
+            None, "Export performance stats", str(Path.home() / "oneko-stats.json"), "JSON (*.json)")
+        if not path:
             return
+        try:
+            self.telemetry.export_json(path, self.stats_extra())
+            print(f"Exported stats to {path}")
+        except OSError as e:
+            print(f"Failed to export stats: {e}")
+
+    def on_theme_failed(self, name, message):
+        print(f"Failed to load theme {name}: {message}")
+        if self.THEME in self.theme_actions:
+            self.theme_actions[self.THEME].setChecked(True)  # Keep showing what is really in use
+
+    def cat_visible(self):
+        if self.compositor is not None:
+            return self.compositor.visible and self.sprite.visible
+        return self.isVisible()
+
+    def set_cat_visible(self, visible):
+        if self.compositor is not None:
+            self.sprite.setVisible(visible)
+            self.compositor.setVisible(visible or self.swarm is not None)
+        else:
+            self.setVisible(visible)
 
-        if self.state == self.SURPRISED:
-            self.last_update -= 1
-            if self.last_update <= 0:
-                self.state = self.CHASING
-
-        if self.state == self.CHASING:
-            if distance > 0:
-                angle = math.atan2(dy, dx)
-                move_x = round((dx / distance) * self.NEKO_SPEED)
-                move_y = round((dy / distance) * self.NEKO_SPEED)
-
-                new_pos = self.pos() + QPoint(move_x, move_y)
-                self.move(new_pos)
-
-                degrees = math.degrees(angle)
-                self.current_frame = (self.current_frame + 1) % 2
-                self.set_direction_animation(degrees)
-
-    def handle_digging(self):
-        self.dig_timer += 1
-        _, frames = self.get_screen_edge()
-
-        frame_idx = frames[self.dig_timer % 2]
-        if frame_idx in self.animations:
-            self.setNekoMovie(self.animations[frame_idx])
-
-        if self.dig_timer >= self.DIG_TIMEOUT:
-            self.state = self.IDLE
-            self.idle_timer = 301
-            self.current_idle_action = 'sleep'
-            self.idle_action_counter = 0
-
-    def handle_idle_animations(self):
-        self.idle_timer += 1
-
-        if self.idle_timer % 100 == 0:
-            if self.current_idle_action == 'sit':
-                if random.random() < 0.15:
-                    self.current_idle_action = 'wash'
-                    self.idle_action_counter = 0
-                elif self.idle_timer > 300 and random.random() < (0.5 if self.state == self.DIGGING else 0.1):
-                    self.current_idle_action = 'sleep'
-                    self.idle_action_counter = 0
-            elif self.current_idle_action == 'wash':
-                if self.idle_action_counter > 30:
-                    self.current_idle_action = 'sit'
-                    self.idle_action_counter = 0
-
-        if self.current_idle_action == 'sit':
-            if 24 in self.animations:
-                self.setNekoMovie(self.animations[24])
-        elif self.current_idle_action == 'wash':
-            self.idle_action_counter += 1
-            frame_idx = 24 + (self.idle_timer // 3 % 2)
-            if frame_idx in self.animations:
-                self.setNekoMovie(self.animations[frame_idx])
-        elif self.current_idle_action == 'sleep':
-            self.idle_action_counter += 1
-            if self.idle_action_counter < 20:
-                if 26 in self.animations:
-                    self.setNekoMovie(self.animations[26])
+    def toggle_swarm(self):
+        """Swap the single cat for a batched swarm of cats, or back"""
+        if self.swarm_action.isChecked() and self.swarm is None:
+            from swarm_window import SwarmController
+            atlas = self.atlas
+            if atlas is None:
+                # The swarm always draws from an atlas, even with the QMovie backend
+                atlas = SpriteAtlas.from_folder(self.gif_folder, smooth=self.SMOOTH_SCALING)
+                atlas.frame_cache.prefill = self.PREFILL_FRAMES
+            self.scheduler.stop()
+            was_visible = self.cat_visible()
+            self.set_cat_visible(False)
+            if self.compositor is not None:
+                # Every swarm cat becomes one more sprite on the same overlays
+                view_factory = lambda: self.compositor.add_sprite(atlas, self.SPRITE_SIZE)
+                self.compositor.setVisible(was_visible)
             else:
-                frame_idx = 28 + (self.idle_timer // 5 % 2)
-                if frame_idx in self.animations:
-                    self.setNekoMovie(self.animations[frame_idx])
+                view_factory = None
+            self.swarm = SwarmController(
+                self.swarm_size, atlas, self.screen_layout, self.windowFlags(),
+                view_factory=view_factory,
+                cursor=self.cursor,
+                telemetry=self.telemetry,
+                sprite_size=self.SPRITE_SIZE,
+                shaped=self.shaped,
+                trigger_distance=self.TRIGGER_DISTANCE,
+                catch_distance=self.CATCH_DISTANCE,
+                offset_x=self.OFFSET_X,
+                offset_y=self.OFFSET_Y,
+                speed=self.NEKO_SPEED,
+                dig_timeout=self.DIG_TIMEOUT,
+            )
+            self.swarm.visible = was_visible
+            self.swarm.scheduler.set_intervals(self.tick_intervals)
+            self.swarm.start()
+            if self.suspend_reasons:
+                self.swarm.pause()
+        elif not self.swarm_action.isChecked() and self.swarm is not None:
+            visible = self.swarm.visible
+            self.swarm.stop()
+            self.swarm.deleteLater()
+            self.swarm = None
+            self.set_cat_visible(visible)
+            if not self.suspend_reasons:
+                self.scheduler.start(self.engine.activity())
 
-    def set_direction_animation(self, degrees):
-        frame_idx = None
-        
-        if -22.5 <= degrees <= 22.5:  # Right
-            frame_idx = 4 + self.current_frame
-        elif 22.5 < degrees <= 67.5:  # Down-Right
-            frame_idx = 6 + self.current_frame
-        elif 67.5 < degrees <= 112.5:  # Down
-            frame_idx = 8 + self.current_frame
-        elif 112.5 < degrees <= 157.5:  # Down-Left
-            frame_idx = 10 + self.current_frame
-        elif degrees > 157.5 or degrees <= -157.5:  # Left
-            frame_idx = 12 + self.current_frame
-        elif -157.5 < degrees <= -112.5:  # Up-Left
-            frame_idx = 14 + self.current_frame
-        elif -112.5 < degrees <= -67.5:  # Up
-            frame_idx = 0 + self.current_frame
-        elif -67.5 < degrees <= -22.5:  # Up-Right
-            frame_idx = 2 + self.current_frame
-            
-        if frame_idx is not None and frame_idx in self.animations:
-            self.setNekoMovie(self.animations[frame_idx])
+    # Add the missing autostart methods from original code
+    def toggle_autostart(self, checked):
+        """Ask the backend to switch autostart; the action is re-enabled when it reports back"""
+        self.autostart_action.setEnabled(False)
+        self.autostart.set_enabled(checked)
+
+    def on_autostart_state(self, enabled):
+        self.autostart_action.setChecked(enabled)
+        self.autostart_action.setEnabled(True)
+
+    def on_autostart_toggled(self, enabled):
+        description = self.autostart.backend.description
+        self.tray_icon.showMessage("Oneko", f"Will start {description}" if enabled else f"Won't start {description}")
+
+    def on_autostart_failed(self, message):
+        print(message)
+        self.tray_icon.showMessage("Oneko", message)
+        self.on_autostart_state(bool(self.autostart.enabled))  # Show what is really in effect
+
+    def watch_screens(self):
+        """Keep self.screen_layout in sync with screens being added, removed or changed"""
+        app = QApplication.instance()
+        app.screenAdded.connect(self.on_screen_added)
+        app.screenRemoved.connect(self.on_screen_removed)
+        for screen in app.screens():
+            screen.geometryChanged.connect(self.rebuild_screen_layout)
+        self.rebuild_screen_layout()
+
+    def on_screen_added(self, screen):
+        screen.geometryChanged.connect(self.rebuild_screen_layout)
+        self.rebuild_screen_layout()
+
+    def on_screen_removed(self, screen):
+        self.rebuild_screen_layout(exclude=screen)
+
+    def rebuild_screen_layout(self, *args, exclude=None):
+        screens = [s for s in QApplication.instance().screens() if s is not exclude]
+        self.screen_layout = ScreenLayout.from_screens(screens)
+        if self.trace is not None:
+            self.trace.write_layout(self.screen_layout.rects)
+        self.engine.screen_layout = self.screen_layout
+        if getattr(self, 'swarm', None) is not None:
+            self.swarm.screen_layout = self.screen_layout
+        if self.compositor is not None:
+            self.compositor.sync_screens(screens)
+        print(f"Screen layout: {len(self.screen_layout)} screen(s), virtual desktop {self.screen_layout.virtual_geometry()}")
+
+    def place(self, x, y):
+        """Move the cat, keeping the engine and the window in sync"""
+        self.engine.place(x, y)
+        self.interpolator.reset(x, y, time.monotonic())
+        self.render_timer.stop()
+        self.move_cat(x, y)
+
+    def move_cat(self, x, y):
+        if self.sprite is not None:
+            self.sprite.move(x, y)  # Partial repaint of the overlay
+        elif x != self.x() or y != self.y():
+            self.move(x, y)
+
+    def interpolate_to(self, x, y):
+        """Smooth motion: glide to the engine's new position over the next step"""
+        if (x, y) == self.interpolator.current:
+            return  # Nothing changed; no render frames needed
+        self.interpolator.push(x, y, time.monotonic())
+        if not self.render_timer.isActive():
+            screen = QApplication.screenAt(QPoint(x, y)) or QApplication.primaryScreen()
+            self.render_timer.start(max(1, round(1000 / (screen.refreshRate() or 60))))
+        self.on_render()
+
+    def on_render(self):
+        """One display frame of smooth motion; skipped when the position is unchanged"""
+        now = time.monotonic()
+        x, y = self.interpolator.position(now)
+        self.move_cat(x, y)  # Already a no-op when nothing moved
+        if not self.interpolator.moving(now):
+            self.render_timer.stop()
+
+    def close_trace(self):
+        self.trace.close()
+        print(f"Recorded {self.trace.samples} cursor samples to {self.trace.file.name}")
+
+    def on_cursor_moved(self):
+        """Event-driven cursor sources: react now instead of at the next slow tick"""
+        if self.swarm is None and self.timer.isActive() and self.scheduler.should_wake():
+            self.on_tick()
+
+    def on_tick(self):
+        """Timer wakeup: run every base tick that elapsed, repaint once, pick the next interval"""
+        steps = self.scheduler.begin_tick()
+        telemetry = self.telemetry
+        shown_movie, shown_frame = self.current_movie, self.frame_index
+        catching_up = self.engine.state == self.IDLE
+        cursor = self.cursor.snapshot()  # The only cursor read this tick
+        if self.trace is not None:
+            self.trace.write_sample((cursor.t - self.trace_started) * 1000, cursor.x, cursor.y)
+        for _ in range(steps):
+            if telemetry.enabled:
+                start = time.perf_counter()
+                self.update_state(cursor)
+                telemetry.observe("update_state", time.perf_counter() - start)
+            else:
+                self.update_state(cursor)
+            if catching_up and self.engine.state != self.IDLE:
+                break  # Cursor moved away; no more catching up
+
+        # This timer is the only animation clock: sprite frames advance by
+        # the same elapsed base ticks as the logic, and a tick that changed
+        # what is shown triggers exactly one repaint
+        if self.current_movie == shown_movie:
+            self.advance_frame(steps * self.scheduler.base_interval)
+        if self.current_movie != shown_movie or self.frame_index != shown_frame:
+            self.refresh_frame()
+        self.scheduler.reschedule(self.engine.activity())
+
+    def update_state(self, cursor=None):
+        """Run one engine step against a cursor snapshot and show the result"""
+        if cursor is None:
+            cursor = self.cursor.snapshot()
+        x, y, animation = self.engine.step(cursor.x, cursor.y)
+
+        if self.motion == "smooth":
+            self.interpolate_to(x, y)
+        else:
+            self.move_cat(x, y)
+        if animation is not None:
+            self.setNekoMovie(self.animations[animation])
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Desktop cat that chases your cursor")
+    parser.add_argument("--backend", choices=["atlas", "movie"], default="atlas",
+                        help="sprite backend: packed atlas (default) or one QMovie per GIF")
+    parser.add_argument("--cats", type=int, default=1,
+                        help="number of cats; more than one starts in swarm mode (needs NumPy)")
+    parser.add_argument("--theme", default=None,
+                        help="theme to start with, e.g. orange_cat or classic (default: orange_cat)")
+    parser.add_argument("--render", choices=["window", "overlay"], default="window",
+                        help="move a small window per cat (default) or draw on one overlay per screen")
+    parser.add_argument("--stats", action="store_true",
+                        help="record performance telemetry from startup (see the tray menu)")
+    parser.add_argument("--stats-log", type=float, default=0, metavar="SECONDS",
+                        help="print a telemetry line every SECONDS (implies --stats)")
+    parser.add_argument("--motion", choices=["step", "smooth"], default=None,
+                        help="move the cat once per 60 ms logic step or interpolate between steps "
+                             "at the screen's refresh rate (default: from the profile)")
+    parser.add_argument("--cursor", choices=["auto", "qt", "x11"], default="auto",
+                        help="pointer source: poll QCursor (qt), or add X11 XInput2 motion events "
+                             "so idle cats wake as soon as the pointer moves (x11; auto on X11)")
+    parser.add_argument("--record-trace", metavar="PATH",
+                        help="record the cursor and screen layout of this session to a binary trace "
+                             "(replay it with benchmarks/bench_replay.py)")
+    parser.add_argument("--battery-saver", action="store_true",
+                        help="tick less often while running on battery (Linux, read from /sys/class/power_supply)")
+    parser.add_argument("--profile", default=None,
+                        help="performance profile: eco, balanced, smooth or one defined in the config "
+                             "file, overriding the file's choice (default: balanced)")
+    parser.add_argument("--config", metavar="PATH", default=None,
+                        help="config file to read and watch (default: $XDG_CONFIG_HOME/oneko/config.json)")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="start another cat even if Oneko is running (it won't answer onekoctl.py)")
+    parser.add_argument("--shape", choices=["auto", "alpha", "mask"], default="auto",
+                        help="see-through window (alpha), or an opaque one cut to each frame's 1-bit "
+                             "mask for X11 without a compositor (mask; auto picks it there)")
+    # Leave anything we don't know about (e.g. Qt's own -platform) for QApplication
+    return parser.parse_known_args(argv[1:])
+
+
+def hand_over(argv):
+    """Pass our arguments to the running instance: its reply, or None if none is listening.
+
+    Exits if one holds the socket but doesn't answer, as a hung cat would.
+    """
+    try:
+        return send_control({"command": "launch", "argv": argv})
+    except (TimeoutError, ConnectionError) as e:
+        sys.exit(f"{e}. Quit or kill it and launch again, or start another cat with --new-instance")
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv)
+    # Already running (e.g. autostart plus a manual launch): hand over our
+    # arguments before paying for a QApplication or any decoding
+    reply = None if args.new_instance else hand_over(sys.argv[1:])
+    if reply is not None:
+        if not reply.get("ok"):
+            print(f"Oneko is already running but didn't take the arguments: {reply.get('error')}")
+            sys.exit(1)
+        print("Oneko is already running; passed the arguments on to it")
+        sys.exit(0)
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setQuitOnLastWindowClosed(False)
-    window = OnekoWindow()
+    control = None
+    if not args.new_instance:
+        control = ControlServer(lambda request: window.handle_control(request))
+        if not control.listen():  # Lost a race with another launch
+            reply = hand_over(sys.argv[1:])
+            if reply is None or not reply.get("ok"):
+                error = "it stopped answering" if reply is None else reply.get("error")
+                print(f"Oneko is already running but didn't take the arguments: {error}")
+                sys.exit(1)
+            sys.exit(0)
+        app.aboutToQuit.connect(control.close)
+    window = OnekoWindow(backend=args.backend, cats=args.cats, render=args.render, theme=args.theme,
+                         stats=args.stats, stats_log=args.stats_log, motion=args.motion,
+                         cursor=args.cursor, record_trace=args.record_trace,
+                         battery_saver=args.battery_saver, profile=args.profile,
+                         config_path=args.config, shape=args.shape)
+    if not window.ready:
+        sys.exit(1)
     sys.exit(app.exec())
\ No newline at end of file
@@ -8,6 +8,7 @@ a = Analysis(
     binaries=[],
     datas=[
         ('theme_orange_cat', 'theme_orange_cat'),
+        ('gif', 'gif'),  # The classic theme, and the sprites every palette theme is recoloured from
         ('oneko.icns', '.'),
         ('oneko.ico', '.'),
     ],
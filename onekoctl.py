@@ -0,0 +1,48 @@
+"""Control the running Oneko from the command line, without starting another one.
+
+    python onekoctl.py pause | resume | quit
+    python onekoctl.py profile eco
+    python onekoctl.py theme ghost_cat
+    python onekoctl.py stats > stats.json
+
+Talks to the instance over the socket in control.py. Exits 1 if the
+command failed and 2 if no Oneko is running.
+"""
+import sys
+import json
+import argparse
+
+from control import send
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("pause", help="stop all ticking; the cat stays where it is")
+    commands.add_parser("resume", help="start ticking again")
+    commands.add_parser("quit", help="quit Oneko")
+    commands.add_parser("profile", help="switch performance profile").add_argument("name")
+    commands.add_parser("theme", help="switch theme").add_argument("name")
+    commands.add_parser("stats", help="print telemetry and state as JSON")
+    args = parser.parse_args()
+
+    request = {"command": args.command}
+    if "name" in args:
+        request["name"] = args.name
+    try:
+        reply = send(request)
+    except (TimeoutError, ConnectionError) as e:
+        sys.exit(f"onekoctl: {e}")
+    if reply is None:
+        print("onekoctl: Oneko is not running", file=sys.stderr)
+        sys.exit(2)
+    if not reply.get("ok"):
+        sys.exit(f"onekoctl: {reply.get('error', 'failed')}")
+    if reply.get("warning"):
+        print(f"onekoctl: warning: {reply['warning']}", file=sys.stderr)
+    if args.command == "stats":
+        print(json.dumps(reply["stats"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import time
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QObject, QRect, QSize, pyqtSignal
+from PyQt6.QtGui import QPainter
+
+
+class OverlaySprite:
+    """One cat drawn by the compositor: a global position and an atlas frame"""
+
+    def __init__(self, compositor, atlas, size):
+        self.compositor = compositor
+        self.atlas = atlas
+        self.rect = QRect(0, 0, size, size)  # Global (virtual desktop) coordinates
+        self.animation = -1
+        self.frame_index = 0
+        self.visible = True
+
+    def move(self, x, y):
+        if x == self.rect.x() and y == self.rect.y():
+            return
+        old = QRect(self.rect)
+        self.rect.moveTo(x, y)
+        # Old and new bounds are both dirty; everything else stays as painted
+        self.compositor.invalidate(old)
+        self.compositor.invalidate(self.rect)
+
+    def set_atlas(self, atlas):
+        self.atlas = atlas
+        self.compositor.invalidate(self.rect)
+
+    def resize(self, width, height):
+        old = QRect(self.rect)
+        self.rect.setSize(QSize(width, height))
+        self.compositor.invalidate(old)
+        self.compositor.invalidate(self.rect)
+
+    def set_animation(self, animation, frame_index=0):
+        if animation == self.animation and frame_index == self.frame_index:
+            return
+        self.animation = animation
+        self.frame_index = frame_index
+        self.compositor.invalidate(self.rect)
+
+    def setVisible(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.compositor.invalidate(self.rect)
+
+    def hide(self):
+        self.setVisible(False)
+
+    def deleteLater(self):
+        self.compositor.remove_sprite(self)
+
+    def draw(self, painter, origin):
+        """Draw this sprite if it is showing anything; returns whether it did"""
+        if not self.visible or self.animation not in self.atlas:
+            return False
+        pixmap = self.atlas.scaled_pixmap(self.animation, self.frame_index, self.rect.width(),
+                                          painter.device().devicePixelRatioF())
+        painter.drawPixmap(self.rect.x() - origin.x(), self.rect.y() - origin.y(), pixmap)
+        return True
+
+
+class OverlayWindow(QWidget):
+    """Transparent, click-through window covering exactly one screen"""
+
+    def __init__(self, compositor, geometry):
+        super().__init__()
+        self.compositor = compositor
+        self.setWindowFlags(
+            Qt.WindowType.FramelessWindowHint
+            | Qt.WindowType.WindowStaysOnTopHint
+            | Qt.WindowType.Tool
+            | Qt.WindowType.WindowTransparentForInput
+            | Qt.WindowType.WindowDoesNotAcceptFocus
+        )
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.setGeometry(geometry)
+
+    def paintEvent(self, event):
+        # Only the dirty rects are cleared and redrawn
+        telemetry = self.compositor.telemetry
+        start = time.perf_counter() if telemetry is not None and telemetry.enabled else None
+        painter = QPainter(self)
+        dirty = event.rect()
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+        painter.fillRect(dirty, Qt.GlobalColor.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+
+        origin = self.geometry().topLeft()
+        dirty_global = dirty.translated(origin)
+        drawn = False
+        for sprite in self.compositor.sprites:
+            if sprite.rect.intersects(dirty_global):
+                drawn = sprite.draw(painter, origin) or drawn
+        painter.end()
+        if start is not None:
+            telemetry.observe("paint", time.perf_counter() - start)
+            telemetry.count("repaints")
+        if drawn:
+            self.compositor.painted.emit()
+
+
+class OverlayCompositor(QObject):
+    """Draws any number of cats on one full-screen overlay per screen.
+
+    Moving a cat repaints only its old and new bounds on the overlays they
+    touch, instead of moving (and recompositing) a top-level window.
+    """
+
+    painted = pyqtSignal()  # An overlay repaint drew at least one sprite
+
+    def __init__(self):
+        super().__init__()
+        self.sprites = []
+        self.overlays = []
+        self.visible = True
+        self.telemetry = None  # Optional Telemetry for paint timings
+
+    def sync_screens(self, screens):
+        """Recreate the overlays to match the given QScreens"""
+        for overlay in self.overlays:
+            overlay.hide()
+            overlay.deleteLater()
+        self.overlays = [OverlayWindow(self, screen.geometry()) for screen in screens]
+        if self.visible:
+            for overlay in self.overlays:
+                overlay.show()
+
+    def add_sprite(self, atlas, size):
+        sprite = OverlaySprite(self, atlas, size)
+        self.sprites.append(sprite)
+        return sprite
+
+    def remove_sprite(self, sprite):
+        if sprite in self.sprites:
+            self.sprites.remove(sprite)
+            self.invalidate(sprite.rect)
+
+    def invalidate(self, rect):
+        """Schedule a repaint of a global rect on every overlay it touches"""
+        if not self.visible:
+            return
+        for overlay in self.overlays:
+            geometry = overlay.geometry()
+            if geometry.intersects(rect):
+                overlay.update(rect.translated(-geometry.x(), -geometry.y()))
+
+    def setVisible(self, visible):
+        self.visible = visible
+        for overlay in self.overlays:
+            overlay.setVisible(visible)
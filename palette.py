@@ -0,0 +1,65 @@
+"""Palette themes: the raw sprites recoloured by swapping an 8-bit colour table.
+
+The sprites in gif/ use a handful of colours, so they are decoded once
+into an indexed atlas (SpriteAtlas.to_indexed) and every palette theme is
+that same atlas with its colour table recoloured the way theme_builder.py
+recolours GIF files: near-black becomes the edge colour, then near-white
+the body colour. A palette theme costs no decoding, no files and a 1 byte
+per pixel sheet.
+
+The colour maths here is shared with theme_builder.py, so a palette and
+a built theme_<name>/ folder with the same colours look the same.
+"""
+import math
+
+
+DEFAULT_EDGE_FUZZ = 8    # percent, like "-fuzz 8% -opaque black"
+DEFAULT_BODY_FUZZ = 12   # percent, like "-fuzz 12% -opaque white"
+
+# Built-in palettes; a theme_<name>/ folder or packed atlas of the same name wins
+PALETTES = {
+    "orange_cat": {"edge": "#000000", "body": "#FED883"},
+    "grey_cat": {"edge": "#000000", "body": "#B8B8B8"},
+    "ghost_cat": {"edge": "#6C7A89", "body": "#EEF3F8"},
+}
+
+
+def parse_color(value):
+    value = value.lstrip("#")
+    if len(value) != 6 or any(c not in "0123456789abcdefABCDEF" for c in value):
+        raise ValueError(f"expected #RRGGBB, got {value!r}")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def within_fuzz(color, target, fuzz_percent):
+    """ImageMagick-style fuzzy match: RGB distance as a percentage of the maximum"""
+    distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(color, target)) / 3)
+    return distance <= fuzz_percent / 100 * 255
+
+
+def recolor(color, params):
+    # Applied in the same order as the two -opaque passes in theme_generator.sh
+    if within_fuzz(color, (0, 0, 0), params["edge_fuzz"]):
+        color = tuple(params["edge"])
+    if within_fuzz(color, (255, 255, 255), params["body_fuzz"]):
+        color = tuple(params["body"])
+    return color
+
+
+def palette_params(edge, body, edge_fuzz=DEFAULT_EDGE_FUZZ, body_fuzz=DEFAULT_BODY_FUZZ):
+    """Recolour parameters from "#RRGGBB" edge and body colours; raises ValueError"""
+    return {"edge": list(parse_color(edge)), "body": list(parse_color(body)),
+            "edge_fuzz": edge_fuzz, "body_fuzz": body_fuzz}
+
+
+def recolor_table(table, params):
+    """Recolour a QImage colour table (0xAARRGGBB ints); see-through entries are kept"""
+    recolored = []
+    for argb in table:
+        alpha = argb >> 24
+        if alpha == 0:
+            recolored.append(argb)
+            continue
+        r, g, b = recolor(((argb >> 16) & 0xFF, (argb >> 8) & 0xFF, argb & 0xFF), params)
+        recolored.append(alpha << 24 | r << 16 | g << 8 | b)
+    return recolored
@@ -0,0 +1,55 @@
+class ScreenLayout:
+    """Snapshot of the monitor layout used by the per-tick screen queries.
+
+    Holds plain (x, y, width, height) tuples so it can be shared with code
+    that does not depend on Qt. Edges follow QRect conventions: right and
+    bottom are the last pixel inside, not one past it.
+    """
+
+    def __init__(self, rects):
+        self.rects = tuple((int(x), int(y), int(w), int(h)) for x, y, w, h in rects if w > 0 and h > 0)
+        self._last_hit = 0  # Cursor usually stays on the same screen between ticks
+
+        if self.rects:
+            self.left = min(x for x, _, _, _ in self.rects)
+            self.top = min(y for _, y, _, _ in self.rects)
+            self.right = max(x + w for x, _, w, _ in self.rects) - 1
+            self.bottom = max(y + h for _, y, _, h in self.rects) - 1
+        else:
+            self.left = self.top = 0
+            self.right = self.bottom = -1
+
+    @classmethod
+    def from_screens(cls, screens):
+        """Build a layout from QScreen objects (or anything with geometry())"""
+        rects = []
+        for screen in screens:
+            g = screen.geometry()
+            rects.append((g.x(), g.y(), g.width(), g.height()))
+        return cls(rects)
+
+    def __len__(self):
+        return len(self.rects)
+
+    def virtual_geometry(self):
+        """Bounding box of all screens as (x, y, width, height)"""
+        return (self.left, self.top, self.right - self.left + 1, self.bottom - self.top + 1)
+
+    def screen_at(self, x, y):
+        """Index of the screen containing (x, y), or -1 if it is off every screen"""
+        rects = self.rects
+        if not rects:
+            return -1
+
+        sx, sy, w, h = rects[self._last_hit]
+        if sx <= x < sx + w and sy <= y < sy + h:
+            return self._last_hit
+
+        for i, (sx, sy, w, h) in enumerate(rects):
+            if sx <= x < sx + w and sy <= y < sy + h:
+                self._last_hit = i
+                return i
+        return -1
+
+    def contains(self, x, y):
+        return self.screen_at(x, y) >= 0
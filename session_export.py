@@ -0,0 +1,308 @@
+"""Render a cat session headlessly and stream it into an animated GIF or APNG.
+
+Runs the real OnekoWindow on Qt's offscreen platform, feeds it a cursor
+path one 60 ms logic step at a time and writes each frame to the encoder
+as soon as it is drawn. Only the rectangle that changed since the last
+frame (the cat's and the pointer's old and new bounds) is encoded, and a
+frame where nothing changed just lengthens the previous one, so memory
+stays constant however long the session is:
+
+    python session_export.py demo.gif [--steps 900] [--size 480x270]
+    python session_export.py qa.png --trace session.nktr [--scale 0.25]
+
+The output format follows the extension: .gif, or .png/.apng for an
+animated PNG. Traces come from `python oneko.py --record-trace PATH`.
+GIF encoding uses Pillow; APNG needs nothing beyond the standard library.
+"""
+import io
+import os
+import sys
+import math
+import zlib
+import struct
+import argparse
+import itertools
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import Qt, QRect, QPoint  # noqa: E402
+from PyQt6.QtGui import QImage, QPainter, QColor, QPolygon  # noqa: E402
+
+from cursor_source import ScriptedCursorSource, CursorSample  # noqa: E402
+from cursor_trace import read_trace, trace_steps  # noqa: E402
+from headless import driven_window  # noqa: E402
+from screen_layout import ScreenLayout  # noqa: E402
+from tick_scheduler import TickScheduler  # noqa: E402
+
+STEP_MS = TickScheduler.BASE_INTERVAL
+# Pointer drawn into the frames: an arrow, tip at (0, 0), in logical pixels
+ARROW = [(0, 0), (0, 16), (4, 12), (7, 19), (10, 18), (7, 11), (12, 11)]
+ARROW_BOUNDS = QRect(-1, -1, 14, 22)
+
+
+class GifWriter:
+    """Animated GIF, written frame by frame.
+
+    Each frame is a sub-rectangle of the canvas with its own colour table
+    and "leave in place" disposal. Pillow does the quantising and LZW
+    coding of a single frame, whose image block is copied into our file.
+    """
+
+    def __init__(self, path, width, height, loop=0):
+        from PIL import Image  # Optional until a GIF is asked for
+        self.Image = Image
+        self.file = open(path, "wb")
+        self.frames = 0
+        self._carry_ms = 0.0  # GIF delays are centiseconds; keep the rounding error
+        self.file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0, 0, 0))
+        self.file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00")
+
+    def add(self, image, x, y, delay_ms):
+        """Append a QImage (RGBA8888) shown at (x, y) on the canvas for delay_ms"""
+        rgb = self.Image.frombuffer("RGBA", (image.width(), image.height()), _image_bytes(image),
+                                    "raw", "RGBA", image.bytesPerLine(), 1).convert("RGB")
+        encoded = io.BytesIO()
+        rgb.quantize(256, method=self.Image.Quantize.MEDIANCUT).save(encoded, "GIF", interlace=False)
+        data = encoded.getvalue()
+
+        # Pillow's colour table may be global or local; ours is always local
+        flags = data[10]
+        offset = 13
+        table, offset = self._table(data, offset, flags)
+        while data[offset] == 0x21:  # Skip Pillow's own extensions and their sub-blocks
+            offset += 2
+            while data[offset]:
+                offset += data[offset] + 1
+            offset += 1
+        if data[offset] != 0x2C:
+            raise ValueError("unexpected GIF block from Pillow")
+        if data[offset + 9] & 0x80:
+            flags = data[offset + 9]
+            table, offset = self._table(data, offset + 10, flags)
+        else:
+            offset += 10
+        pixels = data[offset:data.rindex(b"\x3b")]
+
+        total = delay_ms + self._carry_ms
+        delay_cs = min(max(1, round(total / 10)), 0xFFFF)
+        self._carry_ms = max(-10.0, min(10.0, total - delay_cs * 10))
+        self.file.write(b"\x21\xf9\x04" + struct.pack("<BHBB", 1 << 2, delay_cs, 0, 0))
+        local = 0x80 | (flags & 7) if table else 0
+        self.file.write(b"\x2c" + struct.pack("<HHHHB", x, y, image.width(), image.height(), local))
+        self.file.write(table + pixels)
+        self.frames += 1
+
+    @staticmethod
+    def _table(data, offset, flags):
+        """(colour table, offset after it) for a block whose flags byte is flags"""
+        if not flags & 0x80:
+            return b"", offset
+        size = 3 * 2 ** ((flags & 7) + 1)
+        return data[offset:offset + size], offset + size
+
+    def close(self):
+        self.file.write(b"\x3b")
+        self.file.close()
+
+
+class ApngWriter:
+    """Animated PNG, written frame by frame with zlib.
+
+    The frame count in acTL is only known at the end, so it is patched in
+    on close(). Frames after the first cover only their sub-rectangle and
+    replace (not blend with) what is under them.
+    """
+
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+    def __init__(self, path, width, height, loop=0):
+        self.file = open(path, "wb")
+        self.frames = 0
+        self.sequence = 0
+        self.loop = loop
+        self.file.write(self.SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        self._actl_at = self.file.tell()
+        self._chunk(b"acTL", struct.pack(">II", 0, loop))
+
+    def _chunk(self, kind, data):
+        self.file.write(struct.pack(">I", len(data)) + kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def add(self, image, x, y, delay_ms):
+        """Append a QImage (RGBA8888) shown at (x, y) on the canvas for delay_ms"""
+        width, height = image.width(), image.height()
+        for denominator in (1000, 100, 10, 1):  # Long rests don't fit in 16-bit milliseconds
+            numerator = max(1, round(delay_ms * denominator / 1000))
+            if numerator <= 0xFFFF:
+                break
+        self._chunk(b"fcTL", struct.pack(">IIIIIHHBB", self.sequence, width, height, x, y,
+                                         min(numerator, 0xFFFF), denominator, 0, 0))
+        self.sequence += 1
+        bits = _image_bytes(image)
+        stride = image.bytesPerLine()
+        compressor = zlib.compressobj(6)
+        data = b"".join(compressor.compress(b"\x00" + bits[row * stride:row * stride + width * 4])
+                        for row in range(height)) + compressor.flush()
+        if self.frames == 0:
+            self._chunk(b"IDAT", data)  # Frame 0 doubles as the still image
+        else:
+            self._chunk(b"fdAT", struct.pack(">I", self.sequence) + data)
+            self.sequence += 1
+        self.frames += 1
+
+    def close(self):
+        self._chunk(b"IEND", b"")
+        self.file.seek(self._actl_at)
+        self._chunk(b"acTL", struct.pack(">II", self.frames, self.loop))
+        self.file.close()
+
+
+def _image_bytes(image):
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    return bits.asstring()
+
+
+def demo_path(steps, width, height):
+    """A scripted session: laps around the screen, a long rest and a trip off the edge"""
+    cx, cy = width // 2, height // 2
+    rx, ry = width * 0.35, height * 0.3
+    moving = steps * 2 // 5
+    resting = steps * 2 // 5
+    for i in range(moving):
+        angle = 2 * math.pi * i / 120
+        yield round(cx + rx * math.cos(angle)), round(cy + ry * math.sin(2 * angle) / 1.5)
+    for _ in range(resting):  # Long enough to sit, wash and fall asleep
+        yield round(cx + rx), cy
+    for i in range(steps - moving - resting):
+        yield (width + 40, cy) if i > 20 else (width - 30, round(cy - ry))
+
+
+def cursor_steps(args):
+    """(rects, x, y) per logic step, from the trace or the demo path"""
+    if args.trace:
+        steps = trace_steps(read_trace(args.trace), STEP_MS)
+        return itertools.islice(steps, args.steps) if args.steps else steps
+    rects = [(0, 0, args.width, args.height)]
+    return ((rects, x, y) for x, y in demo_path(args.steps or 900, args.width, args.height))
+
+
+def export(args):
+    app, window = driven_window(theme=args.theme, cursor=ScriptedCursorSource(), motion="step")
+    window.hide()
+    window.engine.rng.seed(args.seed)
+
+    steps = iter(cursor_steps(args))
+    first = next(steps, None)
+    if first is None:
+        sys.exit("the cursor path is empty")
+    rects = first[0] or [(0, 0, args.width, args.height)]
+    left, top, width, height = ScreenLayout(rects).virtual_geometry()
+    scale = args.scale
+    canvas_width, canvas_height = max(1, round(width * scale)), max(1, round(height * scale))
+    sprite = max(1, round(window.SPRITE_SIZE * scale))
+    window.place(left + width // 2, top + height // 2)
+
+    if args.background.lower() == "none":
+        if args.output.lower().endswith(".gif"):
+            sys.exit("GIF frames can't be translucent; pick a --background colour")
+        background = QColor(Qt.GlobalColor.transparent)
+    else:
+        background = QColor(args.background)
+    writer_class = GifWriter if args.output.lower().endswith(".gif") else ApngWriter
+    try:
+        writer = writer_class(args.output, canvas_width, canvas_height)
+    except ImportError:
+        sys.exit("GIF export needs Pillow (pip install Pillow); .png writes an APNG without it")
+
+    canvas = QImage(canvas_width, canvas_height, QImage.Format.Format_RGBA8888_Premultiplied)
+    canvas.fill(background)
+    arrow = QPolygon([QPoint(px, py) for px, py in ARROW])
+
+    def to_canvas(x, y):
+        return round((x - left) * scale), round((y - top) * scale)
+
+    def bounds(state):
+        animation, frame, cat_x, cat_y, x, y = state
+        cat = QRect(*to_canvas(cat_x, cat_y), sprite, sprite)
+        return cat.united(ARROW_BOUNDS.translated(*to_canvas(x, y)))
+
+    def draw(state, dirty):
+        animation, frame, cat_x, cat_y, x, y = state
+        painter = QPainter(canvas)
+        painter.setClipRect(dirty)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(dirty, background)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        if animation is not None:
+            painter.drawPixmap(*to_canvas(cat_x, cat_y), window.atlas.scaled_pixmap(animation, frame, sprite, 1.0))
+        painter.translate(*to_canvas(x, y))
+        painter.setPen(QColor("black"))
+        painter.setBrush(QColor("white"))
+        painter.drawPolygon(arrow)
+        painter.end()
+
+    canvas_rect = QRect(0, 0, canvas_width, canvas_height)
+    pending = None  # (image, x, y) drawn but not written yet, and how long it shows
+    pending_ms = 0
+    shown = None
+    count = 0
+    layout_rects = None
+    for rects, x, y in itertools.chain([first], steps):
+        if rects is not layout_rects:
+            layout_rects = rects
+            window.engine.screen_layout = ScreenLayout(rects or [(left, top, width, height)])
+        movie = window.current_movie
+        window.update_state(CursorSample(count * STEP_MS / 1000, x, y))
+        if window.current_movie == movie:
+            window.advance_frame(STEP_MS)
+        count += 1
+
+        state = (window.current_movie, window.frame_index, window.engine.x, window.engine.y, x, y)
+        if state == shown:
+            pending_ms += STEP_MS  # Nothing moved; the frame before just lasts longer
+            continue
+        dirty = canvas_rect if shown is None else bounds(shown).united(bounds(state)).intersected(canvas_rect)
+        shown = state
+        if dirty.isEmpty():
+            pending_ms += STEP_MS  # Everything that changed is off the canvas
+            continue
+        draw(state, dirty)
+        if pending is not None:
+            writer.add(*pending, pending_ms)
+        pending = (canvas.copy(dirty).convertToFormat(QImage.Format.Format_RGBA8888), dirty.x(), dirty.y())
+        pending_ms = STEP_MS
+    if pending is not None:
+        writer.add(*pending, pending_ms)
+    writer.close()
+    print(f"{count} steps ({count * STEP_MS / 1000:.1f} s) -> {writer.frames} frames, "
+          f"{canvas_width}x{canvas_height}, {os.path.getsize(args.output) // 1024} KiB: {args.output}")
+
+
+def parse_size(value):
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="file to write: .gif, .png or .apng")
+    parser.add_argument("--trace", help="cursor trace to replay instead of the built-in demo path")
+    parser.add_argument("--steps", type=int, default=0,
+                        help="60 ms steps to render (default: 900 for the demo path, all of a trace)")
+    parser.add_argument("--size", type=parse_size, default=(480, 270), metavar="WxH",
+                        help="screen size for the demo path (default: 480x270)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="output pixels per screen pixel, e.g. 0.25 for a 4K trace")
+    parser.add_argument("--theme", default=None, help="theme to draw the cat with")
+    parser.add_argument("--background", default="#FFFFFF",
+                        help="canvas colour, or none for a transparent APNG (default: #FFFFFF)")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the cat's idle choices")
+    args = parser.parse_args()
+    args.width, args.height = args.size
+    export(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import os
+import ctypes
+import platform
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QGuiApplication
+
+from xlib import ignore_bad_window, open_display, take_bad_window, window_property
+
+try:
+    from PyQt6.QtDBus import QDBusConnection
+except ImportError:  # Built without QtDBus
+    QDBusConnection = None
+
+
+POWER_SUPPLY_PATH = "/sys/class/power_supply"
+
+
+def on_battery(path=POWER_SUPPLY_PATH):
+    """True when running on battery, False on mains, None if unknown (not Linux)"""
+    try:
+        supplies = os.listdir(path)
+    except OSError:
+        return None
+
+    def read(supply, name):
+        try:
+            with open(os.path.join(path, supply, name)) as f:
+                return f.read().strip()
+        except OSError:
+            return ""
+
+    discharging = False
+    for supply in supplies:
+        kind = read(supply, "type")
+        if kind in ("Mains", "USB") and read(supply, "online") == "1":
+            return False
+        if kind == "Battery" and read(supply, "status") == "Discharging":
+            discharging = True
+    return discharging
+
+
+class _X11Fullscreen:
+    """Whether the active X11 window is fullscreen, and where it is"""
+
+    def __init__(self):
+        self.xlib, self.display = open_display()
+        self.root = self.xlib.XDefaultRootWindow(self.display)
+        self.fullscreen_atom = self.xlib.XInternAtom(self.display, b"_NET_WM_STATE_FULLSCREEN", False)
+        ignore_bad_window()
+
+    def active_fullscreen_origin(self):
+        """Root coordinates of the active window if it is fullscreen, else None.
+
+        The active window can close between our requests; that BadWindow
+        counts as "not fullscreen".
+        """
+        take_bad_window()
+        active = window_property(self.xlib, self.display, self.root, b"_NET_ACTIVE_WINDOW")
+        if not active or not active[0]:
+            return None
+        window = active[0]
+        if self.fullscreen_atom not in window_property(self.xlib, self.display, window, b"_NET_WM_STATE"):
+            return None
+        x, y, child = ctypes.c_int(), ctypes.c_int(), ctypes.c_ulong()
+        self.xlib.XTranslateCoordinates(self.display, window, self.root, 0, 0,
+                                        ctypes.byref(x), ctypes.byref(y), ctypes.byref(child))
+        if take_bad_window():
+            return None
+        return x.value, y.value
+
+    def close(self):
+        self.xlib.XCloseDisplay(self.display)
+
+
+class SessionMonitor(QObject):
+    """Tells the cat when nobody can see it, and whether we are on battery.
+
+    Screen lock/screensaver comes from the freedesktop (and GNOME)
+    ScreenSaver D-Bus signal. Fullscreen windows are polled on X11 through
+    _NET_ACTIVE_WINDOW/_NET_WM_STATE; battery state from sysfs, only when
+    watch_battery is set. Anything a platform can't tell us simply never
+    fires, and with nothing to poll no timer runs.
+    """
+
+    locked_changed = pyqtSignal(bool)
+    fullscreen_changed = pyqtSignal(bool)
+    battery_changed = pyqtSignal(bool)
+
+    POLL_INTERVAL = 2000  # ms between fullscreen checks
+    BATTERY_INTERVAL = 30000  # ms between battery checks
+
+    def __init__(self, screen_rect=None, parent=None, watch_battery=False):
+        super().__init__(parent)
+        self.screen_rect = screen_rect  # Callable returning the cat's screen (x, y, w, h), or None
+        self.locked = False
+        self.fullscreen = False
+        self.battery = on_battery() if watch_battery else None  # None: not watched, or unknown
+        self._polls = 0
+        self._battery_polls = 1  # Polls per battery check, set by start()
+
+        self.x11 = None
+        if QGuiApplication.platformName() == "xcb":
+            try:
+                self.x11 = _X11Fullscreen()
+            except OSError as e:
+                print(f"Fullscreen detection unavailable: {e}")
+
+        if QDBusConnection is not None and platform.system() == "Linux":
+            bus = QDBusConnection.sessionBus()
+            for service, path in (("org.freedesktop.ScreenSaver", "/org/freedesktop/ScreenSaver"),
+                                  ("org.gnome.ScreenSaver", "/org/gnome/ScreenSaver")):
+                bus.connect(service, path, service, "ActiveChanged", self._on_screensaver)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+
+    def start(self):
+        if self.x11 is not None:
+            self._battery_polls = self.BATTERY_INTERVAL // self.POLL_INTERVAL
+            self.timer.start(self.POLL_INTERVAL)
+        elif self.battery is not None:
+            self._battery_polls = 1
+            self.timer.start(self.BATTERY_INTERVAL)
+
+    def stop(self):
+        self.timer.stop()
+        if self.x11 is not None:
+            self.x11.close()
+            self.x11 = None
+
+    @pyqtSlot(bool)
+    def _on_screensaver(self, active):
+        if active != self.locked:
+            self.locked = active
+            self.locked_changed.emit(active)
+
+    def poll(self):
+        if self.x11 is not None:
+            origin = self.x11.active_fullscreen_origin()
+            covered = False
+            if origin is not None:
+                rect = self.screen_rect() if self.screen_rect else None
+                covered = rect is None or (rect[0] <= origin[0] < rect[0] + rect[2]
+                                           and rect[1] <= origin[1] < rect[1] + rect[3])
+            if covered != self.fullscreen:
+                self.fullscreen = covered
+                self.fullscreen_changed.emit(covered)
+
+        self._polls += 1
+        if self.battery is not None and self._polls % self._battery_polls == 0:
+            battery = on_battery()
+            if battery != self.battery:
+                self.battery = battery
+                self.battery_changed.emit(battery)
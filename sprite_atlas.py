@@ -0,0 +1,251 @@
+import os
+import json
+from collections import namedtuple
+from PyQt6.QtCore import Qt, QRect, QSize
+from PyQt6.QtGui import QImage, QImageReader, QPainter
+
+from frame_cache import FrameCache, MaskCache
+
+
+# One frame inside the atlas: where it lives and how long it is shown (ms)
+AtlasFrame = namedtuple("AtlasFrame", ["rect", "delay"])
+
+
+def decode_frames(path, size=None):
+    """Decode every frame of an image file, scaled to size x size if given"""
+    reader = QImageReader(path)
+    if size is not None:
+        reader.setScaledSize(QSize(size, size))
+    frames = []
+    while reader.canRead():
+        image = reader.read()
+        if image.isNull():
+            break
+        delay = reader.nextImageDelay()
+        frames.append((image, delay))
+    if not frames:
+        raise IOError(reader.errorString() or f"no frames in {path}")
+    return frames
+
+
+def load_animation(folder, anim_id, size=None):
+    """Decode animation anim_id ((anim_id + 1).GIF) from folder, or None if it can't be"""
+    path = os.path.join(folder, f"{anim_id + 1}.GIF")
+    if not os.path.exists(path):
+        print(f"Missing animation file: {path}")
+        return None
+    try:
+        return decode_frames(path, size)
+    except Exception as e:
+        print(f"Error loading animation {anim_id + 1}: {e}")
+        return None
+
+
+class SpriteAtlas:
+    """All frames of a theme packed into a single image.
+
+    Each animation id owns one row of cells, each frame of that animation
+    one cell in the row. Switching animations is only an index lookup.
+    Frames are kept at their native resolution (cell_size=None) or a fixed
+    one; scaled_pixmap() serves them pre-scaled for the screen they are
+    drawn on.
+    """
+
+    def __init__(self, cell_size=None, smooth=True):
+        self.cell_size = cell_size  # None: take the size of the first frame added
+        self.native = cell_size is None  # Frames as decoded, neither scaled nor pre-scaled in a store
+        self.index = {}  # animation id -> [AtlasFrame, ...]
+        self._delays = {}  # animation id -> (delay, ...), for the animation clock
+        self.image = QImage()
+        self._store = None  # FrameStore the image is mapped from, if any
+        self.frame_cache = FrameCache(smooth)
+        self.masks = MaskCache()  # Window shapes, only built for shaped windows
+
+    @classmethod
+    def from_folder(cls, folder, cell_size=None, count=32, smooth=True, ids=None):
+        """Build an atlas from the numbered 1.GIF .. count.GIF files in folder.
+
+        ids limits loading to those animation ids (0-based); the rest can be
+        added later with add_animation().
+        """
+        atlas = cls(cell_size, smooth)
+        for anim_id in (range(count) if ids is None else ids):
+            frames = load_animation(folder, anim_id, cell_size)
+            if frames is not None:
+                atlas.add_animation(anim_id, frames)
+        return atlas
+
+    @classmethod
+    def from_packed(cls, path, cell_size=None, smooth=True):
+        """Load an atlas written by theme_builder.py --atlas (PNG sheet + JSON index)"""
+        with open(os.path.splitext(path)[0] + ".json") as f:
+            index = json.load(f)
+        sheet = QImage(path)
+        if sheet.isNull():
+            raise IOError(f"could not read atlas image {path}")
+
+        atlas = cls(cell_size, smooth)
+        for anim_id, entries in sorted(index["frames"].items(), key=lambda item: int(item[0])):
+            frames = []
+            for x, y, w, h, delay in entries:
+                image = sheet.copy(x, y, w, h)
+                if cell_size is not None:
+                    image = image.scaled(
+                        cell_size, cell_size,
+                        Qt.AspectRatioMode.IgnoreAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation,
+                    )
+                frames.append((image, delay))
+            atlas.add_animation(int(anim_id), frames)
+        return atlas
+
+    @classmethod
+    def from_store(cls, store, smooth=True):
+        """Wrap a FrameStore's mapped, pre-scaled sheet; nothing is decoded or copied"""
+        atlas = cls(store.cell, smooth)
+        atlas.image = store.image
+        atlas._store = store  # The image points into its mapping
+        for anim_id, frame, delay in store.frames:
+            atlas.index.setdefault(anim_id, []).append(AtlasFrame(store.rect(anim_id, frame), delay))
+        for anim_id, entries in atlas.index.items():
+            atlas._delays[anim_id] = tuple(entry.delay for entry in entries)
+        return atlas
+
+    def _ensure_capacity(self, rows, columns):
+        width = max(self.image.width(), columns * self.cell_size)
+        height = max(self.image.height(), rows * self.cell_size)
+        if width == self.image.width() and height == self.image.height():
+            return
+
+        grown = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        grown.fill(Qt.GlobalColor.transparent)
+        if not self.image.isNull():
+            painter = QPainter(grown)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+            painter.drawImage(0, 0, self.image)
+            painter.end()
+        self.image = grown
+
+    def add_animation(self, anim_id, frames):
+        """Pack a list of (QImage, delay) frames into the row for anim_id"""
+        if self.cell_size is None:
+            first = frames[0][0]
+            self.cell_size = max(first.width(), first.height())
+        size = self.cell_size
+        self._ensure_capacity(anim_id + 1, len(frames))
+
+        painter = QPainter(self.image)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        entries = []
+        for column, (image, delay) in enumerate(frames):
+            rect = QRect(column * size, anim_id * size, size, size)
+            painter.fillRect(rect, Qt.GlobalColor.transparent)
+            painter.drawImage(rect.topLeft(), image)
+            entries.append(AtlasFrame(rect, delay))
+        painter.end()
+
+        self.index[anim_id] = entries
+        self._delays[anim_id] = tuple(entry.delay for entry in entries)
+        self.frame_cache.forget(anim_id)  # Other rows are untouched by growing the image
+        self.masks.forget(anim_id)
+
+    def to_indexed(self):
+        """A copy of this atlas as one Format_Indexed8 sheet sharing a single colour table.
+
+        The table holds exactly the colours in the sheet (transparent first),
+        so the conversion is lossless; sprites with more than 256 colours
+        fall back to Qt's own quantisation. Returns a new, complete atlas
+        meant for recolored(); add no more animations to it.
+        """
+        argb = self.image.convertToFormat(QImage.Format.Format_ARGB32)
+        bits = argb.constBits()
+        bits.setsize(argb.sizeInBytes())
+        colors = set(memoryview(bits.asstring()).cast("I"))
+        table = [0] + sorted(c for c in colors if c >> 24)
+        if len(table) > 256:
+            print(f"Sprites have {len(table)} colours; quantising to 256")
+            indexed = argb.convertToFormat(QImage.Format.Format_Indexed8)
+        else:
+            indexed = argb.convertToFormat(QImage.Format.Format_Indexed8, table,
+                                           Qt.ImageConversionFlag.AvoidDither)
+        return self._with_image(indexed)
+
+    def recolored(self, table):
+        """This (indexed) atlas with another colour table; only the 1-byte indices are copied"""
+        image = QImage(self.image)
+        image.setColorTable(table)
+        return self._with_image(image)
+
+    def color_table(self):
+        return self.image.colorTable()
+
+    def _with_image(self, image):
+        atlas = SpriteAtlas(self.cell_size, self.frame_cache.smooth)
+        atlas.image = image
+        atlas.index = dict(self.index)
+        atlas._delays = dict(self._delays)
+        return atlas
+
+    def __contains__(self, anim_id):
+        return anim_id in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def frames(self, anim_id):
+        return self.index[anim_id]
+
+    def delays(self, anim_id):
+        """Per-frame delays (ms) of one animation"""
+        return self._delays[anim_id]
+
+    def frame(self, anim_id, frame_index=0):
+        entries = self.index[anim_id]
+        return entries[frame_index % len(entries)]
+
+    def frame_image(self, anim_id, frame_index=0):
+        """Return a standalone copy of one frame (e.g. for icons)"""
+        return self.image.copy(self.frame(anim_id, frame_index).rect)
+
+    def scaled_pixmap(self, anim_id, frame_index, size, dpr):
+        """One frame as a pixmap of size x size logical pixels at device ratio dpr.
+
+        The first request for a (size, dpr) pair scales every frame at once
+        (unless the frame cache is lazy), so moving to a screen with a new
+        ratio costs one fill, and painting is a plain blit afterwards.
+        """
+        cache = self.frame_cache
+        entries = self.index[anim_id]
+        frame_index %= len(entries)
+        if cache.prefill and (size, dpr) not in cache.filled:
+            cache.fill(((a, i, self.image.copy(f.rect))
+                        for a, frames in self.index.items()
+                        for i, f in enumerate(frames)), size, dpr)
+        return cache.get(anim_id, frame_index, size, dpr,
+                         lambda: self.image.copy(entries[frame_index].rect))
+
+    def fill_masks(self, size):
+        """Build the shape mask of every frame at size x size, skipping those already built"""
+        self.masks.fill(((a, i, self.image.copy(f.rect))
+                         for a, frames in self.index.items()
+                         for i, f in enumerate(frames)
+                         if (a, i, size) not in self.masks.regions), size)
+
+    def shape_mask(self, anim_id, frame_index, size):
+        """One frame's window shape (QRegion) at size x size logical pixels.
+
+        The first request for a size builds the masks of every frame, so
+        switching frames afterwards is a dictionary lookup.
+        """
+        entries = self.index[anim_id]
+        frame_index %= len(entries)
+        if size not in self.masks.filled:
+            self.fill_masks(size)
+        return self.masks.get(anim_id, frame_index, size,
+                              lambda: self.image.copy(entries[frame_index].rect))
+
+    def byte_size(self):
+        return self.image.sizeInBytes() + self.frame_cache.byte_size()
@@ -0,0 +1,175 @@
+import time
+import numpy as np
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QObject, QTimer
+from PyQt6.QtGui import QPainter, QRegion
+
+from neko_swarm import NekoSwarm
+from tick_scheduler import TickScheduler
+from cursor_source import QtCursorSource
+
+
+class SpriteWindow(QWidget):
+    """Minimal frameless window that shows one atlas frame (one swarm cat).
+
+    Translucent by default. A shaped window (X11 without a compositor)
+    is opaque instead and cut to the frame's cached mask, as OnekoWindow
+    does.
+    """
+
+    def __init__(self, atlas, flags, size, shaped=False):
+        super().__init__()
+        self.atlas = atlas
+        self.animation = -1
+        self.shaped = shaped
+        self.setWindowFlags(flags)
+        if not shaped:
+            self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.resize(size, size)
+
+    def set_atlas(self, atlas):
+        self.atlas = atlas
+        self.update_mask()
+        self.update()
+
+    def set_animation(self, animation):
+        if animation != self.animation:
+            self.animation = animation
+            self.update_mask()
+            self.update()
+
+    def update_mask(self):
+        if not self.shaped:
+            return
+        if self.animation in self.atlas:
+            self.setMask(self.atlas.shape_mask(self.animation, 0, self.width()))
+        else:
+            # Nothing to show yet: only a dot, not an opaque square
+            self.setMask(QRegion(self.width() // 2 - 3, self.height() // 2 - 3, 7, 7, QRegion.RegionType.Ellipse))
+
+    def resizeEvent(self, event):
+        self.update_mask()  # Masks are cached per size
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self.shaped:
+            # The mask hides what the frame doesn't cover
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        else:
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+            painter.fillRect(self.rect(), Qt.GlobalColor.transparent)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        if self.animation in self.atlas:
+            painter.drawPixmap(0, 0, self.atlas.scaled_pixmap(self.animation, 0, self.width(),
+                                                              self.devicePixelRatioF()))
+        painter.end()
+
+
+class SwarmController(QObject):
+    """Runs a NekoSwarm on one timer and mirrors it onto one view per cat.
+
+    The state machine for all cats is a single batched NekoSwarm.step()
+    per tick; the Qt side only moves the views whose cat moved and
+    repaints the ones whose animation changed.
+    """
+
+    def __init__(self, count, atlas, screen_layout, window_flags, view_factory=None,
+                 cursor=None, telemetry=None, sprite_size=64, shaped=False, **engine_options):
+        super().__init__()
+        self.atlas = atlas
+        self.cursor = cursor if cursor is not None else QtCursorSource()
+        self.telemetry = telemetry
+        self.swarm = NekoSwarm(count, screen_layout=screen_layout, available=set(atlas.keys()),
+                               sprite_size=sprite_size, **engine_options)
+        # One view per cat: a SpriteWindow by default, or e.g. an OverlaySprite
+        if view_factory is None:
+            view_factory = lambda: SpriteWindow(atlas, window_flags, sprite_size, shaped)
+        self.views = [view_factory() for _ in range(count)]
+        self.visible = True
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.on_tick)
+        self.scheduler = TickScheduler(self.timer)
+        self.cursor.moved.connect(self.on_cursor_moved)
+
+    def set_atlas(self, atlas):
+        """Draw every cat from a different atlas, e.g. after a theme switch"""
+        self.atlas = atlas
+        self.swarm.available[:] = False
+        self.swarm.available[[a for a in atlas.keys() if 0 <= a < 32]] = True
+        for view in self.views:
+            view.set_atlas(atlas)
+
+    def set_sprite_size(self, size):
+        self.swarm.SPRITE_SIZE = size
+        for view in self.views:
+            view.resize(size, size)
+
+    @property
+    def screen_layout(self):
+        return self.swarm.screen_layout
+
+    @screen_layout.setter
+    def screen_layout(self, layout):
+        self.swarm.screen_layout = layout
+
+    def start(self):
+        cursor = self.cursor.snapshot()
+        self.swarm.scatter(cursor.x, cursor.y)
+        for view, x, y in zip(self.views, self.swarm.x, self.swarm.y):
+            view.move(int(x), int(y))
+        self.setVisible(self.visible)
+        self.scheduler.start(self.swarm.activity())
+        print(f"Swarm started with {self.swarm.count} cats")
+
+    def stop(self):
+        self.scheduler.stop()
+        self.cursor.moved.disconnect(self.on_cursor_moved)
+        for view in self.views:
+            view.hide()
+            view.deleteLater()
+        self.views = []
+        print(f"Swarm stopped. Wakeups per state: {self.scheduler.summary()}")
+
+    def pause(self):
+        """Stop ticking until resume(), e.g. while nobody can see the swarm"""
+        self.scheduler.stop()
+
+    def resume(self):
+        self.scheduler.start(self.swarm.activity())
+        self.on_tick()  # Catch up with wherever the cursor went meanwhile
+
+    def setVisible(self, visible):
+        self.visible = visible
+        for view in self.views:
+            view.setVisible(visible)
+
+    def on_cursor_moved(self):
+        if self.timer.isActive() and self.scheduler.should_wake():
+            self.on_tick()
+
+    def on_tick(self):
+        start = time.perf_counter() if self.telemetry is not None and self.telemetry.enabled else None
+        steps = self.scheduler.begin_tick()
+        old_x = self.swarm.x.copy()
+        old_y = self.swarm.y.copy()
+        old_animation = self.swarm.animation.copy()
+
+        cursor = self.cursor.snapshot()
+        for _ in range(steps):
+            self.swarm.step(cursor.x, cursor.y)
+            if np.any(self.swarm.state != NekoSwarm.IDLE):
+                break  # Someone is moving again; no more catching up
+
+        swarm = self.swarm
+        for i in np.flatnonzero((swarm.x != old_x) | (swarm.y != old_y)):
+            self.views[i].move(int(swarm.x[i]), int(swarm.y[i]))
+        for i in np.flatnonzero(swarm.animation != old_animation):
+            self.views[i].set_animation(int(swarm.animation[i]))
+
+        self.scheduler.reschedule(swarm.activity())
+        if start is not None:
+            self.telemetry.observe("swarm_tick", time.perf_counter() - start)
@@ -0,0 +1,105 @@
+import json
+import time
+
+
+class Histogram:
+    """Durations in power-of-two microsecond buckets, plus count, total and max.
+
+    Bucket i holds durations below 2**i us, so recording is one
+    bit_length() and an increment, whatever the number of samples.
+    """
+
+    BUCKETS = 24  # Up to ~8 s; anything slower lands in the last bucket
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        us = seconds * 1e6
+        self.counts[min(int(us).bit_length(), self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+
+    def percentile(self, p):
+        """Upper bound (us) of the bucket holding the p-th percentile"""
+        if not self.count:
+            return 0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return 1 << i
+        return 1 << (self.BUCKETS - 1)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_us": round(self.total / self.count, 1) if self.count else 0.0,
+            "p50_us": self.percentile(50),
+            "p99_us": self.percentile(99),
+            "max_us": round(self.max, 1),
+            # Non-empty buckets only, keyed by their upper bound in us
+            "buckets": {str(1 << i): n for i, n in enumerate(self.counts) if n},
+        }
+
+
+class Telemetry:
+    """Timings and counters for the running cat, off unless enabled.
+
+    Call sites check the enabled flag before reading the clock, so the
+    cost while disabled is one attribute lookup per tick or paint.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def set_enabled(self, enabled):
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def reset(self):
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.monotonic()
+
+    def observe(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self, extra=None):
+        """Everything recorded so far as a JSON-ready dict; extra is merged in"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        result = {
+            "seconds": round(elapsed, 3),
+            "timings": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "per_second": {name: round(n / elapsed, 2) for name, n in sorted(self.counters.items())},
+        }
+        if extra:
+            result.update(extra)
+        return result
+
+    def summary(self, extra=None):
+        """One log line: mean/p99 per timing and rate per counter"""
+        snap = self.snapshot(extra)
+        parts = [f"{name} {t['mean_us']:.0f}us mean/{t['p99_us']}us p99"
+                 for name, t in snap["timings"].items()]
+        parts += [f"{name} {rate}/s" for name, rate in snap["per_second"].items()]
+        return f"[{snap['seconds']:.0f}s] " + (", ".join(parts) or "no samples")
+
+    def export_json(self, path, extra=None):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(extra), f, indent=2)
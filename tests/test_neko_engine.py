@@ -0,0 +1,79 @@
+"""Regression tests for the Qt-free cat state machine; no display needed."""
+import math
+import random
+import hashlib
+from collections import Counter
+
+from bench_engine import cursor_path, legacy_direction
+from neko_engine import NekoEngine, direction_frame
+from screen_layout import ScreenLayout
+
+LAYOUT = ScreenLayout([(0, 0, 1920, 1080), (1920, 0, 1280, 1024)])
+
+
+def run(steps=5000, seed=7):
+    """(position, animation, activity) for every step of a seeded session"""
+    engine = NekoEngine(screen_layout=LAYOUT, seed=seed)
+    engine.place(100, 100)
+    results = []
+    for x, y in cursor_path(steps, LAYOUT, seed):
+        px, py, animation = engine.step(x, y)
+        results.append(((px, py), animation, engine.activity()))
+    return results
+
+
+def test_seeded_session_is_unchanged():
+    results = run()
+    assert Counter(activity for _, _, activity in results) == {
+        "chasing": 494, "digging": 384, "idle": 2001, "sleeping": 1563, "surprised": 58, "washing": 500,
+    }
+    assert sorted({animation for _, animation, _ in results}) == [
+        2, 3, 4, 5, 6, 7, 10, 11, 12, 13, 14, 15, 18, 19, 24, 25, 26, 28, 29, 31,
+    ]
+    assert [(activity, animation) for _, animation, activity in results[:8]] == [
+        ("chasing", 7), ("chasing", 6), ("chasing", 7), ("chasing", 6),
+        ("chasing", 7), ("chasing", 6), ("chasing", 7), ("chasing", 4),
+    ]
+    # Every position, animation and activity, step by step
+    digest = hashlib.sha256()
+    for (x, y), animation, activity in results:
+        digest.update(f"{x},{y},{animation},{activity};".encode())
+    assert digest.hexdigest() == "8186ec33a9347f7c38859380c45c806b578abccea5147cc808216f70dabf947f"
+
+
+def test_same_seed_same_session():
+    assert run(2000, seed=3) == run(2000, seed=3)
+
+
+def test_surprise_then_chase_then_sit():
+    engine = NekoEngine(screen_layout=LAYOUT, seed=1)
+    engine.place(500, 500)
+    engine.state = engine.IDLE
+    cursor = (1000, 532)  # Far to the right
+
+    engine.step(*cursor)
+    assert (engine.activity(), engine.animation) == ("surprised", 31)
+    while engine.activity() == "surprised":
+        engine.step(*cursor)
+    assert engine.animation in (4, 5)  # Running right
+
+    for _ in range(100):
+        engine.step(*cursor)
+    assert (engine.activity(), engine.animation) == ("idle", 24)
+
+
+def test_digs_at_the_edge_the_cursor_left_by():
+    engine = NekoEngine(screen_layout=LAYOUT, seed=1)
+    engine.place(3000, 500)
+    animations = {engine.step(3300, 500)[2] for _ in range(10)}  # Past the right edge
+    assert engine.activity() == "digging"
+    assert animations == {18, 19}
+
+
+def test_direction_frame_matches_legacy_chain():
+    rng = random.Random(1)
+    deltas = [(rng.randint(-2000, 2000), rng.randint(-2000, 2000)) for _ in range(50000)]
+    deltas += [(dx, dy) for dx in range(-3, 4) for dy in range(-3, 4)]
+    for dx, dy in deltas:
+        if dx or dy:
+            assert direction_frame(dx, dy) == legacy_direction(math.degrees(math.atan2(dy, dx))), (dx, dy)
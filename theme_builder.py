@@ -0,0 +1,246 @@
+"""Build recoloured cat themes from the sprites in gif/.
+
+Python replacement for theme_generator.sh. Does the same fuzz-based
+recolour as its ImageMagick calls (near-black -> edge colour, then
+near-white -> body colour). Every (theme, GIF) pair runs in a process
+pool, and a content-hash manifest per theme skips files whose source and
+colour parameters have not changed:
+
+    python theme_builder.py --theme orange_cat:#000000:#FED883
+    python theme_builder.py --themes themes.json --jobs 8 --atlas
+
+themes.json maps theme names to {"edge": "#RRGGBB", "body": "#RRGGBB"}.
+"""
+import os
+import sys
+import json
+import glob
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from palette import DEFAULT_EDGE_FUZZ, DEFAULT_BODY_FUZZ, recolor, palette_params
+
+BUILDER_VERSION = 1
+MANIFEST_NAME = ".manifest.json"
+DEFAULT_SOURCE_DIR = "gif"
+
+
+def recolor_image(image, params):
+    """Recolour a Pillow image; palette images only have their palette touched"""
+    if image.mode == "P":
+        palette = image.getpalette()
+        transparency = image.info.get("transparency")
+        for i in range(len(palette) // 3):
+            if i == transparency:
+                continue  # Keep the see-through colour as it is
+            palette[i * 3:i * 3 + 3] = recolor(tuple(palette[i * 3:i * 3 + 3]), params)
+        out = image.copy()
+        out.putpalette(palette)
+        if transparency is not None:
+            out.info["transparency"] = transparency
+        return out
+
+    rgba = image.convert("RGBA")
+    pixels = rgba.load()
+    for y in range(rgba.height):
+        for x in range(rgba.width):
+            r, g, b, a = pixels[x, y]
+            if a:
+                pixels[x, y] = recolor((r, g, b), params) + (a,)
+    return rgba
+
+
+def recolor_file(source, target, params):
+    """Recolour every frame of one GIF (runs in a worker process)"""
+    with Image.open(source) as image:
+        frames = []
+        durations = []
+        for index in range(getattr(image, "n_frames", 1)):
+            image.seek(index)
+            frames.append(recolor_image(image, params))
+            durations.append(image.info.get("duration", 0))
+
+    save_args = {"format": "GIF"}
+    if "transparency" in frames[0].info:
+        save_args["transparency"] = frames[0].info["transparency"]
+    if len(frames) > 1:
+        save_args.update(save_all=True, append_images=frames[1:], duration=durations, loop=0, disposal=2)
+
+    tmp = target + ".tmp"
+    frames[0].save(tmp, **save_args)
+    os.replace(tmp, target)  # Never leave a half-written GIF behind
+    return os.path.basename(target)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def params_key(params):
+    blob = json.dumps({"version": BUILDER_VERSION, **params}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        if manifest.get("version") == BUILDER_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": BUILDER_VERSION, "files": {}}
+
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def source_files(source_dir):
+    files = glob.glob(os.path.join(source_dir, "*.gif")) + glob.glob(os.path.join(source_dir, "*.GIF"))
+    return sorted(set(files))
+
+
+def plan_theme(name, params, source_dir, output_root, force=False):
+    """Work out which files of one theme are stale; returns (output_dir, manifest, jobs)"""
+    output_dir = os.path.join(output_root, f"theme_{name}")
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    key = params_key(params)
+
+    jobs = []
+    for source in source_files(source_dir):
+        filename = os.path.basename(source)
+        target = os.path.join(output_dir, filename)
+        source_hash = file_sha256(source)
+        entry = manifest["files"].get(filename)
+        up_to_date = (not force and entry is not None and os.path.exists(target)
+                      and entry.get("source") == source_hash and entry.get("params") == key)
+        if not up_to_date:
+            jobs.append((source, target, params, filename, source_hash, key))
+    return output_dir, manifest, jobs
+
+
+def pack_atlas(output_dir, atlas_path):
+    """Pack a built theme into one PNG sheet plus a JSON index next to it.
+
+    The layout matches SpriteAtlas: one row per animation (N.GIF is row
+    N-1), one column per frame.
+    """
+    sources = [p for p in source_files(output_dir) if os.path.basename(p).split(".")[0].isdigit()]
+    decoded = {}
+    cell = 0
+    for path in sources:
+        anim_id = int(os.path.basename(path).split(".")[0]) - 1
+        with Image.open(path) as image:
+            frames = []
+            for index in range(getattr(image, "n_frames", 1)):
+                image.seek(index)
+                frames.append((image.convert("RGBA"), image.info.get("duration", 0)))
+        cell = max(cell, *(max(f.size) for f, _ in frames))
+        decoded[anim_id] = frames
+
+    if not decoded:
+        raise SystemExit(f"No numbered GIFs in {output_dir} to pack")
+
+    rows = max(decoded) + 1
+    columns = max(len(frames) for frames in decoded.values())
+    sheet = Image.new("RGBA", (columns * cell, rows * cell), (0, 0, 0, 0))
+    index = {}
+    for anim_id, frames in sorted(decoded.items()):
+        entries = []
+        for column, (frame, delay) in enumerate(frames):
+            x, y = column * cell, anim_id * cell
+            sheet.paste(frame, (x, y))
+            entries.append([x, y, frame.width, frame.height, delay])
+        index[str(anim_id)] = entries
+
+    sheet.save(atlas_path, format="PNG", optimize=True)
+    with open(os.path.splitext(atlas_path)[0] + ".json", "w") as f:
+        json.dump({"version": 1, "cell": cell, "frames": index}, f, indent=1, sort_keys=True)
+    return atlas_path
+
+
+def build_themes(themes, source_dir=DEFAULT_SOURCE_DIR, output_root=".", jobs=None, force=False, atlas=False):
+    """Build every theme in {name: params}; returns {name: number of files rebuilt}"""
+    if not os.path.isdir(source_dir):
+        raise SystemExit(f"Error: Source directory '{source_dir}' does not exist!")
+
+    plans = {name: plan_theme(name, params, source_dir, output_root, force)
+             for name, params in themes.items()}
+    work = [(name, job) for name, (_, _, theme_jobs) in plans.items() for job in theme_jobs]
+
+    # One pool for the whole theme matrix, so small themes don't serialize
+    if work and (jobs or os.cpu_count() or 1) > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [(name, job, pool.submit(recolor_file, job[0], job[1], job[2])) for name, job in work]
+            results = [(name, job, future.result()) for name, job, future in futures]
+    else:
+        results = [(name, job, recolor_file(job[0], job[1], job[2])) for name, job in work]
+
+    rebuilt = {name: 0 for name in themes}
+    for name, (source, target, params, filename, source_hash, key), _ in results:
+        plans[name][1]["files"][filename] = {"source": source_hash, "params": key}
+        rebuilt[name] += 1
+
+    for name, (output_dir, manifest, _) in plans.items():
+        save_manifest(output_dir, manifest)
+        atlas_path = os.path.join(output_root, f"theme_{name}.atlas.png")
+        if atlas and (rebuilt[name] or not os.path.exists(atlas_path)):
+            pack_atlas(output_dir, atlas_path)
+    return rebuilt
+
+
+def parse_theme_arg(value):
+    try:
+        name, edge, body = value.split(":")
+        return name, palette_params(edge, body)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"expected NAME:#EDGE:#BODY ({e})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build recoloured Oneko themes from gif/")
+    parser.add_argument("--theme", action="append", type=parse_theme_arg, default=[],
+                        metavar="NAME:#EDGE:#BODY", help="theme to build (repeatable)")
+    parser.add_argument("--themes", metavar="FILE",
+                        help='JSON file of {"name": {"edge": "#RRGGBB", "body": "#RRGGBB"}}')
+    parser.add_argument("--source", default=DEFAULT_SOURCE_DIR, help="source sprite directory (default: gif)")
+    parser.add_argument("--output", default=".", help="where theme_<name>/ directories go (default: .)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--edge-fuzz", type=float, default=DEFAULT_EDGE_FUZZ, help="percent (default: 8)")
+    parser.add_argument("--body-fuzz", type=float, default=DEFAULT_BODY_FUZZ, help="percent (default: 12)")
+    parser.add_argument("--atlas", action="store_true", help="also write theme_<name>.atlas.png/.json")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and rebuild everything")
+    args = parser.parse_args(argv)
+
+    themes = {}
+    for name, params in args.theme:
+        params.update(edge_fuzz=args.edge_fuzz, body_fuzz=args.body_fuzz)
+        themes[name] = params
+    if args.themes:
+        with open(args.themes) as f:
+            for name, spec in json.load(f).items():
+                themes[name] = palette_params(spec["edge"], spec["body"],
+                                            spec.get("edge_fuzz", args.edge_fuzz),
+                                            spec.get("body_fuzz", args.body_fuzz))
+    if not themes:
+        parser.error("nothing to build; pass --theme or --themes")
+
+    rebuilt = build_themes(themes, args.source, args.output, args.jobs, args.force, args.atlas)
+    for name, count in rebuilt.items():
+        print(f"theme_{name}: {count} file(s) rebuilt")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+import os
+import time
+import glob
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from sprite_atlas import SpriteAtlas, load_animation
+from palette import PALETTES, DEFAULT_EDGE_FUZZ, DEFAULT_BODY_FUZZ, palette_params, recolor_table
+from frame_store import FrameStore, source_hash, store_path, write_store, remove_stale
+
+
+# The untouched sprites in gif/ show up as a theme of their own
+RAW_THEME = "classic"
+
+
+def discover_themes(base_path):
+    """Map theme name -> (kind, path) for every theme found under base_path.
+
+    kind is "folder" for theme_<name>/ (and gif/ as "classic") or "packed"
+    for a theme_<name>.atlas.png written by theme_builder.py --atlas.
+    Palette themes are added on top by ThemeManager.set_palettes().
+    """
+    themes = {}
+    raw = os.path.join(base_path, "gif")
+    if os.path.isdir(raw):
+        themes[RAW_THEME] = ("folder", raw)
+    for path in sorted(glob.glob(os.path.join(base_path, "theme_*.atlas.png"))):
+        name = os.path.basename(path)[len("theme_"):-len(".atlas.png")]
+        themes[name] = ("packed", path)
+    for path in sorted(glob.glob(os.path.join(base_path, "theme_*"))):
+        if os.path.isdir(path):
+            themes[os.path.basename(path)[len("theme_"):]] = ("folder", path)  # Folders win over packed
+    return themes
+
+
+def load_theme(kind, path, cell_size=None):
+    if kind == "packed":
+        return SpriteAtlas.from_packed(path, cell_size)
+    return SpriteAtlas.from_folder(path, cell_size)
+
+
+class ThemeCache:
+    """LRU cache of decoded theme atlases, bounded by their total byte size"""
+
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # name -> SpriteAtlas, least recently used first
+
+    def get(self, name):
+        atlas = self.entries.get(name)
+        if atlas is not None:
+            self.entries.move_to_end(name)
+        return atlas
+
+    def put(self, name, atlas):
+        self.entries[name] = atlas
+        self.entries.move_to_end(name)
+        # Always keep the newest entry, even if it alone is over budget
+        while len(self.entries) > 1 and self.total_bytes() > self.max_bytes:
+            evicted, _ = self.entries.popitem(last=False)
+            print(f"Evicted theme from cache: {evicted}")
+
+    def total_bytes(self):
+        return sum(atlas.byte_size() for atlas in self.entries.values())
+
+    def __contains__(self, name):
+        return name in self.entries
+
+
+class _LoaderSignals(QObject):
+    loaded = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+
+
+class ThemeLoader(QRunnable):
+    """Decodes one theme into a SpriteAtlas on a thread-pool thread.
+
+    Only QImage work happens here; the QPixmap upload is left to the GUI
+    thread the first time the atlas is drawn.
+    """
+
+    def __init__(self, name, kind, path, cell_size):
+        super().__init__()
+        self.name = name
+        self.kind = kind
+        self.path = path
+        self.cell_size = cell_size
+        self.signals = _LoaderSignals()
+
+    def run(self):
+        try:
+            atlas = load_theme(self.kind, self.path, self.cell_size)
+        except Exception as e:
+            self.signals.failed.emit(self.name, str(e))
+            return
+        if len(atlas) == 0:
+            self.signals.failed.emit(self.name, "no animations found")
+            return
+        self.signals.loaded.emit(self.name, atlas)
+
+
+class IndexLoader(QRunnable):
+    """Builds the indexed sprites palette themes share on a thread-pool thread.
+
+    Indexes raw, an already decoded classic atlas at native size, if
+    given; otherwise decodes the sprites from folder first. Reports under the name of the
+    palette theme that asked for them.
+    """
+
+    def __init__(self, name, folder, raw=None):
+        super().__init__()
+        self.name = name
+        self.folder = folder
+        self.raw = raw
+        self.signals = _LoaderSignals()
+
+    def run(self):
+        try:
+            raw = self.raw if self.raw is not None else SpriteAtlas.from_folder(self.folder)
+            indexed = raw.to_indexed()
+        except Exception as e:
+            self.signals.failed.emit(self.name, str(e))
+            return
+        self.signals.loaded.emit(self.name, indexed)
+
+
+class _AnimationSignals(QObject):
+    decoded = pyqtSignal(str, int, object)
+    finished = pyqtSignal(str)
+
+
+class AnimationLoader(QRunnable):
+    """Decodes the given animations of a folder theme one at a time.
+
+    Each one is handed to the GUI thread as soon as it is decoded, so the
+    cat can use it before the rest are done. Files that fail are skipped.
+    """
+
+    def __init__(self, name, folder, anim_ids, cell_size=None):
+        super().__init__()
+        self.name = name
+        self.folder = folder
+        self.anim_ids = list(anim_ids)
+        self.cell_size = cell_size
+        self.signals = _AnimationSignals()
+
+    def run(self):
+        for anim_id in self.anim_ids:
+            frames = load_animation(self.folder, anim_id, self.cell_size)
+            if frames is not None:
+                self.signals.decoded.emit(self.name, anim_id, frames)
+        self.signals.finished.emit(self.name)
+
+
+class ThemeManager(QObject):
+    """Finds themes, loads them in the background and keeps recent ones decoded.
+
+    request() answers straight from the cache when it can. Otherwise it
+    starts a ThemeLoader and emits theme_ready once the atlas is complete,
+    so the caller can swap it in as a whole. Only the most recent request
+    is delivered; a slow load that has been superseded is cached but not
+    applied.
+    """
+
+    theme_ready = pyqtSignal(str, object)
+    theme_failed = pyqtSignal(str, str)
+    animation_loaded = pyqtSignal(str, int)
+
+    def __init__(self, base_path, cell_size=None, cache_bytes=4 * 1024 * 1024, store_dir=None):
+        super().__init__()
+        self.base_path = base_path
+        self.cell_size = cell_size
+        self.store_dir = store_dir  # Warm-start frame stores go here; None to never use them
+        self.cache = ThemeCache(cache_bytes)
+        self.themes = discover_themes(base_path)
+        self.palettes = {}  # name -> recolour params of every palette theme
+        self._indexed = None  # The raw sprites as one indexed atlas, shared by palette themes
+        self._indexing = None  # IndexLoader building _indexed, while it runs
+        self.set_palettes()
+        self.pending = None
+        self._loaders = {}  # Keep runnables (and their signal objects) alive while they run
+        self._progressive = {}  # name -> (atlas, AnimationLoader) still filling in
+        self._store_targets = {}  # name -> (path, size, dpr, smooth) to write once fully decoded
+
+    def names(self):
+        return list(self.themes)
+
+    def set_palettes(self, extra=None):
+        """Offer PALETTES plus extra ({name: {"edge", "body"}}) as palette themes.
+
+        A theme folder or packed atlas of the same name wins. Returns the
+        names of palette themes whose colours changed or that are gone, so
+        a caller showing one of them knows to reload it.
+        """
+        raw = self.themes.get(RAW_THEME)
+        specs = dict(PALETTES)
+        specs.update(extra or {})
+        palettes = {}
+        if raw is not None:
+            for name, spec in specs.items():
+                if name in self.themes and self.themes[name][0] != "palette":
+                    continue  # A real theme of that name wins
+                palettes[name] = palette_params(spec["edge"], spec["body"],
+                                                spec.get("edge_fuzz", DEFAULT_EDGE_FUZZ),
+                                                spec.get("body_fuzz", DEFAULT_BODY_FUZZ))
+
+        changed = [name for name in self.palettes if palettes.get(name) != self.palettes[name]]
+        for name in changed:
+            del self.themes[name]
+            self.cache.entries.pop(name, None)
+        for name in palettes:
+            self.themes[name] = ("palette", raw[1])
+        self.palettes = palettes
+        return changed
+
+    def palette_atlas(self, name, smooth=True):
+        """A palette theme: the shared indexed sprites with a recoloured colour table.
+
+        The raw sprites are decoded at their own size (or taken from a
+        loaded classic theme that has them so) and indexed the first time; every palette after that is only a
+        colour table swap. request() has that first time done on the
+        thread pool; calling this directly does it here.
+        """
+        if self._indexed is None:
+            raw = self._native_raw() or SpriteAtlas.from_folder(self.themes[RAW_THEME][1])
+            self._indexed = raw.to_indexed()
+        atlas = self._indexed.recolored(recolor_table(self._indexed.color_table(), self.palettes[name]))
+        atlas.frame_cache.set_smooth(smooth)
+        return atlas
+
+    def _native_raw(self):
+        """The cached classic atlas if it is complete and holds the sprites as decoded, else None.
+
+        A scaled or frame-store atlas has smoothed edges, and so far more
+        colours than a palette table can remap.
+        """
+        raw = self.cache.get(RAW_THEME)
+        if raw is None or not raw.native or self.is_loading(RAW_THEME):
+            return None
+        return raw
+
+    def source(self, name):
+        return self.themes.get(name)
+
+    def request(self, name):
+        if name not in self.themes:
+            self.theme_failed.emit(name, "unknown theme")
+            return
+        self.pending = name
+
+        atlas = self.cache.get(name)
+        if atlas is not None:
+            self.pending = None
+            self.theme_ready.emit(name, atlas)
+            return
+        if name in self._loaders:
+            return  # Already loading; theme_ready follows
+
+        kind, path = self.themes[name]
+        if kind == "palette":
+            if self._indexed is None:
+                self._start_indexing(name)
+                return  # theme_ready follows once the shared sprites are indexed
+            atlas = self.palette_atlas(name)
+            self.cache.put(name, atlas)
+            self.pending = None
+            self.theme_ready.emit(name, atlas)
+            return
+        loader = ThemeLoader(name, kind, path, self.cell_size)
+        loader.setAutoDelete(False)
+        loader.signals.loaded.connect(self._on_loaded)
+        loader.signals.failed.connect(self._on_failed)
+        self._loaders[name] = loader
+        QThreadPool.globalInstance().start(loader)
+
+    def _start_indexing(self, name):
+        """Build _indexed in the background for the pending palette theme, unless already under way"""
+        if self._indexing is not None:
+            return
+        loader = IndexLoader(name, self.themes[RAW_THEME][1], self._native_raw())
+        loader.setAutoDelete(False)
+        loader.signals.loaded.connect(self._on_indexed)
+        loader.signals.failed.connect(self._on_index_failed)
+        self._indexing = loader
+        QThreadPool.globalInstance().start(loader)
+
+    def load_progressive(self, name, first, count=32, smooth=True, size=None, dpr=1.0):
+        """Decode only the animations in first now and the rest in the background.
+
+        Returns the (partial) atlas straight away and caches it. Every
+        animation decoded later is added to that atlas on the GUI thread and
+        announced with animation_loaded. Packed and palette themes are a
+        single image, so they are always loaded in full.
+
+        With a store_dir and a sprite size, a frame store pre-scaled for
+        size and dpr is mapped instead when one exists (a warm start, no
+        decoding at all), and written once the theme is complete otherwise.
+        """
+        kind, path = self.themes[name]
+        if self.store_dir is not None and size is not None:
+            digest = source_hash(kind, path, count, extra=self.palettes.get(name))
+            target = store_path(self.store_dir, name, digest, size, dpr, smooth)
+            try:
+                atlas = SpriteAtlas.from_store(FrameStore(target), smooth)
+            except (OSError, ValueError):
+                self._store_targets[name] = (target, size, dpr, smooth)
+            else:
+                print(f"Warm start: mapped {os.path.basename(target)}")
+                self.cache.put(name, atlas)
+                return atlas
+
+        if kind in ("packed", "palette"):
+            if kind == "packed":
+                atlas = SpriteAtlas.from_packed(path, self.cell_size, smooth=smooth)
+            else:
+                atlas = self.palette_atlas(name, smooth)
+            self.cache.put(name, atlas)
+            self._write_store(name, atlas)
+            return atlas
+
+        first = [anim_id for anim_id in first if anim_id < count]
+        atlas = SpriteAtlas.from_folder(path, self.cell_size, count, smooth=smooth, ids=first)
+        self.cache.put(name, atlas)
+        rest = [anim_id for anim_id in range(count) if anim_id not in first]
+        if rest:
+            loader = AnimationLoader(name, path, rest, self.cell_size)
+            loader.setAutoDelete(False)
+            loader.signals.decoded.connect(self._on_animation_decoded)
+            loader.signals.finished.connect(self._on_progressive_finished)
+            self._progressive[name] = (atlas, loader)
+            QThreadPool.globalInstance().start(loader)
+        else:
+            self._write_store(name, atlas)
+        return atlas
+
+    def _write_store(self, name, atlas):
+        """Save a fully decoded theme for the next warm start, if load_progressive asked for it"""
+        target = self._store_targets.pop(name, None)
+        if target is None or len(atlas) == 0:
+            return
+        path, size, dpr, smooth = target
+        start = time.perf_counter()
+        try:
+            write_store(path, atlas, size, dpr, smooth)
+        except OSError as e:
+            print(f"Could not write frame store {path}: {e}")
+            return
+        remove_stale(self.store_dir, name, size, dpr, smooth, keep=path)
+        print(f"Wrote frame store {os.path.basename(path)} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def is_loading(self, name):
+        """Whether load_progressive() is still decoding animations for name"""
+        return name in self._progressive or name in self._loaders
+
+    def _on_animation_decoded(self, name, anim_id, frames):
+        atlas, _ = self._progressive[name]
+        atlas.add_animation(anim_id, frames)
+        self.animation_loaded.emit(name, anim_id)
+
+    def _on_progressive_finished(self, name):
+        atlas, _ = self._progressive.pop(name)
+        print(f"Theme {name}: {len(atlas)} animations loaded")
+        self._write_store(name, atlas)
+
+    def _on_loaded(self, name, atlas):
+        self._loaders.pop(name, None)
+        self.cache.put(name, atlas)
+        if self.pending == name:
+            self.pending = None
+            self.theme_ready.emit(name, atlas)
+
+    def _on_indexed(self, name, indexed):
+        self._indexing = None
+        if self._indexed is None:
+            self._indexed = indexed
+        name = self.pending
+        if name in self.palettes:
+            # Whichever palette is wanted now; the first one asked for may have been superseded
+            atlas = self.palette_atlas(name)
+            self.cache.put(name, atlas)
+            self.pending = None
+            self.theme_ready.emit(name, atlas)
+
+    def _on_index_failed(self, name, message):
+        self._indexing = None
+        if self.pending in self.palettes:
+            name, self.pending = self.pending, None
+            self.theme_failed.emit(name, message)
+
+    def _on_failed(self, name, message):
+        self._loaders.pop(name, None)
+        if self.pending == name:
+            self.pending = None
+        self.theme_failed.emit(name, message)
@@ -0,0 +1,149 @@
+import time
+
+
+class TickScheduler:
+    """Adapts the state-machine timer interval to what the cat is doing.
+
+    The logic is written in base ticks (60 ms). While the cat is moving
+    every base tick is a wakeup. While it sits or sleeps nothing visible
+    changes between animation frames, so the timer slows down to the
+    frame period and the caller catches the state machine up by running
+    the elapsed number of base ticks in one wakeup.
+
+    With fixed_timestep the step count always comes from elapsed time,
+    carrying the remainder over, so the logic runs at exactly one step per
+    base interval however much the timer jitters. A wakeup can then
+    return 0 steps.
+    """
+
+    BASE_INTERVAL = 60
+
+    # Wakeup interval (ms) per state label. Idle intervals are multiples of
+    # the base tick that line up with the idle frame periods in
+    # handle_idle_animations (wash flips every 3 ticks, sleep every 5), so
+    # the cat looks the same as with a fixed 60 ms tick.
+    INTERVALS = {
+        "chasing": 60,
+        "surprised": 60,
+        "digging": 60,
+        "idle": 240,
+        "washing": 180,
+        "sleeping": 300,
+    }
+
+    # Low-power profile (e.g. on battery): the moving states wake half as
+    # often and catch up two base ticks per wakeup. Washing and sleeping
+    # keep their intervals, which already match their frame periods
+    LOW_POWER_INTERVALS = {
+        "chasing": 120,
+        "surprised": 120,
+        "digging": 120,
+        "idle": 480,
+    }
+
+    # Never replay more than this many base ticks in one wakeup, e.g. after
+    # the machine was suspended
+    MAX_CATCH_UP = 20
+
+    def __init__(self, timer, base_interval=BASE_INTERVAL, intervals=None, fixed_timestep=False):
+        self.timer = timer
+        self.base_interval = base_interval
+        self.fixed_timestep = fixed_timestep
+        self.carry_ms = 0.0  # Elapsed time not yet turned into steps (fixed_timestep only)
+        self.label = "chasing"
+        self.set_intervals(intervals)
+        self.last_tick = None
+        self.wakeups = {}
+        self.seconds = {}
+        self._label_since = time.monotonic()
+
+    def set_intervals(self, intervals=None):
+        """Replace the per-state overrides on top of INTERVALS, applying them right away"""
+        self.intervals = dict(self.INTERVALS)
+        if intervals:
+            self.intervals.update(intervals)
+        if self.timer.isActive():
+            interval = self.intervals.get(self.label, self.base_interval)
+            if self.timer.interval() != interval:
+                self.timer.start(interval)
+
+    def start(self, label="chasing"):
+        self.label = label
+        self.last_tick = time.monotonic()
+        self._label_since = self.last_tick
+        self.carry_ms = 0.0
+        self.timer.start(self.intervals.get(label, self.base_interval))
+
+    def stop(self):
+        """Stop the timer; the time until the next start() counts for no state"""
+        if self.timer.isActive():
+            now = time.monotonic()
+            self.seconds[self.label] = self.seconds.get(self.label, 0.0) + now - self._label_since
+            self._label_since = now
+        self.timer.stop()
+
+    def begin_tick(self):
+        """Record a wakeup and return how many base ticks have elapsed"""
+        now = time.monotonic()
+        self.wakeups[self.label] = self.wakeups.get(self.label, 0) + 1
+
+        if self.fixed_timestep and self.last_tick is not None:
+            self.carry_ms += (now - self.last_tick) * 1000
+            steps = int(self.carry_ms // self.base_interval)
+            if steps > self.MAX_CATCH_UP:
+                steps, self.carry_ms = self.MAX_CATCH_UP, 0.0
+            else:
+                self.carry_ms -= steps * self.base_interval
+        elif self.last_tick is None or self.intervals.get(self.label, self.base_interval) <= self.base_interval:
+            steps = 1
+        else:
+            elapsed_ms = (now - self.last_tick) * 1000
+            steps = min(max(1, round(elapsed_ms / self.base_interval)), self.MAX_CATCH_UP)
+        self.last_tick = now
+        return steps
+
+    def should_wake(self):
+        """Whether an outside event (e.g. pointer motion) should tick now.
+
+        Only while a slowed-down interval is running, and at most once per
+        base interval, so a stream of motion events can't flood the logic.
+        """
+        if self.intervals.get(self.label, self.base_interval) <= self.base_interval:
+            return False
+        return self.last_tick is None or (time.monotonic() - self.last_tick) * 1000 >= self.base_interval
+
+    def reschedule(self, label):
+        """Switch to the interval for label; takes effect immediately on a change"""
+        if label == self.label:
+            return
+        now = time.monotonic()
+        self.seconds[self.label] = self.seconds.get(self.label, 0.0) + now - self._label_since
+        self._label_since = now
+        self.label = label
+
+        interval = self.intervals.get(label, self.base_interval)
+        if self.timer.interval() != interval:
+            # start() restarts the countdown, so ramping up happens right away
+            self.timer.start(interval)
+
+    def stats(self):
+        """Wakeup counters per state label, including wakeups per second"""
+        seconds = dict(self.seconds)
+        if self.timer.isActive():
+            seconds[self.label] = seconds.get(self.label, 0.0) + time.monotonic() - self._label_since
+        result = {}
+        for label in sorted(set(seconds) | set(self.wakeups)):
+            wakeups = self.wakeups.get(label, 0)
+            spent = seconds.get(label, 0.0)
+            result[label] = {
+                "wakeups": wakeups,
+                "seconds": round(spent, 3),
+                "wakeups_per_second": round(wakeups / spent, 2) if spent > 0 else 0.0,
+            }
+        return result
+
+    def summary(self):
+        return ", ".join(
+            f"{label}: {s['wakeups_per_second']}/s over {s['seconds']:.1f}s"
+            for label, s in self.stats().items()
+        )
@@ -0,0 +1,133 @@
+"""Just enough of libX11 through ctypes for the cursor and session monitors
+and the compositor check.
+
+Nothing here is needed on Wayland, macOS or Windows; callers treat an
+OSError from load_xlib() or open_display() as "feature unavailable".
+"""
+import ctypes
+import ctypes.util
+
+_xlib = None
+
+BAD_WINDOW = 3  # X error code for a window id that no longer exists
+
+
+class _XErrorEvent(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_int), ("display", ctypes.c_void_p), ("resourceid", ctypes.c_ulong),
+                ("serial", ctypes.c_ulong), ("error_code", ctypes.c_ubyte), ("request_code", ctypes.c_ubyte),
+                ("minor_code", ctypes.c_ubyte)]
+
+
+_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(_XErrorEvent))
+_error_handler = None  # Our handler, kept alive for as long as Xlib may call it
+_previous_handler = None
+_bad_window = False
+
+
+def load_xlib():
+    """libX11 with the prototypes we use, loaded once"""
+    global _xlib
+    if _xlib is not None:
+        return _xlib
+    path = ctypes.util.find_library("X11")
+    if not path:
+        raise OSError("libX11 not found")
+    xlib = ctypes.CDLL(path)
+    display = ctypes.c_void_p
+    window = atom = ctypes.c_ulong
+
+    xlib.XOpenDisplay.restype = display
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    for name in ("XDefaultRootWindow", "XDefaultScreen", "XConnectionNumber", "XPending", "XFlush",
+                 "XCloseDisplay"):
+        getattr(xlib, name).argtypes = [display]
+    xlib.XDefaultRootWindow.restype = window
+    xlib.XNextEvent.argtypes = [display, ctypes.c_void_p]
+    xlib.XQueryExtension.argtypes = [display, ctypes.c_char_p] + [ctypes.POINTER(ctypes.c_int)] * 3
+    xlib.XInternAtom.restype = atom
+    xlib.XInternAtom.argtypes = [display, ctypes.c_char_p, ctypes.c_int]
+    xlib.XGetWindowProperty.argtypes = [
+        display, window, atom, ctypes.c_long, ctypes.c_long, ctypes.c_int, atom,
+        ctypes.POINTER(atom), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong),
+        ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.POINTER(ctypes.c_ubyte)),
+    ]
+    xlib.XTranslateCoordinates.argtypes = [
+        display, window, window, ctypes.c_int, ctypes.c_int,
+        ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(window),
+    ]
+    xlib.XGetSelectionOwner.restype = window
+    xlib.XGetSelectionOwner.argtypes = [display, atom]
+    xlib.XFree.argtypes = [ctypes.c_void_p]
+    xlib.XSetErrorHandler.restype = _ERROR_HANDLER
+    xlib.XSetErrorHandler.argtypes = [_ERROR_HANDLER]
+    _xlib = xlib
+    return xlib
+
+
+def open_display():
+    """(xlib, display) for a private connection to $DISPLAY"""
+    xlib = load_xlib()
+    display = xlib.XOpenDisplay(None)
+    if not display:
+        raise OSError("cannot open X display")
+    return xlib, display
+
+
+def ignore_bad_window():
+    """Install an Xlib error handler that notes BadWindow instead of exiting.
+
+    Xlib's default handler exit()s the process on any error, and a window
+    we query can be destroyed between two requests. Other errors still go
+    to the handler that was there before. Installed once per process.
+    """
+    global _error_handler, _previous_handler
+    if _error_handler is not None:
+        return
+
+    def handler(display, event):
+        global _bad_window
+        if event.contents.error_code == BAD_WINDOW:
+            _bad_window = True
+            return 0
+        return _previous_handler(display, event) if _previous_handler else 0
+
+    xlib = load_xlib()
+    _error_handler = _ERROR_HANDLER(handler)
+    _previous_handler = xlib.XSetErrorHandler(_error_handler)
+
+
+def take_bad_window():
+    """Whether a BadWindow error came in since the last call (see ignore_bad_window())"""
+    global _bad_window
+    seen, _bad_window = _bad_window, False
+    return seen
+
+
+def window_property(xlib, display, window, name):
+    """A 32-bit-format property as a list of ints ([] if unset)"""
+    atom = xlib.XInternAtom(display, name, False)
+    actual_type, actual_format = ctypes.c_ulong(), ctypes.c_int()
+    count, remaining = ctypes.c_ulong(), ctypes.c_ulong()
+    data = ctypes.POINTER(ctypes.c_ubyte)()
+    status = xlib.XGetWindowProperty(display, window, atom, 0, 1024, False, 0,  # 0 = AnyPropertyType
+                                     ctypes.byref(actual_type), ctypes.byref(actual_format),
+                                     ctypes.byref(count), ctypes.byref(remaining), ctypes.byref(data))
+    if status != 0 or not data:
+        return []
+    try:
+        if actual_format.value != 32:
+            return []
+        # Format 32 properties come back as C longs
+        return list(ctypes.cast(data, ctypes.POINTER(ctypes.c_ulong))[:count.value])
+    finally:
+        xlib.XFree(data)
+
+
+def compositor_running():
+    """Whether a compositing manager owns _NET_WM_CM_S<screen> on $DISPLAY's default screen"""
+    xlib, display = open_display()
+    try:
+        selection = f"_NET_WM_CM_S{xlib.XDefaultScreen(display)}".encode()
+        return xlib.XGetSelectionOwner(display, xlib.XInternAtom(display, selection, False)) != 0
+    finally:
+        xlib.XCloseDisplay(display)